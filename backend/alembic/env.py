@@ -0,0 +1,56 @@
+# backend/alembic/env.py
+
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import create_engine
+
+from app import models  # noqa: F401 - registers the tables on Base.metadata
+from app.core.config import settings
+from app.db.base import Base
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def _db_url() -> str:
+    # `-x db_url=...` or an explicit sqlalchemy.url (benchmarks) win over DB_URL
+    return (
+        context.get_x_argument(as_dictionary=True).get("db_url")
+        or config.get_main_option("sqlalchemy.url")
+        or settings.DB_URL
+    )
+
+
+def run_migrations_offline() -> None:
+    context.configure(
+        url=_db_url(),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        render_as_batch=True,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    connectable = create_engine(_db_url())
+    with connectable.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            # SQLite can only ALTER tables by copying them
+            render_as_batch=connection.dialect.name == "sqlite",
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
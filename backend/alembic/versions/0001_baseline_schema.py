@@ -0,0 +1,157 @@
+"""baseline schema
+
+The schema as create_all() built it before migrations existed. Databases
+created that way are adopted with `alembic stamp 0001`.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 12:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('ai_cache_entries',
+    sa.Column('key', sa.String(length=64), nullable=False),
+    sa.Column('risk_score', sa.Float(), nullable=False),
+    sa.Column('explanation', sa.Text(), nullable=False),
+    sa.Column('model', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('last_used_at', sa.DateTime(), nullable=True),
+    sa.Column('hits', sa.Integer(), nullable=True),
+    sa.PrimaryKeyConstraint('key')
+    )
+    op.create_index(op.f('ix_ai_cache_entries_created_at'), 'ai_cache_entries', ['created_at'])
+    op.create_index(op.f('ix_ai_cache_entries_last_used_at'), 'ai_cache_entries', ['last_used_at'])
+
+    op.create_table('cache_generations',
+    sa.Column('namespace', sa.String(), nullable=False),
+    sa.Column('generation', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('namespace')
+    )
+    op.create_table('enrichment_jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(), nullable=True),
+    sa.Column('ai_batch_size', sa.Integer(), nullable=True),
+    sa.Column('total', sa.Integer(), nullable=True),
+    sa.Column('enriched', sa.Integer(), nullable=True),
+    sa.Column('failed', sa.Integer(), nullable=True),
+    sa.Column('batches_total', sa.Integer(), nullable=True),
+    sa.Column('batches_done', sa.Integer(), nullable=True),
+    sa.Column('batches_failed', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_enrichment_jobs_id'), 'enrichment_jobs', ['id'])
+    op.create_index(op.f('ix_enrichment_jobs_status'), 'enrichment_jobs', ['status'])
+
+    op.create_table('event_daily_counts',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('event_type', sa.String(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'event_type')
+    )
+    op.create_table('finding_daily_counts',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('severity', sa.String(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'severity')
+    )
+    op.create_table('findings',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('rule_name', sa.String(), nullable=True),
+    sa.Column('severity', sa.String(), nullable=True),
+    sa.Column('description', sa.String(), nullable=True),
+    sa.Column('user', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('ai_explanation', sa.Text(), nullable=True),
+    sa.Column('risk_score', sa.Float(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_findings_created_at_id', 'findings', ['created_at', 'id'])
+    op.create_index(op.f('ix_findings_description'), 'findings', ['description'])
+    op.create_index(op.f('ix_findings_id'), 'findings', ['id'])
+    op.create_index(op.f('ix_findings_risk_score'), 'findings', ['risk_score'])
+    op.create_index(op.f('ix_findings_rule_name'), 'findings', ['rule_name'])
+    op.create_index(op.f('ix_findings_severity'), 'findings', ['severity'])
+    op.create_index(op.f('ix_findings_user'), 'findings', ['user'])
+
+    op.create_table('source_events',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('event_type', sa.String(), nullable=True),
+    sa.Column('user', sa.String(), nullable=True),
+    sa.Column('raw_data', sa.JSON(), nullable=True),
+    sa.Column('timestamp', sa.DateTime(), nullable=True),
+    sa.Column('processed', sa.Boolean(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_source_events_event_type'), 'source_events', ['event_type'])
+    op.create_index(op.f('ix_source_events_id'), 'source_events', ['id'])
+    op.create_index(op.f('ix_source_events_processed'), 'source_events', ['processed'])
+    op.create_index('ix_source_events_timestamp_id', 'source_events', ['timestamp', 'id'])
+    op.create_index(op.f('ix_source_events_user'), 'source_events', ['user'])
+
+    op.create_table('enrichment_job_batches',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('job_id', sa.Integer(), nullable=True),
+    sa.Column('finding_ids', sa.JSON(), nullable=False),
+    sa.Column('status', sa.String(), nullable=True),
+    sa.Column('attempts', sa.Integer(), nullable=True),
+    sa.Column('lease_owner', sa.String(), nullable=True),
+    sa.Column('lease_token', sa.String(), nullable=True),
+    sa.Column('lease_expires_at', sa.DateTime(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['job_id'], ['enrichment_jobs.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_enrichment_job_batches_id'), 'enrichment_job_batches', ['id'])
+    op.create_index(op.f('ix_enrichment_job_batches_job_id'), 'enrichment_job_batches', ['job_id'])
+    op.create_index('ix_enrichment_job_batches_status_id', 'enrichment_job_batches', ['status', 'id'])
+
+
+
+def downgrade() -> None:
+    op.drop_index('ix_enrichment_job_batches_status_id', table_name='enrichment_job_batches')
+    op.drop_index(op.f('ix_enrichment_job_batches_job_id'), table_name='enrichment_job_batches')
+    op.drop_index(op.f('ix_enrichment_job_batches_id'), table_name='enrichment_job_batches')
+
+    op.drop_table('enrichment_job_batches')
+    op.drop_index(op.f('ix_source_events_user'), table_name='source_events')
+    op.drop_index('ix_source_events_timestamp_id', table_name='source_events')
+    op.drop_index(op.f('ix_source_events_processed'), table_name='source_events')
+    op.drop_index(op.f('ix_source_events_id'), table_name='source_events')
+    op.drop_index(op.f('ix_source_events_event_type'), table_name='source_events')
+
+    op.drop_table('source_events')
+    op.drop_index(op.f('ix_findings_user'), table_name='findings')
+    op.drop_index(op.f('ix_findings_severity'), table_name='findings')
+    op.drop_index(op.f('ix_findings_rule_name'), table_name='findings')
+    op.drop_index(op.f('ix_findings_risk_score'), table_name='findings')
+    op.drop_index(op.f('ix_findings_id'), table_name='findings')
+    op.drop_index(op.f('ix_findings_description'), table_name='findings')
+    op.drop_index('ix_findings_created_at_id', table_name='findings')
+
+    op.drop_table('findings')
+    op.drop_table('finding_daily_counts')
+    op.drop_table('event_daily_counts')
+    op.drop_index(op.f('ix_enrichment_jobs_status'), table_name='enrichment_jobs')
+    op.drop_index(op.f('ix_enrichment_jobs_id'), table_name='enrichment_jobs')
+
+    op.drop_table('enrichment_jobs')
+    op.drop_table('cache_generations')
+    op.drop_index(op.f('ix_ai_cache_entries_last_used_at'), table_name='ai_cache_entries')
+    op.drop_index(op.f('ix_ai_cache_entries_created_at'), table_name='ai_cache_entries')
+
+    op.drop_table('ai_cache_entries')
@@ -0,0 +1,86 @@
+"""query shape indexes
+
+Replaces the single-column indexes with composite / partial ones that match
+the hot queries:
+- rules_engine._count_events: user + event_type + timestamp range
+- run_rules_on_new_events: processed == False in (timestamp, id) order
+- query_events: event_type or user, newest first
+- query_findings: severity or user, newest (created_at, id) first
+- enrich_missing_findings: risk_score / ai_explanation IS NULL
+and drops indexes nothing filters on (findings.description, rule_name,
+risk_score, and the duplicates of the primary keys).
+
+On PostgreSQL the indexes are built CONCURRENTLY, so writers are not blocked.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 12:30:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (name, table, columns, where) - where is a partial index predicate
+NEW_INDEXES = [
+    ('ix_source_events_user_type_timestamp', 'source_events',
+     ['user', 'event_type', 'timestamp'], None),
+    ('ix_source_events_type_timestamp', 'source_events',
+     ['event_type', 'timestamp'], None),
+    ('ix_source_events_unprocessed', 'source_events', ['timestamp', 'id'],
+     sa.column('processed', sa.Boolean) == sa.false()),
+    ('ix_findings_severity_created_at_id', 'findings',
+     ['severity', 'created_at', 'id'], None),
+    ('ix_findings_user_created_at_id', 'findings',
+     ['user', 'created_at', 'id'], None),
+    ('ix_findings_unenriched', 'findings', ['id'],
+     sa.or_(sa.column('risk_score').is_(None),
+            sa.column('ai_explanation').is_(None))),
+]
+
+# (name, table, columns) as created by the baseline
+OLD_INDEXES = [
+    ('ix_source_events_id', 'source_events', ['id']),
+    ('ix_source_events_event_type', 'source_events', ['event_type']),
+    ('ix_source_events_user', 'source_events', ['user']),
+    ('ix_source_events_processed', 'source_events', ['processed']),
+    ('ix_findings_id', 'findings', ['id']),
+    ('ix_findings_rule_name', 'findings', ['rule_name']),
+    ('ix_findings_severity', 'findings', ['severity']),
+    ('ix_findings_description', 'findings', ['description']),
+    ('ix_findings_user', 'findings', ['user']),
+    ('ix_findings_risk_score', 'findings', ['risk_score']),
+]
+
+
+def _concurrently() -> dict:
+    if op.get_bind().dialect.name == 'postgresql':
+        return {'postgresql_concurrently': True}
+    return {}
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in NEW_INDEXES:
+            op.create_index(
+                name, table, columns,
+                postgresql_where=where, sqlite_where=where,
+                **_concurrently(),
+            )
+        for name, table, _ in OLD_INDEXES:
+            op.drop_index(name, table_name=table, **_concurrently())
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns in OLD_INDEXES:
+            op.create_index(name, table, columns, **_concurrently())
+        for name, table, _, _ in NEW_INDEXES:
+            op.drop_index(name, table_name=table, **_concurrently())
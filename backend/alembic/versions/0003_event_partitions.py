@@ -0,0 +1,141 @@
+"""event day partitions
+
+Adds the event_partitions catalog (one row per day of events) and fills it
+from source_events.
+
+On PostgreSQL source_events becomes a table partitioned by RANGE (timestamp)
+with one partition per day (source_events_pYYYYMMDD) plus a default
+partition; the primary key turns into (id, timestamp), as partitioned tables
+require. Expect the copy to take a while on big tables. Other databases keep
+one table and treat each day as a slice of it.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 14:00:00
+"""
+from datetime import date, datetime, timedelta
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = 'id, event_type, "user", raw_data, timestamp, processed'
+
+# Index set of source_events as of 0002, recreated on the partitioned table
+INDEXES = [
+    'CREATE INDEX ix_source_events_timestamp_id ON source_events (timestamp, id)',
+    'CREATE INDEX ix_source_events_user_type_timestamp '
+    'ON source_events ("user", event_type, timestamp)',
+    'CREATE INDEX ix_source_events_type_timestamp '
+    'ON source_events (event_type, timestamp)',
+    'CREATE INDEX ix_source_events_unprocessed '
+    'ON source_events (timestamp, id) WHERE processed = false',
+]
+
+
+def _event_days(bind, table: str) -> list:
+    if bind.dialect.name == 'sqlite':
+        day = 'date(timestamp)'
+    else:
+        day = 'CAST(timestamp AS DATE)'
+    rows = bind.execute(sa.text(
+        f'SELECT DISTINCT {day} FROM {table} WHERE timestamp IS NOT NULL'
+    )).scalars()
+    return sorted(
+        date.fromisoformat(value[:10]) if isinstance(value, str) else value
+        for value in rows
+    )
+
+
+def _partition_source_events(days: list) -> None:
+    op.execute('ALTER TABLE source_events RENAME TO source_events_unpartitioned')
+    op.execute(
+        'ALTER TABLE source_events_unpartitioned '
+        'RENAME CONSTRAINT source_events_pkey TO source_events_unpartitioned_pkey'
+    )
+    op.execute(
+        'CREATE TABLE source_events ('
+        "id INTEGER NOT NULL DEFAULT nextval('source_events_id_seq'::regclass), "
+        'event_type VARCHAR, "user" VARCHAR, raw_data JSON, '
+        'timestamp TIMESTAMP WITHOUT TIME ZONE NOT NULL, processed BOOLEAN'
+        ') PARTITION BY RANGE (timestamp)'
+    )
+    op.execute('ALTER SEQUENCE source_events_id_seq OWNED BY source_events.id')
+    op.execute('CREATE TABLE source_events_default PARTITION OF source_events DEFAULT')
+    today = datetime.utcnow().date()
+    for day in sorted(set(days) | {today}):
+        start = datetime.combine(day, datetime.min.time())
+        end = start + timedelta(days=1)
+        op.execute(
+            f'CREATE TABLE source_events_p{day:%Y%m%d} PARTITION OF source_events '
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        )
+    op.execute(
+        f'INSERT INTO source_events ({COLUMNS}) '
+        'SELECT id, event_type, "user", raw_data, '
+        "COALESCE(timestamp, now() AT TIME ZONE 'utc'), processed "
+        'FROM source_events_unpartitioned'
+    )
+    op.execute('DROP TABLE source_events_unpartitioned')
+    op.execute('ALTER TABLE source_events ADD PRIMARY KEY (id, timestamp)')
+    for statement in INDEXES:
+        op.execute(statement)
+
+
+def upgrade() -> None:
+    op.create_table('event_partitions',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('row_count', sa.Integer(), nullable=True),
+    sa.Column('archive_path', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('archived_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('day')
+    )
+
+    bind = op.get_bind()
+    # --sql runs cannot read the data: the catalog is filled afterwards with
+    # `python -m app.scripts.retention --sync-catalog`
+    days = [] if op.get_context().as_sql else _event_days(bind, 'source_events')
+    if days:
+        catalog = sa.table(
+            'event_partitions',
+            sa.column('day', sa.Date),
+            sa.column('status', sa.String),
+            sa.column('created_at', sa.DateTime),
+        )
+        now = datetime.utcnow()
+        op.bulk_insert(
+            catalog,
+            [{'day': day, 'status': 'live', 'created_at': now} for day in days],
+        )
+    if bind.dialect.name == 'postgresql':
+        _partition_source_events(days)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute('ALTER TABLE source_events RENAME TO source_events_partitioned')
+        op.execute(
+            'CREATE TABLE source_events ('
+            "id INTEGER NOT NULL DEFAULT nextval('source_events_id_seq'::regclass), "
+            'event_type VARCHAR, "user" VARCHAR, raw_data JSON, '
+            'timestamp TIMESTAMP WITHOUT TIME ZONE, processed BOOLEAN)'
+        )
+        op.execute('ALTER SEQUENCE source_events_id_seq OWNED BY source_events.id')
+        op.execute(
+            f'INSERT INTO source_events ({COLUMNS}) '
+            f'SELECT {COLUMNS} FROM source_events_partitioned'
+        )
+        # Drops the partitions and their indexes too
+        op.execute('DROP TABLE source_events_partitioned')
+        op.execute('ALTER TABLE source_events ADD PRIMARY KEY (id)')
+        for statement in INDEXES:
+            op.execute(statement)
+    op.drop_table('event_partitions')
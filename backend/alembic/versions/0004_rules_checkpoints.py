@@ -0,0 +1,35 @@
+"""rules checkpoints
+
+Adds rules_checkpoints: the high-water mark and window state snapshots of
+the streaming rules engine (scripts/stream_rules.py).
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 22:30:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('rules_checkpoints',
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('high_water_mark', sa.Integer(), nullable=False),
+    sa.Column('state', sa.LargeBinary(), nullable=True),
+    sa.Column('state_high_water_mark', sa.Integer(), nullable=True),
+    sa.Column('state_saved_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('rules_checkpoints')
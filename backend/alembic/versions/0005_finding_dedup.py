@@ -0,0 +1,45 @@
+"""finding dedup
+
+Adds the deduplication columns to findings: occurrence_count,
+first_seen / last_seen, sample_event_id and dedup_key, with the unique
+index the rules engine upserts on. Existing findings become single
+occurrences seen at their created_at; their dedup_key stays NULL, so they
+are never merged.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 09:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('findings', sa.Column(
+        'occurrence_count', sa.Integer(), nullable=False, server_default='1'))
+    op.add_column('findings', sa.Column('first_seen', sa.DateTime(), nullable=True))
+    op.add_column('findings', sa.Column('last_seen', sa.DateTime(), nullable=True))
+    op.add_column('findings', sa.Column('sample_event_id', sa.Integer(), nullable=True))
+    op.add_column('findings', sa.Column('dedup_key', sa.String(), nullable=True))
+    op.execute(
+        "UPDATE findings SET first_seen = created_at, last_seen = created_at"
+    )
+    op.create_index('ux_findings_dedup_key', 'findings', ['dedup_key'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ux_findings_dedup_key', table_name='findings')
+    with op.batch_alter_table('findings') as batch_op:
+        batch_op.drop_column('dedup_key')
+        batch_op.drop_column('sample_event_id')
+        batch_op.drop_column('last_seen')
+        batch_op.drop_column('first_seen')
+        batch_op.drop_column('occurrence_count')
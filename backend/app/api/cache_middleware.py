@@ -0,0 +1,127 @@
+# backend/app/api/cache_middleware.py
+
+import hashlib
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlencode
+
+from fastapi import Request, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.exc import SQLAlchemyError
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal, ReadSessionLocal
+from app.services.response_cache import (
+    CacheBackend,
+    MemoryCacheBackend,
+    generations_statement,
+    get_generations,
+)
+
+# Cached (etag, body) entries are stored as b"<etag>\n<body>"
+_SEPARATOR = b"\n"
+
+
+def _read_generation(namespace: str) -> int:
+    db = ReadSessionLocal()
+    try:
+        return get_generations(db, [namespace])[namespace]
+    finally:
+        db.close()
+
+
+async def _read_generation_async(namespace: str) -> int:
+    async with AsyncSessionLocal() as db:
+        rows = (await db.execute(generations_statement([namespace]))).all()
+    return dict(rows).get(namespace, 0)
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return "*" in candidates or any(
+        candidate.removeprefix("W/") == etag for candidate in candidates
+    )
+
+
+class ResponseCacheMiddleware(BaseHTTPMiddleware):
+    """
+    Caches successful GET responses of selected paths.
+
+    routes maps a path to (namespace, ttl seconds). The cache key is the
+    namespace generation + path + sorted query parameters; writers bump the
+    generation (services/response_cache.bump_generations) when the data
+    changes, which retires every older entry at once. Responses carry an
+    ETag, and a matching If-None-Match gets a 304 without a body.
+    """
+
+    def __init__(
+        self,
+        app,
+        backend: CacheBackend,
+        routes: Dict[str, Tuple[str, int]],
+    ):
+        super().__init__(app)
+        self.backend = backend
+        self.routes = routes
+        # The memory backend never blocks; others do network I/O.
+        self._blocking = not isinstance(backend, MemoryCacheBackend)
+
+    async def _call(self, func, *args):
+        if self._blocking:
+            return await run_in_threadpool(func, *args)
+        return func(*args)
+
+    async def dispatch(self, request: Request, call_next):
+        route = None
+        if request.method == "GET":
+            route = self.routes.get(request.url.path.rstrip("/") or "/")
+        if route is None:
+            return await call_next(request)
+        namespace, ttl = route
+
+        try:
+            if settings.DB_ASYNC:
+                generation = await _read_generation_async(namespace)
+            else:
+                generation = await run_in_threadpool(_read_generation, namespace)
+        except SQLAlchemyError:
+            # e.g. tables not created yet: serve uncached
+            return await call_next(request)
+
+        query = urlencode(sorted(request.query_params.multi_items()))
+        key = f"{namespace}:{generation}:{request.url.path}?{query}"
+        if_none_match = request.headers.get("if-none-match")
+
+        cached = await self._call(self.backend.get, key)
+        if cached is not None:
+            etag, _, body = cached.partition(_SEPARATOR)
+            return self._respond(body, etag.decode(), if_none_match, "HIT")
+
+        response = await call_next(request)
+        if response.status_code != 200:
+            return response
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        await self._call(
+            self.backend.set, key, etag.encode() + _SEPARATOR + body, ttl
+        )
+        return self._respond(body, etag, if_none_match, "MISS")
+
+    @staticmethod
+    def _respond(
+        body: bytes,
+        etag: str,
+        if_none_match: Optional[str],
+        cache_status: str,
+    ) -> Response:
+        headers = {
+            "ETag": etag,
+            # Browsers may keep the body but must revalidate (-> 304) each time
+            "Cache-Control": "no-cache",
+            "X-Cache": cache_status,
+        }
+        if _etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
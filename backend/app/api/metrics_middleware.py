@@ -0,0 +1,67 @@
+# backend/app/api/metrics_middleware.py
+
+import time
+
+from app.core import metrics
+
+# Requests that matched no route share one series
+UNMATCHED_ROUTE = "unmatched"
+
+
+def _route_template(scope, status: int) -> str:
+    """
+    The request path with its path parameters put back as {name}. Built from
+    what the router stores in the (shared) scope, which is the same across
+    FastAPI versions, unlike the attributes of scope["route"].
+    """
+    if scope.get("endpoint") is None:
+        # Answered before routing: response cache hits keep their (fixed)
+        # path, anything else (404s for arbitrary paths) shares one series
+        if scope["method"] == "GET" and status < 400:
+            return scope["path"]
+        return UNMATCHED_ROUTE
+    params = {str(value): name for name, value in scope.get("path_params", {}).items()}
+    if not params:
+        return scope["path"]
+    return "/".join(
+        "{" + params[segment] + "}" if segment in params else segment
+        for segment in scope["path"].split("/")
+    )
+
+
+class MetricsMiddleware:
+    """
+    Records each HTTP request's latency by route template (/findings/{finding_id},
+    not the raw path, so ids don't create a series each) and attributes the
+    SQL statements it runs to that route (core/metrics.scope).
+
+    Plain ASGI rather than BaseHTTPMiddleware: streamed exports pass through
+    untouched and are timed until their last chunk.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        with metrics.scope(UNMATCHED_ROUTE) as query_scope:
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                route = _route_template(scope, status)
+                query_scope.name = route
+                metrics.HTTP_REQUEST_SECONDS.observe(
+                    time.perf_counter() - start, scope["method"], route, str(status)
+                )
@@ -1,4 +1,5 @@
 from .health import health_router
 from .events import events_router
 from .findings import findings_router
-from .stats import stats_router
\ No newline at end of file
+from .stats import stats_router
+from .metrics import metrics_router
\ No newline at end of file
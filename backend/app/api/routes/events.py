@@ -1,16 +1,37 @@
-from typing import List
-from fastapi import APIRouter , Depends
+from datetime import datetime
+from typing import List, Optional
+from fastapi import APIRouter , Depends , HTTPException , Query , Request , Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session 
 
 from app import schemas , models
-from app.db.deps import get_db
-from app.services.events_service import query_events
+from app.db.deps import get_db, get_query_db
+from app.services.events_service import (
+    events_export_statement,
+    query_events_page,
+    query_events_page_async,
+)
+from app.services.export_service import (
+    EXPORT_FORMATS,
+    export_filename,
+    parquet_available,
+    stream_export,
+)
+from app.services.ingestion.bulk_ingestor import ingest_events_bulk
+from app.services.pagination import InvalidCursor
+from app.services.ingestion.stream_ingestor import (
+    event_write_queue,
+    ingest_ndjson_stream,
+)
 events_router = APIRouter()
 
 @events_router.get("" , response_model=List[schemas.SourceEvent])
-def list_events(
+async def list_events(
+    response: Response,
     filters: schemas.SourceEventFilter = Depends(),
-    db: Session = Depends(get_db)):
+    db = Depends(get_query_db)):
     '''
     List source events with optional filters and basic pagination.
     - user: Filter by user
@@ -19,6 +40,88 @@ def list_events(
     - to_timestamp: Filter by to timestamp
     - limit: Max number of results to return
     - offset: Numbers of result to skip
+    - cursor: X-Next-Cursor of the previous page (constant-cost paging)
+    - include_total: return the match count in X-Total-Count
     '''
+    try:
+        if isinstance(db, AsyncSession):
+            items, next_cursor, total = await query_events_page_async(db, filters)
+        else:
+            items, next_cursor, total = await run_in_threadpool(
+                query_events_page, db, filters
+            )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    if total is not None:
+        response.headers["X-Total-Count"] = str(total)
+    return items
+
 
-    return query_events(db , filters)
\ No newline at end of file
+@events_router.get("/export")
+def export_events(
+    format: str = Query("ndjson", pattern="^(ndjson|csv|parquet)$"),
+    event_type: Optional[str] = None,
+    user: Optional[str] = None,
+    from_timestamp: Optional[datetime] = None,
+    to_timestamp: Optional[datetime] = None):
+    '''
+    Streams every event matching the filters, oldest first, as NDJSON, CSV
+    or Parquet (needs pyarrow), read through a server-side cursor.
+    '''
+    if format == "parquet" and not parquet_available():
+        raise HTTPException(status_code=400, detail="Parquet export needs pyarrow")
+    filters = schemas.SourceEventFilter(
+        event_type=event_type,
+        user=user,
+        from_timestamp=from_timestamp,
+        to_timestamp=to_timestamp,
+    )
+    return StreamingResponse(
+        stream_export(lambda db: events_export_statement(db, filters), format),
+        media_type=EXPORT_FORMATS[format],
+        headers={
+            "Content-Disposition":
+                f'attachment; filename="{export_filename("events", format)}"'
+        },
+    )
+
+
+@events_router.post("/bulk" , response_model=schemas.BulkIngestResult)
+async def bulk_ingest_events(
+    request: Request,
+    batch_size: Optional[int] = Query(None, ge=1, le=50_000),
+    db: Session = Depends(get_db)):
+    '''
+    Ingest many events in one request.
+    Body: a JSON array of SourceEventCreate objects, or NDJSON (one object per
+    line, Content-Type: application/x-ndjson).
+    - batch_size: rows per INSERT (default: INGEST_BATCH_SIZE)
+    Invalid records are skipped and reported in `errors`.
+    '''
+    body = await request.body()
+    return await run_in_threadpool(
+        ingest_events_bulk,
+        db,
+        body,
+        request.headers.get("content-type"),
+        batch_size,
+    )
+
+
+@events_router.post(
+    "/stream" , response_model=schemas.BulkIngestResult , status_code=202)
+async def stream_ingest_events(
+    request: Request,
+    wait: bool = Query(False)):
+    '''
+    Ingest a streamed NDJSON body (one SourceEventCreate object per line).
+    The body is parsed incrementally and events are handed to a background
+    writer through a bounded queue; when the queue is full the upload is
+    slowed down instead of buffering more. The response is sent once the
+    events are queued.
+    - wait: respond only once this upload's events are written; events whose
+      batch failed to write are then reported in `errors`
+    '''
+    return await ingest_ndjson_stream(request.stream(), event_write_queue, wait=wait)
@@ -1,39 +1,177 @@
 # backend/app/api/routes/findings.py
 
+import asyncio
 from typing import List  ,Optional
 from datetime import datetime
 from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi import Header, Response, WebSocket, WebSocketDisconnect
 
 from fastapi import APIRouter , Depends , Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session 
 
-from app.db.deps import get_db
+from app.core.config import settings
+from app.db.deps import get_db, get_query_db, get_read_db
 from app import schemas , models
-from app.services.findings_service import query_findings
+from app.services.export_service import (
+    EXPORT_FORMATS,
+    export_filename,
+    parquet_available,
+    stream_export,
+)
+from app.services.live_feed import live_feed_hub
+from app.services.findings_service import (
+    findings_export_statement,
+    query_findings,
+    query_findings_async,
+)
+from app.services.pagination import InvalidCursor
 from app.schemas.finding import PaginatedFindings
 from app.services.ai_service import enrich_finding_with_ai, enrich_missing_findings
+from app.services.enrichment_jobs import get_enrichment_job, submit_enrichment_job
 
 
 findings_router = APIRouter()
 
 @findings_router.get("" , response_model =PaginatedFindings)
-def list_findings(
+async def list_findings(
     page: int = Query(1 , ge=1),
     page_size:int = Query(20 , ge=1 , le=100),
     severity: Optional[str] =None,
     user: Optional[str] = None,
     from_date: Optional[datetime] = None,
     to_date: Optional[datetime] = None,
-    db : Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    db = Depends(get_query_db)
 ):
-    return query_findings( db=db,
+    '''
+    Newest findings first. Pass next_cursor back as 'cursor' to page through
+    them at constant cost; 'page' still works for shallow pages.
+    total is an estimate unless include_total=true (exact COUNT).
+    '''
+    params = dict(
         page=page,
         page_size=page_size,
         severity=severity,
         user=user,
         from_date=from_date,
         to_date=to_date,
-        )
+        cursor=cursor,
+        include_total=include_total,
+    )
+    try:
+        if isinstance(db, AsyncSession):
+            return await query_findings_async(db, **params)
+        return await run_in_threadpool(query_findings, db, **params)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@findings_router.get("/export")
+def export_findings(
+    format: str = Query("ndjson", pattern="^(ndjson|csv|parquet)$"),
+    severity: Optional[str] = None,
+    user: Optional[str] = None,
+    from_date: Optional[datetime] = None,
+    to_date: Optional[datetime] = None,
+):
+    '''
+    Streams every finding matching the filters, oldest first, as NDJSON,
+    CSV or Parquet (needs pyarrow), read through a server-side cursor.
+    '''
+    if format == "parquet" and not parquet_available():
+        raise HTTPException(status_code=400, detail="Parquet export needs pyarrow")
+    statement = findings_export_statement(severity, user, from_date, to_date)
+    return StreamingResponse(
+        stream_export(lambda db: statement, format),
+        media_type=EXPORT_FORMATS[format],
+        headers={
+            "Content-Disposition":
+                f'attachment; filename="{export_filename("findings", format)}"'
+        },
+    )
+
+
+
+async def _sse_messages(last_event_id: Optional[str]):
+    queue = live_feed_hub.subscribe(last_event_id)
+    try:
+        # browsers reconnect after 3 s, sending the last id they got
+        yield "retry: 3000\n\n"
+        while True:
+            try:
+                message = await asyncio.wait_for(
+                    queue.get(), settings.LIVE_FEED_KEEPALIVE_SECONDS
+                )
+            except asyncio.TimeoutError:
+                # keeps proxies from closing an idle stream
+                yield ": keep-alive\n\n"
+                continue
+            if message is None:
+                return
+            yield message.to_sse()
+    finally:
+        live_feed_hub.unsubscribe(queue)
+
+
+@findings_router.get("/stream")
+def stream_findings(last_event_id: Optional[str] = Header(None)):
+    '''
+    Live feed as server-sent events:
+    - finding: a new finding
+    - finding_updated: a deduplicated finding that folded in more
+      occurrences (occurrence_count / last_seen advanced)
+    - finding_enriched: a finding that got its risk_score and ai_explanation
+    - stats: {"delta": increments since the previous stats message,
+      "totals": severity counts, total_findings, total_events, events_today}
+    - resync: messages were skipped (slow client, large batch); reload the
+      list and /stats/summary
+    Reconnecting with Last-Event-ID replays the missed messages while they
+    are still buffered.
+    '''
+    return StreamingResponse(
+        _sse_messages(last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _wait_for_close(websocket: WebSocket) -> None:
+    while (await websocket.receive())["type"] != "websocket.disconnect":
+        pass
+
+
+@findings_router.websocket("/ws")
+async def findings_websocket(websocket: WebSocket, last_event_id: Optional[str] = None):
+    '''
+    The /findings/stream messages over a WebSocket, as JSON objects
+    {"id", "event", "data"}; last_event_id works like Last-Event-ID.
+    '''
+    await websocket.accept()
+    queue = live_feed_hub.subscribe(last_event_id)
+    closed = asyncio.create_task(_wait_for_close(websocket))
+    try:
+        while True:
+            get = asyncio.create_task(queue.get())
+            done, _ = await asyncio.wait(
+                {get, closed}, return_when=asyncio.FIRST_COMPLETED
+            )
+            if get not in done:
+                get.cancel()
+                return
+            message = get.result()
+            if message is None:
+                await websocket.close()
+                return
+            await websocket.send_json(message.to_dict())
+    except WebSocketDisconnect:
+        pass
+    finally:
+        closed.cancel()
+        live_feed_hub.unsubscribe(queue)
 
 
 @findings_router.post(
@@ -65,11 +203,60 @@ def enrich_finding(
 )
 def enrich_all_missing_findings(
     limit: int = Query(50, ge=1, le=500),
+    batch_size: Optional[int] = Query(None, ge=1, le=50),
     db: Session = Depends(get_db),
 ):
     """
     Runs enrichment on all Findings that are missing risk_score or ai_explanation.
     Processes up to 'limit' records in each call.
+    'batch_size' findings are scored per LLM request (default: AI_BATCH_SIZE).
+    """
+    updated = enrich_missing_findings(db, limit=limit, batch_size=batch_size)
+    return updated
+
+
+@findings_router.post(
+    "/enrichment_jobs",
+    response_model=schemas.EnrichmentJob,
+    status_code=202,
+    responses={204: {"description": "Nothing to enrich, no job was queued"}},
+)
+def create_enrichment_job(
+    job: Optional[schemas.EnrichmentJobCreate] = None,
+    db: Session = Depends(get_db),
+):
+    """
+    Queues background enrichment instead of calling the LLM in the request:
+    - finding_ids: enrich (or re-enrich) these findings
+    - otherwise: up to 'limit' findings missing risk_score or ai_explanation
+    Workers (scripts/enrich_worker.py) process the job; poll its status with
+    GET /findings/enrichment_jobs/{job_id}. When there is nothing to enrich
+    no job is queued and the response is 204 without a body.
+    """
+    job = job or schemas.EnrichmentJobCreate()
+    queued = submit_enrichment_job(
+        db,
+        finding_ids=job.finding_ids,
+        limit=job.limit,
+        ai_batch_size=job.batch_size,
+    )
+    if queued is None:
+        return Response(status_code=204)
+    return queued
+
+
+@findings_router.get(
+    "/enrichment_jobs/{job_id}",
+    response_model=schemas.EnrichmentJob,
+)
+def read_enrichment_job(
+    job_id: int,
+    db: Session = Depends(get_read_db),
+):
+    """
+    Status and progress of a background enrichment job.
     """
-    updated = enrich_missing_findings(db, limit=limit)
-    return updated
\ No newline at end of file
+    job = get_enrichment_job(db, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Enrichment job {job_id} not found")
+    return job
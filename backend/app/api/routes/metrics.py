@@ -0,0 +1,13 @@
+from fastapi import APIRouter, Response
+
+from app.core import metrics
+
+metrics_router = APIRouter()
+
+@metrics_router.get("", include_in_schema=False)
+def prometheus_metrics():
+    '''
+    Prometheus scrape endpoint (text exposition format). Counters are per
+    process: with several uvicorn workers, scrape each one.
+    '''
+    return Response(content=metrics.render_metrics(), media_type=metrics.CONTENT_TYPE)
@@ -1,16 +1,19 @@
 from fastapi import APIRouter , Depends
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session 
 from sqlalchemy import func
 
-from app.db.deps import get_db
+from app.db.deps import get_query_db, get_read_db
 from app import  models
-from app.schemas import StatsSummary
-from app.services.stats_service import get_summary_stats
+from app.schemas import StatsSummary, AICacheStats
+from app.services.ai_cache import enrichment_cache
+from app.services.stats_service import get_summary_stats, get_summary_stats_async
 
 stats_router = APIRouter()
 
 @stats_router.get("/summary"  , response_model = StatsSummary)
-def get_summary(db: Session = Depends(get_db)):
+async def get_summary(db = Depends(get_query_db)):
     '''
     Return basic stats summary :
     - total number of events 
@@ -19,4 +22,15 @@ def get_summary(db: Session = Depends(get_db)):
     - events by events_type 
 
     '''
-    return get_summary_stats(db)
\ No newline at end of file
+    if isinstance(db, AsyncSession):
+        return await get_summary_stats_async(db)
+    return await run_in_threadpool(get_summary_stats, db)
+
+
+@stats_router.get("/ai_cache", response_model=AICacheStats)
+def get_ai_cache_stats(db: Session = Depends(get_read_db)):
+    '''
+    AI enrichment cache counters of this process (hits, misses, hit rate,
+    stores, evictions) and the number of cached entries.
+    '''
+    return enrichment_cache.stats(db)
@@ -1,8 +1,110 @@
 from pydantic_settings import BaseSettings 
 import os
+from typing import Optional
 class Settings(BaseSettings):
     DB_URL: str = os.getenv("DB_URL")
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY")
+    # Connection pool of each engine (not used for in-memory SQLite);
+    # connections older than DB_POOL_RECYCLE_SECONDS are replaced
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_PRE_PING: bool = False
+    # Read-only engine of the GET routes (db/session.py); defaults to DB_URL,
+    # can point at a read replica
+    READ_DB_URL: Optional[str] = None
+    # PRAGMAs of every SQLite connection: WAL so readers are not blocked by
+    # the rules/ingest writer, busy_timeout so writers queue for the lock
+    SQLITE_JOURNAL_MODE: str = "wal"
+    SQLITE_SYNCHRONOUS: str = "normal"
+    SQLITE_BUSY_TIMEOUT_MS: int = 10_000
+    SQLITE_CACHE_SIZE_KB: int = 64 * 1024
+    SQLITE_MMAP_SIZE_BYTES: int = 256 * 1024 * 1024
+    # Serve GET /events, /findings and /stats/summary through an async engine
+    # (aiosqlite / asyncpg, see db/session.py) instead of the threadpool.
+    # ASYNC_DB_URL defaults to DB_URL with the async driver swapped in.
+    DB_ASYNC: bool = False
+    ASYNC_DB_URL: Optional[str] = None
+    # AI enrichment: point OPENAI_BASE_URL at a local stub (scripts/openai_stub.py)
+    # to run offline; limits apply across all concurrent calls of the process
+    OPENAI_BASE_URL: Optional[str] = None
+    OPENAI_MODEL: str = "gpt-4o-mini"
+    AI_CONCURRENCY: int = 8
+    AI_REQUESTS_PER_MINUTE: int = 500
+    AI_TOKENS_PER_MINUTE: int = 200_000
+    AI_MAX_RETRIES: int = 3
+    AI_TIMEOUT_SECONDS: float = 30.0
+    # Findings packed into one completion request (1 = one request per finding)
+    AI_BATCH_SIZE: int = 1
+    # Cache of AI results for identical findings (same rule/severity/description/user)
+    AI_CACHE_ENABLED: bool = True
+    AI_CACHE_TTL_SECONDS: int = 7 * 24 * 3600
+    AI_CACHE_MAX_ENTRIES: int = 50_000
+    # Background enrichment jobs: findings per claimed batch, how long a worker
+    # may hold a batch before another one can take it over, and max claims
+    ENRICH_JOB_BATCH_SIZE: int = 50
+    ENRICH_LEASE_SECONDS: int = 300
+    ENRICH_MAX_ATTEMPTS: int = 3
+    # Seconds an idle enrich_worker waits before polling for new batches
+    ENRICH_POLL_SECONDS: float = 2.0
+    # Response cache for /stats/summary and GET /findings: "memory" (per
+    # process, LRU within RESPONSE_CACHE_MAX_BYTES), "redis" or "none"
+    RESPONSE_CACHE_BACKEND: str = "memory"
+    RESPONSE_CACHE_REDIS_URL: str = "redis://localhost:6379/0"
+    RESPONSE_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    RESPONSE_CACHE_STATS_TTL_SECONDS: int = 30
+    RESPONSE_CACHE_FINDINGS_TTL_SECONDS: int = 15
+    # Live feed (GET /findings/stream, WS /findings/ws): how often the one
+    # poller per API process checks for new/enriched findings and stats
+    # changes, messages buffered per client before a slow client is told to
+    # resync, and seconds between SSE keep-alive comments
+    LIVE_FEED_POLL_SECONDS: float = 1.0
+    LIVE_FEED_CLIENT_QUEUE_SIZE: int = 256
+    LIVE_FEED_KEEPALIVE_SECONDS: float = 15.0
+    # Rules engine: how many events are processed (and committed) per chunk
+    RULES_CHUNK_SIZE: int = 1000
+    # "wall_clock" (windows end now) or "event_time" (windows end at event.timestamp)
+    RULES_TIME_MODE: str = "wall_clock"
+    # Event-time mode only processes events older than now - allowed lateness
+    RULES_ALLOWED_LATENESS_SECONDS: int = 60
+    # Optional JSON/YAML file with rule threshold overrides and extra rules
+    RULES_FILE: Optional[str] = None
+    # Suppression window of the built-in rules that fire on every event of a
+    # burst (failed_logins, mfa_failures, very_high_activity): their findings
+    # with the same rule and user (any user for the global rule) within one
+    # window of this many seconds, by event time, are stored as one finding
+    # with an occurrence_count, at the highest severity they reached. Other rules opt in with
+    # "suppression_seconds" in RULES_FILE. 0 = one finding per occurrence
+    FINDINGS_SUPPRESSION_SECONDS: int = 3600
+    # Streaming rules engine (services/rules/streaming.py): events per batch,
+    # max wait between polls of source_events when idle, and seconds between
+    # window state checkpoints. RULES_STREAM_IN_API runs it on a thread of the
+    # API process (single worker only), woken by each ingested batch
+    RULES_STREAM_BATCH_SIZE: int = 1000
+    RULES_STREAM_POLL_SECONDS: float = 0.25
+    RULES_STREAM_CHECKPOINT_SECONDS: float = 30.0
+    RULES_STREAM_IN_API: bool = False
+    # Rows per executemany INSERT when ingesting events in bulk
+    INGEST_BATCH_SIZE: int = 5000
+    # Streaming ingestion: queued events before uploads are slowed down,
+    # max wait before a partial batch is written, and max NDJSON line size
+    INGEST_QUEUE_SIZE: int = 20000
+    INGEST_FLUSH_INTERVAL_SECONDS: float = 0.5
+    INGEST_MAX_LINE_BYTES: int = 1_048_576
+    # Event retention: day partitions older than this many days are archived
+    # (NDJSON.gz files in EVENT_ARCHIVE_DIR) and dropped by scripts/retention.py
+    EVENT_RETENTION_DAYS: int = 90
+    EVENT_ARCHIVE_DIR: str = "./archive/events"
+    # Rows per DELETE when a day cannot be dropped as a whole (SQLite)
+    EVENT_RETENTION_DELETE_CHUNK: int = 5000
+    # Rows fetched per round trip (and per Parquet row group) by the
+    # /findings/export and /events/export streams
+    EXPORT_BATCH_SIZE: int = 10_000
+    # Prometheus metrics on GET /metrics (core/metrics.py): request latency,
+    # SQL statements per request/job, rules engine and LLM call timings. When
+    # off, no hooks are installed and the hot paths skip the timing entirely
+    METRICS_ENABLED: bool = True
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -0,0 +1,320 @@
+# backend/app/core/metrics.py
+
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+# Prometheus text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Read once: call sites check it before doing any timing work
+ENABLED: bool = settings.METRICS_ENABLED
+
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+RULE_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+    0.025, 0.1,
+)
+LLM_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100, 250, 1000, 10_000)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(
+        f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)
+    ) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _samples(self) -> Iterator[Tuple[str, Sequence[str], Sequence[str], float]]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {_escape(self.documentation)}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        for suffix, names, values, value in self._samples():
+            lines.append(
+                f"{self.name}{suffix}{_format_labels(names, values)} {_format_value(value)}"
+            )
+        return lines
+
+
+class Counter(_Metric):
+    """
+    Monotonic counter; label values are passed positionally, in labelnames order.
+    """
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def _samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            yield "", self.labelnames, labels, value
+
+
+class Histogram(_Metric):
+    """
+    Cumulative-bucket histogram (with _sum and _count), per label values.
+    """
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts (last = +Inf), sum]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    def count(self, *labels: str) -> int:
+        state = self._values.get(labels)
+        return sum(state[0]) if state else 0
+
+    def _samples(self):
+        with self._lock:
+            items = sorted((labels, (list(c), s)) for labels, (c, s) in self._values.items())
+        names = self.labelnames + ("le",)
+        for labels, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                yield "_bucket", names, labels + (_format_value(bound),), cumulative
+            yield "_sum", self.labelnames, labels, total
+            yield "_count", self.labelnames, labels, cumulative
+
+
+REGISTRY: List[_Metric] = []
+
+
+def render_metrics() -> str:
+    lines: List[str] = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def write_textfile(path: str) -> None:
+    """
+    Writes the current metrics for node_exporter's textfile collector
+    (one-shot jobs such as scripts/run_rules.py), replacing the file atomically.
+    """
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(render_metrics())
+    os.replace(tmp, path)
+
+
+# ---------- the application's metrics ----------
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "mcm_http_request_duration_seconds",
+    "HTTP request latency by route template, method and status code.",
+    ("method", "route", "status"),
+)
+DB_QUERY_SECONDS = Histogram(
+    "mcm_db_query_duration_seconds",
+    "SQL statement execution time by scope (route or job) and statement kind.",
+    ("scope", "operation"),
+)
+DB_QUERIES_PER_SCOPE = Histogram(
+    "mcm_db_queries_per_scope",
+    "SQL statements executed per request or job run.",
+    ("scope",),
+    buckets=QUERY_COUNT_BUCKETS,
+)
+RULE_SECONDS = Histogram(
+    "mcm_rule_evaluation_seconds",
+    "Time of one rule evaluation on one event (including its COUNT queries).",
+    ("rule",),
+    buckets=RULE_BUCKETS,
+)
+RULE_HITS = Counter(
+    "mcm_rule_findings_total",
+    "Findings produced per rule.",
+    ("rule",),
+)
+RULES_PHASE_SECONDS = Histogram(
+    "mcm_rules_phase_duration_seconds",
+    "Rules engine time per chunk and phase: load (event query), evaluate, "
+    "insert (findings, rollups, processed flags) and commit.",
+    ("phase",),
+)
+RULES_EVENTS = Counter(
+    "mcm_rules_events_total",
+    "Events evaluated by the rules engine.",
+)
+INGEST_EVENTS = Counter(
+    "mcm_ingest_events_total",
+    "Events handled by the background ingest writer, by outcome (written or "
+    "failed).",
+    ("outcome",),
+)
+LLM_REQUEST_SECONDS = Histogram(
+    "mcm_llm_request_duration_seconds",
+    "Chat completion latency by outcome (ok or the error type).",
+    ("outcome",),
+    buckets=LLM_BUCKETS,
+)
+LLM_TOKENS = Counter(
+    "mcm_llm_tokens_total",
+    "Tokens reported by the LLM API, by kind (prompt or completion).",
+    ("kind",),
+)
+LLM_FALLBACKS = Counter(
+    "mcm_llm_fallbacks_total",
+    "Findings scored by the heuristic fallback instead of the LLM, by reason.",
+    ("reason",),
+)
+LLM_CACHE_HITS = Counter(
+    "mcm_llm_cache_hits_total",
+    "Findings answered from the enrichment cache.",
+)
+
+
+@contextmanager
+def timed(histogram: Histogram, *labels: str) -> Iterator[None]:
+    """
+    Observes the block's duration; for coarse spans (a chunk, a request),
+    not per-event work.
+    """
+    if not ENABLED:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.observe(time.perf_counter() - start, *labels)
+
+
+# ---------- SQL query counting per request / job ----------
+
+class _Scope:
+    __slots__ = ("name", "queries")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.queries = 0
+
+
+_current_scope: ContextVar[Optional[_Scope]] = ContextVar("metrics_scope", default=None)
+
+
+@contextmanager
+def scope(name: str) -> Iterator[_Scope]:
+    """
+    Attributes the SQL statements run inside the block (including in the
+    threadpool, which copies the context) to `name`. On exit, the number of
+    statements is recorded in mcm_db_queries_per_scope. The name can be set
+    later, e.g. once the route is known.
+    """
+    current = _Scope(name)
+    token = _current_scope.set(current)
+    try:
+        yield current
+    finally:
+        _current_scope.reset(token)
+        if ENABLED:
+            DB_QUERIES_PER_SCOPE.observe(current.queries, current.name)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("metrics_query_start")
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    current = _current_scope.get()
+    if current is not None:
+        current.queries += 1
+    operation = statement.lstrip().split(None, 1)[0].upper() if statement else ""
+    DB_QUERY_SECONDS.observe(
+        elapsed, current.name if current is not None else "other", operation
+    )
+
+
+def _handle_error(exception_context):
+    # the statement failed: drop its start time
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("metrics_query_start"):
+        conn.info["metrics_query_start"].pop()
+
+
+_hooks_installed = False
+
+
+def install_sqlalchemy_hooks() -> None:
+    """
+    Times every statement of every engine (sync and async) of the process.
+    No-op when metrics are disabled, so disabled metrics cost nothing per query.
+    """
+    global _hooks_installed
+    if not ENABLED or _hooks_installed:
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(Engine, "handle_error", _handle_error)
+    _hooks_installed = True
@@ -0,0 +1,62 @@
+# backend/app/db/counters.py
+
+from typing import Callable, Mapping, Optional, Sequence, Tuple
+
+from sqlalchemy import insert, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+# Dialects with INSERT ... ON CONFLICT DO UPDATE
+_UPSERT_INSERTS = {
+    "sqlite": sqlite.insert,
+    "postgresql": postgresql.insert,
+}
+
+
+def upsert_insert(db: Session) -> Optional[Callable]:
+    """
+    The dialect's insert() (with on_conflict_do_update / _do_nothing) for the
+    session's database, or None when it has no INSERT ... ON CONFLICT.
+    """
+    return _UPSERT_INSERTS.get(db.get_bind().dialect.name)
+
+
+def increment_counts(
+    db: Session,
+    model,
+    key_columns: Sequence[str],
+    counts: Mapping[Tuple, int],
+    value_column: str = "count",
+) -> None:
+    """
+    Adds counts (keyed by tuples of key_columns values) to a counter table,
+    creating missing rows. Uses one INSERT ... ON CONFLICT DO UPDATE where
+    the dialect has it, so concurrent writers never race on new keys;
+    otherwise UPDATE, then INSERT when no row matched. Runs in the caller's
+    transaction.
+    """
+    if not counts:
+        return
+    table = model.__table__
+    rows = [
+        {**dict(zip(key_columns, key)), value_column: count}
+        for key, count in counts.items()
+    ]
+    dialect_insert = upsert_insert(db)
+    if dialect_insert is not None:
+        stmt = dialect_insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(key_columns),
+            set_={value_column: table.c[value_column] + stmt.excluded[value_column]},
+        )
+        db.execute(stmt, rows)
+        return
+
+    for row in rows:
+        result = db.execute(
+            update(table)
+            .where(*(table.c[column] == row[column] for column in key_columns))
+            .values({value_column: table.c[value_column] + row[value_column]})
+        )
+        if not result.rowcount:
+            db.execute(insert(table).values(**row))
@@ -1,5 +1,6 @@
-from typing import Generator 
-from app.db.session import SessionLocal
+from typing import AsyncGenerator, Generator 
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal, ReadSessionLocal, SessionLocal
 
 def get_db() -> Generator:
     db = SessionLocal()
@@ -9,3 +10,34 @@ def get_db() -> Generator:
         db.close()
 
 
+def get_read_db() -> Generator:
+    '''
+    Session on the read-only engine, for GET routes.
+    '''
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db() -> AsyncGenerator:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_query_db() -> AsyncGenerator:
+    '''
+    Session for the read-heavy dashboard routes: an AsyncSession with
+    DB_ASYNC=true, else a read-only Session (the route then runs the sync
+    query in the threadpool).
+    '''
+    if settings.DB_ASYNC:
+        async with AsyncSessionLocal() as db:
+            yield db
+    else:
+        db = ReadSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
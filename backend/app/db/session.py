@@ -1,7 +1,167 @@
-from sqlalchemy import create_engine
+from typing import Any, Dict, Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 from app.core.config import settings 
 
-engine = create_engine(settings.DB_URL , connect_args={"check_same_thread": False} if settings.DB_URL else {})
+
+def _is_sqlite(url: str) -> bool:
+    return make_url(url).get_backend_name() == "sqlite"
+
+
+def _is_sqlite_memory(url: str) -> bool:
+    return _is_sqlite(url) and make_url(url).database in (None, "", ":memory:")
+
+
+def sqlite_pragmas(read_only: bool = False) -> Dict[str, Any]:
+    '''
+    PRAGMAs run on every new SQLite connection, in order. WAL lets readers
+    keep reading while a writer commits; busy_timeout makes a second writer
+    wait for the lock instead of failing with "database is locked".
+    '''
+    pragmas: Dict[str, Any] = {
+        "journal_mode": settings.SQLITE_JOURNAL_MODE,
+        "synchronous": settings.SQLITE_SYNCHRONOUS,
+        "busy_timeout": settings.SQLITE_BUSY_TIMEOUT_MS,
+        # negative = KiB instead of pages
+        "cache_size": -settings.SQLITE_CACHE_SIZE_KB,
+        "mmap_size": settings.SQLITE_MMAP_SIZE_BYTES,
+    }
+    if read_only:
+        pragmas["query_only"] = "ON"
+    return pragmas
+
+
+def engine_options(url: str) -> Dict[str, Any]:
+    '''
+    create_engine() keyword arguments for `url`: pool sizing from settings
+    and, for SQLite, connections shareable across threads.
+    '''
+    options: Dict[str, Any] = {"pool_pre_ping": settings.DB_POOL_PRE_PING}
+    if _is_sqlite(url):
+        options["connect_args"] = {"check_same_thread": False}
+        if _is_sqlite_memory(url):
+            # in-memory databases live in a single connection: every thread
+            # shares it (StaticPool), no pool sizing
+            options["poolclass"] = StaticPool
+            return options
+    options.update(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+    )
+    return options
+
+
+def _install_connect_hook(
+    engine: Engine,
+    read_only: bool,
+    pragmas: Optional[Dict[str, Any]],
+) -> None:
+    if engine.dialect.name == "sqlite":
+        statements = [
+            f"PRAGMA {name}={value}"
+            for name, value in (
+                sqlite_pragmas(read_only) if pragmas is None else pragmas
+            ).items()
+        ]
+    elif engine.dialect.name == "postgresql" and read_only:
+        statements = ["SET SESSION CHARACTERISTICS AS TRANSACTION READ ONLY"]
+    else:
+        return
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+
+
+def make_engine(
+    url: str,
+    read_only: bool = False,
+    pragmas: Optional[Dict[str, Any]] = None,
+) -> Engine:
+    '''
+    Engine with the configured pool. SQLite connections get sqlite_pragmas()
+    (or `pragmas`); read_only engines refuse writes (query_only on SQLite,
+    read-only transactions on PostgreSQL).
+    '''
+    engine = create_engine(url, **engine_options(url))
+    _install_connect_hook(engine, read_only, pragmas)
+    return engine
+
+
+def make_read_engine(url: str, write_engine: Engine) -> Engine:
+    '''
+    Read-only engine for `url`. An in-memory SQLite database exists only in
+    the write engine's connection, so that engine is reused instead of
+    opening a second, empty database (reads are then not forced read-only).
+    '''
+    if _is_sqlite_memory(url) and make_url(url) == write_engine.url:
+        return write_engine
+    return make_engine(url, read_only=True)
+
+
+# Writers: ingestion, rules engine, enrichment, scripts
+engine = make_engine(settings.DB_URL)
 
 SessionLocal = sessionmaker(autocommit=False , autoflush=False , bind= engine)
+
+# GET routes: separate pool that cannot write (READ_DB_URL may be a replica)
+read_engine = make_read_engine(settings.READ_DB_URL or settings.DB_URL, engine)
+
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+
+# Sync driver -> async driver for ASYNC_DB_URL's default
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+}
+
+_async_engine: Optional[AsyncEngine] = None
+_async_sessionmaker: Optional[async_sessionmaker] = None
+
+
+def async_db_url(url: str) -> str:
+    scheme, sep, rest = url.partition("://")
+    return ASYNC_DRIVERS.get(scheme, scheme) + sep + rest
+
+
+def get_async_engine() -> AsyncEngine:
+    '''
+    The async engine of the GET routes, read-only like read_engine (created
+    on first use, so aiosqlite/asyncpg are only needed with DB_ASYNC=true).
+    '''
+    global _async_engine
+    if _async_engine is None:
+        url = settings.ASYNC_DB_URL or async_db_url(
+            settings.READ_DB_URL or settings.DB_URL
+        )
+        try:
+            _async_engine = create_async_engine(url, **engine_options(url))
+        except ImportError as e:
+            raise RuntimeError(
+                f"DB_ASYNC needs the async driver for {url!r} "
+                "(pip install -r requirements-async.txt)"
+            ) from e
+        _install_connect_hook(_async_engine.sync_engine, True, None)
+    return _async_engine
+
+
+def AsyncSessionLocal():
+    global _async_sessionmaker
+    if _async_sessionmaker is None:
+        _async_sessionmaker = async_sessionmaker(
+            get_async_engine(), expire_on_commit=False
+        )
+    return _async_sessionmaker()
@@ -1,15 +1,55 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 
-from app.api.routes import health_router, events_router, findings_router, stats_router
+from app.api.cache_middleware import ResponseCacheMiddleware
+from app.api.metrics_middleware import MetricsMiddleware
+from app.api.routes import (
+    health_router,
+    events_router,
+    findings_router,
+    stats_router,
+    metrics_router,
+)
+from app.core import metrics
+from app.core.config import settings
 from app.db.base import Base
 from app.db.session import engine
+from app.services.ingestion.stream_ingestor import event_write_queue
+from app.services.live_feed import live_feed_hub
+from app.services.rules.streaming import StreamingRulesService
+from app.services.response_cache import (
+    FINDINGS_NAMESPACE,
+    STATS_NAMESPACE,
+    create_cache_backend,
+)
 
 from fastapi.middleware.cors import CORSMiddleware
 
 from dotenv import load_dotenv
 load_dotenv()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    event_write_queue.start()
+    rules_stream = None
+    if settings.RULES_STREAM_IN_API:
+        rules_stream = StreamingRulesService()
+        rules_stream.start()
+    yield
+    # Ends the live feed streams (the hub starts with its first subscriber)
+    await live_feed_hub.stop()
+    # Flush events that were accepted but not written yet
+    await event_write_queue.stop()
+    if rules_stream is not None:
+        # after the flush, so the last events still get evaluated
+        await run_in_threadpool(rules_stream.stop)
+
+
 def create_app() -> FastAPI:
-    app = FastAPI(title="Mini Compliance Monitor")
+    app = FastAPI(title="Mini Compliance Monitor", lifespan=lifespan)
     
     app.add_middleware(
         CORSMiddleware,
@@ -17,11 +57,36 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],          # מאפשר GET/POST/OPTIONS וכו'
         allow_headers=["*"],          # מאפשר כל headers (Authorization וכו')
+        # pagination/caching headers readable by the dashboard
+        expose_headers=["X-Next-Cursor", "X-Total-Count", "ETag"],
     )
+    cache_backend = create_cache_backend()
+    if cache_backend is not None:
+        # Dashboard polling endpoints; invalidated when rules/enrichment/ingest commit
+        app.add_middleware(
+            ResponseCacheMiddleware,
+            backend=cache_backend,
+            routes={
+                "/stats/summary": (
+                    STATS_NAMESPACE,
+                    settings.RESPONSE_CACHE_STATS_TTL_SECONDS,
+                ),
+                "/findings": (
+                    FINDINGS_NAMESPACE,
+                    settings.RESPONSE_CACHE_FINDINGS_TTL_SECONDS,
+                ),
+            },
+        )
+    if metrics.ENABLED:
+        metrics.install_sqlalchemy_hooks()
+        # Added last = outermost: cached responses are timed too
+        app.add_middleware(MetricsMiddleware)
     app.include_router(health_router , prefix= "/health", tags=["health"])
     app.include_router(events_router , prefix= "/events", tags=["events"])
     app.include_router(findings_router , prefix= "/findings", tags=["findings"])
     app.include_router(stats_router , prefix= "/stats", tags=["stats"])
+    if metrics.ENABLED:
+        app.include_router(metrics_router, prefix="/metrics", tags=["metrics"])
 
     return app
 
@@ -1,2 +1,8 @@
 from app.models.source_event import SourceEvent
 from app.models.finding import Finding
+from app.models.ai_cache_entry import AICacheEntry
+from app.models.enrichment_job import EnrichmentJob, EnrichmentJobBatch
+from app.models.rollups import EventDailyCount, FindingDailyCount
+from app.models.cache_generation import CacheGeneration
+from app.models.event_partition import EventPartition
+from app.models.rules_checkpoint import RulesCheckpoint
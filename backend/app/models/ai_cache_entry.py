@@ -0,0 +1,21 @@
+# backend/app/models/ai_cache_entry.py
+
+from sqlalchemy import Column, Integer, String, DateTime, Text, Float
+from app.db.base import Base
+from datetime import datetime
+
+
+class AICacheEntry(Base):
+    """
+    Cached AI enrichment result, keyed by a hash of the normalized prompt fields.
+    """
+    __tablename__ = "ai_cache_entries"
+
+    key = Column(String(64), primary_key=True)
+    risk_score = Column(Float, nullable=False)
+    explanation = Column(Text, nullable=False)
+    model = Column(String)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    # LRU eviction drops the least recently used entries first
+    last_used_at = Column(DateTime, default=datetime.utcnow, index=True)
+    hits = Column(Integer, default=0)
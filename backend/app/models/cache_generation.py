@@ -0,0 +1,16 @@
+# backend/app/models/cache_generation.py
+
+from sqlalchemy import Column, Integer, String
+from app.db.base import Base
+
+
+class CacheGeneration(Base):
+    """
+    Version counter per response-cache namespace ("stats", "findings").
+    Writers bump it in the transaction that changes the data, so every API
+    process stops serving cached responses of the old generation.
+    """
+    __tablename__ = "cache_generations"
+
+    namespace = Column(String, primary_key=True)
+    generation = Column(Integer, nullable=False, default=0)
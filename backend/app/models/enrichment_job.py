@@ -0,0 +1,53 @@
+# backend/app/models/enrichment_job.py
+
+from sqlalchemy import Column, Integer, String, DateTime, JSON, Text, ForeignKey, Index
+from app.db.base import Base
+from datetime import datetime
+
+
+class EnrichmentJob(Base):
+    """
+    A request to enrich a set of findings in the background. The findings are
+    split into EnrichmentJobBatch rows that workers claim independently.
+    """
+    __tablename__ = "enrichment_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    # pending -> running -> done (failed when every batch failed)
+    status = Column(String, default="pending", index=True)
+    # Findings per LLM request, passed on to ai_service (None = AI_BATCH_SIZE)
+    ai_batch_size = Column(Integer, nullable=True)
+    total = Column(Integer, default=0)
+    enriched = Column(Integer, default=0)
+    failed = Column(Integer, default=0)
+    batches_total = Column(Integer, default=0)
+    batches_done = Column(Integer, default=0)
+    batches_failed = Column(Integer, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+
+class EnrichmentJobBatch(Base):
+    """
+    A slice of a job's findings. A worker leases it (lease_token +
+    lease_expires_at) while enriching; an expired lease can be claimed again.
+    """
+    __tablename__ = "enrichment_job_batches"
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_id = Column(Integer, ForeignKey("enrichment_jobs.id"), index=True)
+    finding_ids = Column(JSON, nullable=False)
+    # pending -> running -> done | failed
+    status = Column(String, default="pending")
+    attempts = Column(Integer, default=0)
+    lease_owner = Column(String, nullable=True)
+    lease_token = Column(String, nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)
+    error = Column(Text, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        # Workers look for claimable batches in id order
+        Index("ix_enrichment_job_batches_status_id", "status", "id"),
+    )
@@ -0,0 +1,23 @@
+# backend/app/models/event_partition.py
+
+from sqlalchemy import Column, Integer, String, DateTime, Date
+from app.db.base import Base
+from datetime import datetime
+
+
+class EventPartition(Base):
+    """
+    Catalog of the days source_events holds. On PostgreSQL every day is a
+    partition table (source_events_pYYYYMMDD); elsewhere it is a time slice
+    of the one table. Retention archives and drops whole days.
+    """
+    __tablename__ = "event_partitions"
+
+    day = Column(Date, primary_key=True)
+    # live -> archived (rows written to archive_path) | dropped (discarded)
+    status = Column(String, nullable=False, default="live")
+    # Rows at archive time
+    row_count = Column(Integer, nullable=True)
+    archive_path = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    archived_at = Column(DateTime, nullable=True)
@@ -1,20 +1,48 @@
 # backend/app/models/finding.py
 
-from sqlalchemy import Column, Integer, String, DateTime, JSON , Text , Float
+from sqlalchemy import Column, Integer, String, DateTime, JSON , Text , Float , Index , or_
 from app.db.base import Base
 from datetime import datetime
 
 
 class Finding(Base):
     __tablename__="findings"
-    id = Column(Integer , primary_key=True , index=True)
-    rule_name = Column(String , index =True)
-    severity = Column(String , index =True)
-    description = Column(String , index =True)
-    user = Column(String , index = True)
+    id = Column(Integer , primary_key=True)
+    rule_name = Column(String)
+    severity = Column(String)
+    description = Column(String)
+    user = Column(String)
     created_at = Column(DateTime , default= datetime.utcnow)
     ai_explanation = Column(Text , nullable=True)
-    risk_score = Column(Float , nullable=True , index=True)
+    risk_score = Column(Float , nullable=True)
+    # Deduplication (services/rules/dedup.py): occurrences of the same rule
+    # and user within one suppression window share one finding, reported at
+    # the highest severity they reached
+    occurrence_count = Column(Integer, nullable=False, default=1, server_default="1")
+    first_seen = Column(DateTime, nullable=True)
+    last_seen = Column(DateTime, nullable=True)
+    # id of the first event that triggered it (no foreign key: events expire)
+    sample_event_id = Column(Integer, nullable=True)
+    # NULL when the rule has no suppression window
+    dedup_key = Column(String, nullable=True)
+
+    # Indexes follow the hot query shapes (see alembic/versions/0002_*)
+    __table_args__ = (
+        # (created_at, id) keyset pagination of the findings list
+        Index("ix_findings_created_at_id", "created_at", "id"),
+        # the same, filtered by severity / by user
+        Index("ix_findings_severity_created_at_id", "severity", "created_at", "id"),
+        Index("ix_findings_user_created_at_id", "user", "created_at", "id"),
+        # the aggregate an occurrence is folded into (ON CONFLICT target)
+        Index("ux_findings_dedup_key", "dedup_key", unique=True),
+        # findings still waiting for AI enrichment
+        Index(
+            "ix_findings_unenriched",
+            "id",
+            postgresql_where=or_(risk_score.is_(None), ai_explanation.is_(None)),
+            sqlite_where=or_(risk_score.is_(None), ai_explanation.is_(None)),
+        ),
+    )
     
 
 
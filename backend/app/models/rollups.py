@@ -0,0 +1,28 @@
+# backend/app/models/rollups.py
+
+from sqlalchemy import Column, Integer, String, Date
+from app.db.base import Base
+
+
+class EventDailyCount(Base):
+    """
+    Number of source events per day and event_type, kept up to date at
+    ingest time (see services/rollup_service.py).
+    """
+    __tablename__ = "event_daily_counts"
+
+    day = Column(Date, primary_key=True)
+    event_type = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+
+class FindingDailyCount(Base):
+    """
+    Number of findings per day (of created_at) and severity, kept up to date
+    by the rules engine.
+    """
+    __tablename__ = "finding_daily_counts"
+
+    day = Column(Date, primary_key=True)
+    severity = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
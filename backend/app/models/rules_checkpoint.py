@@ -0,0 +1,23 @@
+# backend/app/models/rules_checkpoint.py
+
+from sqlalchemy import Column, Integer, String, DateTime, LargeBinary
+from app.db.base import Base
+from datetime import datetime
+
+
+class RulesCheckpoint(Base):
+    """
+    Progress of a streaming rules engine (services/rules/streaming.py):
+    the id high-water mark of the events it has consumed, committed with
+    each batch's findings, and a periodic snapshot of its window counters
+    taken at state_high_water_mark.
+    """
+    __tablename__ = "rules_checkpoints"
+
+    name = Column(String, primary_key=True)
+    high_water_mark = Column(Integer, nullable=False, default=0)
+    # zlib-compressed WindowCounters.to_state() output
+    state = Column(LargeBinary, nullable=True)
+    state_high_water_mark = Column(Integer, nullable=True)
+    state_saved_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow)
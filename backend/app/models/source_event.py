@@ -1,17 +1,37 @@
 # backend/app/models/source_event.py
 
-from sqlalchemy import Column , Integer , String , DateTime , JSON , Boolean
+from sqlalchemy import Column , Integer , String , DateTime , JSON , Boolean , Index
 from app.db.base import Base
 from datetime import datetime
 
 class SourceEvent(Base):
     __tablename__= "source_events"
 
-    id = Column(Integer , primary_key=True , index=True )
-    event_type= Column(String , index=True) 
-    user = Column(String , index=True)
+    id = Column(Integer , primary_key=True)
+    event_type= Column(String)
+    user = Column(String)
     raw_data= Column(JSON)
     timestamp = Column(DateTime , default= datetime.utcnow)
-    processed = Column(Boolean , default=False , index=True)
+    processed = Column(Boolean , default=False)
+
+    # Indexes follow the hot query shapes (see alembic/versions/0002_*)
+    __table_args__ = (
+        # (timestamp, id) keyset walks of the rules engine and /events
+        Index("ix_source_events_timestamp_id", "timestamp", "id"),
+        # rule window counts: user + event_type + timestamp range
+        Index(
+            "ix_source_events_user_type_timestamp", "user", "event_type", "timestamp"
+        ),
+        # /events?event_type=... newest first
+        Index("ix_source_events_type_timestamp", "event_type", "timestamp"),
+        # the rules engine's backlog: only the (few) unprocessed rows
+        Index(
+            "ix_source_events_unprocessed",
+            "timestamp",
+            "id",
+            postgresql_where=processed == False,
+            sqlite_where=processed == False,
+        ),
+    )
 
     
\ No newline at end of file
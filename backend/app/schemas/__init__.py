@@ -1,3 +1,4 @@
-from app.schemas.source_event import SourceEvent, SourceEventCreate , SourceEventFilter
+from app.schemas.source_event import SourceEvent, SourceEventCreate , SourceEventFilter , BulkIngestResult
 from app.schemas.finding import Finding, FindingCreate , FindingFilter
-from app.schemas.stats import StatsSummary
\ No newline at end of file
+from app.schemas.stats import StatsSummary , AICacheStats
+from app.schemas.enrichment_job import EnrichmentJob, EnrichmentJobCreate
\ No newline at end of file
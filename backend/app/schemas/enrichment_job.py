@@ -0,0 +1,28 @@
+# backend/app/schemas/enrichment_job.py
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Optional, List
+
+class EnrichmentJobCreate(BaseModel):
+    # Explicit findings to (re-)enrich; otherwise up to `limit` findings
+    # missing risk_score or ai_explanation
+    finding_ids: Optional[List[int]] = None
+    limit: int = Field(500, ge=1, le=10_000)
+    # Findings per LLM request (default: AI_BATCH_SIZE)
+    batch_size: Optional[int] = Field(None, ge=1, le=50)
+
+class EnrichmentJob(BaseModel):
+    id: int
+    status: str
+    total: int
+    enriched: int
+    failed: int
+    batches_total: int
+    batches_done: int
+    batches_failed: int
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
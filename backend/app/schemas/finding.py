@@ -18,6 +18,11 @@ class FindingCreate(FindingBase):
 class Finding(FindingBase):
     id:int
     created_at:datetime
+    # repeats folded into this finding within its suppression window
+    occurrence_count: int = 1
+    first_seen: Optional[datetime] = None
+    last_seen: Optional[datetime] = None
+    sample_event_id: Optional[int] = None
 
     
     class Config:
@@ -33,6 +38,11 @@ class FindingFilter(BaseModel):
 
 class PaginatedFindings(BaseModel):
     items: List[Finding]
-    total: int
+    # None when it is not counted and no cheap estimate exists
+    total: Optional[int] = None
     page: int
     page_size: int
+    # False when total is an estimate or None (ask for include_total=true to count)
+    total_exact: bool = True
+    # Pass as ?cursor= to get the next page; None on the last page
+    next_cursor: Optional[str] = None
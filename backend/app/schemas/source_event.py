@@ -1,8 +1,8 @@
 # backend/app/schemas/source_event.py
 
-from pydantic import BaseModel
-from datetime import datetime
-from typing import Any, Optional
+from pydantic import BaseModel, field_validator
+from datetime import datetime, timezone
+from typing import Any, List, Optional
 
 class SourceEventBase(BaseModel):
     event_type: str
@@ -10,7 +10,16 @@ class SourceEventBase(BaseModel):
     raw_data :Any
 
 class SourceEventCreate(SourceEventBase):
-    pass
+    # When the event happened; defaults to the ingestion time
+    timestamp: Optional[datetime] = None
+
+    @field_validator("timestamp")
+    @classmethod
+    def _to_naive_utc(cls, value: Optional[datetime]) -> Optional[datetime]:
+        # stored as naive UTC, like every other timestamp of the schema
+        if value is not None and value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
 
 class SourceEvent(SourceEventBase):
     id: int
@@ -25,4 +34,17 @@ class SourceEventFilter(BaseModel):
     from_timestamp: Optional[datetime] = None
     to_timestamp: Optional[datetime] = None
     limit: int = 50
-    offset: int = 0
\ No newline at end of file
+    offset: int = 0
+    # next page token from the X-Next-Cursor header (replaces offset)
+    cursor: Optional[str] = None
+    # also count the matches (X-Total-Count header)
+    include_total: bool = False
+
+class BulkIngestError(BaseModel):
+    index: int
+    detail: str
+
+class BulkIngestResult(BaseModel):
+    accepted: int
+    rejected: int
+    errors: List[BulkIngestError] = []
@@ -16,3 +16,11 @@ class StatsSummary(BaseModel):
     total_findings: int
     findings_by_severity: FindingsBySeverity
     events_over_time: List[EventOverTime]
+
+class AICacheStats(BaseModel):
+    hits: int
+    misses: int
+    hit_rate: float
+    stores: int
+    evictions: int
+    entries: int
@@ -0,0 +1,234 @@
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, insert, or_, update
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.models import Finding, SourceEvent
+from app.schemas.source_event import SourceEventFilter
+from app.services.events_service import query_events
+from app.services.findings_service import query_findings
+from app.services.log_generator import EVENT_TYPES, generate_fake_events_batch
+from app.services.rules.rules_engine import _count_events, _iter_event_chunks
+
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+# Before / after the query-shape indexes
+REVISIONS = {"before": "0001", "after": "0002"}
+SEVERITIES = ["low", "medium", "high", "critical"]
+INSERT_BATCH = 5000
+
+
+def _alembic_config(db_url: str) -> Config:
+    config = Config(str(ALEMBIC_INI))
+    config.set_main_option("script_location", str(ALEMBIC_INI.parent / "alembic"))
+    config.set_main_option("sqlalchemy.url", db_url)
+    return config
+
+
+def _timed(func: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def _insert_rows(session: Session, model, rows: List[dict]) -> float:
+    """
+    Inserts rows in INSERT_BATCH chunks; returns rows per second.
+    """
+    elapsed = 0.0
+    for start in range(0, len(rows), INSERT_BATCH):
+        chunk = rows[start : start + INSERT_BATCH]
+
+        def write():
+            session.execute(insert(model), chunk)
+            session.commit()
+
+        elapsed += _timed(write)
+    return len(rows) / elapsed if elapsed else 0.0
+
+
+def _make_data(n_events: int, n_findings: int, users: int, seed: int):
+    random.seed(seed)
+    now = datetime.utcnow()
+    user_names = [f"user{i}" for i in range(users)]
+    events = generate_fake_events_batch(n_events)
+    for event in events:
+        event["user"] = random.choice(user_names)
+        # the rules engine keeps the unprocessed backlog small
+        event["processed"] = random.random() > 0.02
+    findings = [
+        {
+            "rule_name": "benchmark_rule",
+            "severity": random.choice(SEVERITIES),
+            "description": f"Benchmark finding {i} for {user}",
+            "user": user,
+            "created_at": now - timedelta(minutes=random.randint(0, 60 * 24 * 30)),
+            "risk_score": None if random.random() < 0.05 else random.random() * 100,
+            "ai_explanation": None,
+        }
+        for i, user in enumerate(random.choices(user_names, k=n_findings))
+    ]
+    for finding in findings:
+        if finding["risk_score"] is not None:
+            finding["ai_explanation"] = "benchmark"
+    return events, findings, user_names
+
+
+def _query_suite(session: Session, user_names: List[str]) -> Dict[str, Callable]:
+    now = datetime.utcnow()
+
+    def count_events():
+        for user in user_names[:50]:
+            _count_events(session, user, EVENT_TYPES[0], now - timedelta(days=1))
+
+    def unprocessed_chunk():
+        next(_iter_event_chunks(session, 1000), None)
+
+    def events_by_type():
+        query_events(session, SourceEventFilter(event_type=EVENT_TYPES[1], limit=50))
+
+    def events_by_user():
+        query_events(session, SourceEventFilter(user=user_names[1], limit=50))
+
+    def findings_by_severity():
+        query_findings(session, 1, 20, "critical", None, None, None)
+
+    def findings_by_user():
+        query_findings(session, 1, 20, None, user_names[2], None, None)
+
+    def unenriched_findings():
+        session.query(Finding.id).filter(
+            or_(Finding.risk_score.is_(None), Finding.ai_explanation.is_(None))
+        ).order_by(Finding.id.asc()).limit(100).all()
+
+    return {
+        "rules._count_events x50": count_events,
+        "rules unprocessed chunk": unprocessed_chunk,
+        "query_events event_type": events_by_type,
+        "query_events user": events_by_user,
+        "query_findings severity": findings_by_severity,
+        "query_findings user": findings_by_user,
+        "enrich_missing select": unenriched_findings,
+    }
+
+
+def run_benchmark(
+    db_url: str,
+    revision: str,
+    events: List[dict],
+    findings: List[dict],
+    user_names: List[str],
+    repeat: int,
+) -> Dict[str, float]:
+    """
+    Migrates an empty database to `revision`, loads the data and times the
+    inserts and the hot queries. Query results are median milliseconds.
+    """
+    command.upgrade(_alembic_config(db_url), revision)
+    engine = create_engine(db_url)
+    session = sessionmaker(bind=engine)()
+    try:
+        results = {
+            "insert events/s": _insert_rows(session, SourceEvent, events),
+            "insert findings/s": _insert_rows(session, Finding, findings),
+        }
+
+        def mark_processed():
+            # the rules engine's bulk UPDATE of a processed chunk
+            session.execute(
+                update(SourceEvent)
+                .where(SourceEvent.id.in_(range(1, 1001)))
+                .values(processed=True)
+            )
+            session.rollback()
+
+        results["mark 1000 processed ms"] = _timed(mark_processed) * 1000
+
+        for name, query in _query_suite(session, user_names).items():
+            query()  # warm up
+            timings = [_timed(query) for _ in range(repeat)]
+            results[f"{name} ms"] = statistics.median(timings) * 1000
+        return results
+    finally:
+        session.close()
+        engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark insert and query throughput before and after "
+        "the query-shape index migration (alembic 0001 vs 0002)."
+    )
+    parser.add_argument(
+        "--events",
+        type=int,
+        default=200_000,
+        help="Events to insert (default: 200000)",
+    )
+    parser.add_argument(
+        "--findings",
+        type=int,
+        default=50_000,
+        help="Findings to insert (default: 50000)",
+    )
+    parser.add_argument(
+        "--users",
+        type=int,
+        default=1000,
+        help="Distinct users (default: 1000)",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=5,
+        help="Runs per query; the median is reported (default: 5)",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=42,
+        help="Random seed (default: 42)",
+    )
+    parser.add_argument(
+        "--db-url",
+        default=None,
+        help="Empty database to run against, e.g. a scratch PostgreSQL database "
+        "(its tables are dropped in between). Default: temporary SQLite files",
+    )
+    args = parser.parse_args()
+
+    events, findings, user_names = _make_data(
+        args.events, args.findings, args.users, args.seed
+    )
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, revision in REVISIONS.items():
+            db_url = args.db_url or f"sqlite:///{os.path.join(tmp, label + '.db')}"
+            if args.db_url:
+                command.downgrade(_alembic_config(db_url), "base")
+            print(f"Running '{label}' (alembic {revision}) ...")
+            results[label] = run_benchmark(
+                db_url, revision, events, findings, user_names, args.repeat
+            )
+        if args.db_url:
+            command.downgrade(_alembic_config(args.db_url), "base")
+
+    print(f"\n{'metric':<34}{'before':>12}{'after':>12}{'change':>10}")
+    for metric, before in results["before"].items():
+        after = results["after"][metric]
+        # throughput: higher is better; timings: lower is better
+        ratio = after / before if metric.endswith("/s") else before / after
+        print(f"{metric:<34}{before:>12.1f}{after:>12.1f}{ratio:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import argparse
+import os
+import socket
+import time
+
+from app.core import metrics
+from app.core.config import settings
+from app.db.session import SessionLocal, engine
+from app.db.base import Base
+from app.services.enrichment_jobs import (
+    run_enrichment_worker_once,
+    submit_enrichment_job,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Background AI enrichment worker: claims queued enrichment "
+        "job batches (leased, so several workers can run side by side) and "
+        "writes risk_score/ai_explanation."
+    )
+    parser.add_argument(
+        "--worker-id",
+        default=f"{socket.gethostname()}-{os.getpid()}",
+        help="Name recorded on leased batches (default: host-pid)",
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=None,
+        help="Seconds to wait when there is nothing to do "
+        "(default: ENRICH_POLL_SECONDS)",
+    )
+    parser.add_argument(
+        "--auto-submit",
+        action="store_true",
+        help="When idle, queue a job for findings still missing enrichment, "
+        "so enrichment runs continuously",
+    )
+    parser.add_argument(
+        "--once",
+        action="store_true",
+        help="Exit as soon as the queue is empty instead of polling",
+    )
+    parser.add_argument(
+        "--metrics-file",
+        default=None,
+        help="Rewrite this file with the worker's Prometheus metrics (LLM "
+        "latency, tokens, fallbacks) after every batch, e.g. for "
+        "node_exporter's textfile collector",
+    )
+    args = parser.parse_args()
+    poll_interval = args.poll_interval or settings.ENRICH_POLL_SECONDS
+
+    Base.metadata.create_all(bind=engine)
+    metrics.install_sqlalchemy_hooks()
+    write_metrics = args.metrics_file is not None and metrics.ENABLED
+
+    db = SessionLocal()
+    processed = 0
+    try:
+        while True:
+            with metrics.scope("enrich_worker"):
+                result = run_enrichment_worker_once(db, args.worker_id)
+            if result is not None:
+                processed += 1
+                if write_metrics:
+                    metrics.write_textfile(args.metrics_file)
+                continue
+            if args.auto_submit:
+                job = submit_enrichment_job(db)
+                if job is not None:
+                    print(f"Queued enrichment job {job.id} for {job.total} findings.")
+                    continue
+            if args.once:
+                break
+            time.sleep(poll_interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        db.close()
+        print(f"Worker {args.worker_id} processed {processed} batches.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+SEVERITY_SCORES = {"low": 25, "medium": 55, "high": 80, "critical": 95}
+
+
+def _answer(prompt: str, drop_rate: float) -> str:
+    """
+    Single prompts end with "Finding JSON:\n{...}" and get one object back;
+    batch prompts end with "Findings JSON:\n[...]" and get an array, from
+    which a `drop_rate` fraction of the items is left out.
+    """
+    if "Findings JSON:\n" in prompt:
+        findings = json.loads(prompt.rpartition("Findings JSON:\n")[2])
+        return json.dumps(
+            [
+                {"id": finding["id"], **_score(finding)}
+                for finding in findings
+                if random.random() >= drop_rate
+            ]
+        )
+    return json.dumps(_score(json.loads(prompt.rpartition("Finding JSON:\n")[2])))
+
+
+def _score(finding: dict) -> dict:
+    score = SEVERITY_SCORES.get(str(finding.get("severity", "")).lower(), 40)
+    return {
+        "risk_score": score,
+        "explanation": (
+            f"Stub assessment of {finding.get('rule_name')} for user "
+            f"{finding.get('user')}: severity {finding.get('severity')}."
+        ),
+    }
+
+
+def create_app(
+    latency: float,
+    error_rate: float,
+    rate_limit_rate: float,
+    drop_rate: float = 0.0,
+) -> FastAPI:
+    app = FastAPI(title="OpenAI stub")
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        if latency:
+            # Non-blocking, so concurrent requests overlap like they would upstream.
+            await asyncio.sleep(latency)
+        roll = random.random()
+        if roll < rate_limit_rate:
+            return JSONResponse(
+                status_code=429,
+                headers={"retry-after": "0"},
+                content={"error": {"message": "Rate limit reached", "type": "requests"}},
+            )
+        if roll < rate_limit_rate + error_rate:
+            return JSONResponse(
+                status_code=500,
+                content={"error": {"message": "Stub server error", "type": "server"}},
+            )
+
+        prompt = body["messages"][-1]["content"]
+        content = _answer(prompt, drop_rate)
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": {
+                "prompt_tokens": len(prompt) // 4,
+                "completion_tokens": len(content) // 4,
+                "total_tokens": (len(prompt) + len(content)) // 4,
+            },
+        }
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Local stand-in for the OpenAI chat completions API, "
+        "for offline AI enrichment runs (set OPENAI_BASE_URL=http://HOST:PORT/v1)."
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.5,
+        help="Seconds each completion takes (default: 0.5)",
+    )
+    parser.add_argument(
+        "--error-rate",
+        type=float,
+        default=0.0,
+        help="Fraction of requests answered with HTTP 500",
+    )
+    parser.add_argument(
+        "--rate-limit-rate",
+        type=float,
+        default=0.0,
+        help="Fraction of requests answered with HTTP 429",
+    )
+    parser.add_argument(
+        "--drop-rate",
+        type=float,
+        default=0.0,
+        help="Fraction of items left out of batch answers",
+    )
+    args = parser.parse_args()
+
+    app = create_app(
+        args.latency, args.error_rate, args.rate_limit_rate, args.drop_rate
+    )
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
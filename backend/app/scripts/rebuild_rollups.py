@@ -0,0 +1,31 @@
+import argparse
+import time
+
+from app.db.session import SessionLocal, engine
+from app.db.base import Base
+from app.services.rollup_service import rebuild_rollups
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Recompute the daily event/finding rollup tables behind "
+        "/stats/summary from source_events and findings."
+    )
+    parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        event_rows, finding_rows = rebuild_rollups(db)
+        print(
+            f"Rebuilt {event_rows} daily event counts and {finding_rows} daily "
+            f"finding counts in {time.perf_counter() - started:.2f}s."
+        )
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import argparse
+
+from app.db.session import SessionLocal, engine
+from app.db.base import Base
+from app.services.event_partitions import (
+    apply_retention,
+    precreate_partitions,
+    sync_partition_catalog,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Archive and drop source_events day partitions older than "
+        "the retention period."
+    )
+    parser.add_argument(
+        "--days",
+        type=int,
+        default=None,
+        help="Keep this many days of events (default: EVENT_RETENTION_DAYS)",
+    )
+    parser.add_argument(
+        "--archive-dir",
+        default=None,
+        help="Where the NDJSON.gz archives go (default: EVENT_ARCHIVE_DIR)",
+    )
+    parser.add_argument(
+        "--no-archive",
+        action="store_true",
+        help="Drop expired days without writing an archive",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Only list the days that would be archived/dropped",
+    )
+    parser.add_argument(
+        "--sync-catalog",
+        action="store_true",
+        help="First add days found in source_events to the partition catalog "
+        "(needed once for events stored before partitioning)",
+    )
+    parser.add_argument(
+        "--precreate",
+        type=int,
+        default=0,
+        help="Also create the partitions of the next N days (PostgreSQL)",
+    )
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+
+    db = SessionLocal()
+    try:
+        if args.sync_catalog:
+            added = sync_partition_catalog(db)
+            print(f"Added {added} days to the partition catalog.")
+        if args.precreate:
+            precreate_partitions(db, args.precreate)
+
+        results = apply_retention(
+            db,
+            retention_days=args.days,
+            archive=not args.no_archive,
+            archive_dir=args.archive_dir,
+            dry_run=args.dry_run,
+        )
+        for result in results:
+            if result.action == "skipped":
+                print(f"{result.day}: skipped ({result.reason})")
+            elif args.dry_run:
+                print(f"{result.day}: would be {result.action}")
+            elif result.archive_path:
+                print(
+                    f"{result.day}: archived {result.rows} events "
+                    f"to {result.archive_path}"
+                )
+            else:
+                print(f"{result.day}: {result.action} {result.rows} events")
+        if not results:
+            print("Nothing to retire.")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,125 @@
+import argparse
+from datetime import datetime, timedelta
+
+from app.core import metrics
 from app.db.session import SessionLocal, engine
 from app.db.base import Base
-from app.services.rules.rules_engine import run_rules_on_new_events
+from app.services.rules.parallel import run_rules_parallel
+from app.services.rules.rules_engine import (
+    TIME_MODES,
+    replay_rules,
+)
 
 
 def main():
+    parser = argparse.ArgumentParser(
+        description="Run the rules engine on new (unprocessed) SourceEvents."
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=None,
+        help="Events processed and committed per chunk (default: RULES_CHUNK_SIZE)",
+    )
+    parser.add_argument(
+        "--time-mode",
+        choices=TIME_MODES,
+        default=None,
+        help="Anchor rule windows to the wall clock or to event timestamps "
+        "(default: RULES_TIME_MODE)",
+    )
+    parser.add_argument(
+        "--allowed-lateness",
+        type=int,
+        default=None,
+        help="Event-time mode: seconds to wait for late events before processing "
+        "(default: RULES_ALLOWED_LATENESS_SECONDS)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Processes to spread the events over, partitioned by user (default: 1)",
+    )
+    parser.add_argument(
+        "--replay",
+        action="store_true",
+        help="Re-run the rules in event-time mode over a historical range "
+        "(requires --from and --to)",
+    )
+    parser.add_argument(
+        "--from",
+        dest="from_timestamp",
+        type=datetime.fromisoformat,
+        help="Replay start (ISO datetime, inclusive)",
+    )
+    parser.add_argument(
+        "--to",
+        dest="to_timestamp",
+        type=datetime.fromisoformat,
+        help="Replay end (ISO datetime, inclusive)",
+    )
+    parser.add_argument(
+        "--write",
+        action="store_true",
+        help="Replay only: insert the replayed findings (default is a dry run)",
+    )
+    parser.add_argument(
+        "--metrics-file",
+        default=None,
+        help="Write the run's Prometheus metrics (rule timings, SQL statements) "
+        "to this file, e.g. for node_exporter's textfile collector. With "
+        "--workers > 1 the worker processes' own timings are not included",
+    )
+
+    args = parser.parse_args()
+    if args.replay and (args.from_timestamp is None or args.to_timestamp is None):
+        parser.error("--replay requires --from and --to")
+
     Base.metadata.create_all(bind=engine)
+    metrics.install_sqlalchemy_hooks()
 
     db = SessionLocal()
     try:
-        processed_events, created_findings = run_rules_on_new_events(db)
-        print(
-            f"Processed {processed_events} new events, "
-            f"created {created_findings} findings."
-        )
+        with metrics.scope("run_rules"):
+            if args.replay:
+                replayed_events, by_rule = replay_rules(
+                    db,
+                    start=args.from_timestamp,
+                    end=args.to_timestamp,
+                    chunk_size=args.chunk_size,
+                    write=args.write,
+                )
+                # occurrences: repeats within a suppression window share a finding
+                action = "written" if args.write else "found (dry run)"
+                print(
+                    f"Replayed {replayed_events} events, "
+                    f"{sum(by_rule.values())} finding occurrences {action}."
+                )
+                for rule_name, count in sorted(by_rule.items()):
+                    print(f"  {rule_name}: {count}")
+                return
+
+            allowed_lateness = (
+                timedelta(seconds=args.allowed_lateness)
+                if args.allowed_lateness is not None
+                else None
+            )
+            processed_events, created_findings = run_rules_parallel(
+                db,
+                workers=args.workers,
+                chunk_size=args.chunk_size,
+                time_mode=args.time_mode,
+                allowed_lateness=allowed_lateness,
+            )
+            print(
+                f"Processed {processed_events} new events, "
+                f"created {created_findings} findings."
+            )
     finally:
         db.close()
+        if args.metrics_file and metrics.ENABLED:
+            metrics.write_textfile(args.metrics_file)
 
 
 if __name__ == "__main__":
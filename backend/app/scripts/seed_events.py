@@ -1,7 +1,10 @@
 import argparse
+import random
+import time
 
 from app.db.session import SessionLocal, engine
 from app.db.base import Base
+from app.services.fast_log_generator import FastEventGenerator, write_event_chunks
 from app.services.log_generator import (
     generate_fake_events_batch,
     save_events_to_db,
@@ -18,6 +21,36 @@ def main():
         default=100,
         help="Number of fake events to generate (default: 100)",
     )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="Random seed, for reproducible data sets",
+    )
+    parser.add_argument(
+        "--fast",
+        action="store_true",
+        help="Vectorized generator (needs numpy) with bulk COPY/executemany "
+        "writes, for millions of events. Adds failed-login/MFA storms",
+    )
+    parser.add_argument(
+        "--users",
+        type=int,
+        default=1000,
+        help="--fast: distinct users (default: 1000)",
+    )
+    parser.add_argument(
+        "--days",
+        type=int,
+        default=30,
+        help="--fast: spread the events over the last N days (default: 30)",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=100_000,
+        help="--fast: events generated and committed at a time (default: 100000)",
+    )
 
     args = parser.parse_args()
 
@@ -26,6 +59,19 @@ def main():
 
     db = SessionLocal()
     try:
+        if args.fast:
+            generator = FastEventGenerator(
+                seed=args.seed, users=args.users, days=args.days
+            )
+            start = time.perf_counter()
+            written = 0
+            for rows in write_event_chunks(db, generator.chunks(args.n, args.chunk_size)):
+                written += rows
+                elapsed = time.perf_counter() - start
+                print(f"{written}/{args.n} events ({written / elapsed:,.0f}/s)")
+            return
+
+        random.seed(args.seed)
         events = generate_fake_events_batch(args.n)
         save_events_to_db(events, db)
         print(f"Inserted {len(events)} fake events into the database.")
@@ -0,0 +1,87 @@
+import argparse
+import signal
+import threading
+from datetime import timedelta
+
+from app.core import metrics
+from app.db.session import SessionLocal
+from app.services.rules.streaming import DEFAULT_CHECKPOINT, StreamingRulesEngine
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Streaming rules engine: evaluates new SourceEvents as they "
+        "are ingested, keeping rule windows in memory and checkpointing "
+        "progress in rules_checkpoints."
+    )
+    parser.add_argument(
+        "--name",
+        default=DEFAULT_CHECKPOINT,
+        help=f"Checkpoint to resume from (default: {DEFAULT_CHECKPOINT})",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=None,
+        help="Events per batch (default: RULES_STREAM_BATCH_SIZE)",
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=None,
+        help="Seconds between polls when caught up (default: RULES_STREAM_POLL_SECONDS)",
+    )
+    parser.add_argument(
+        "--checkpoint-interval",
+        type=float,
+        default=None,
+        help="Seconds between window state checkpoints "
+        "(default: RULES_STREAM_CHECKPOINT_SECONDS)",
+    )
+    parser.add_argument(
+        "--allowed-lateness",
+        type=int,
+        default=None,
+        help="Seconds of window state kept for late events "
+        "(default: RULES_ALLOWED_LATENESS_SECONDS)",
+    )
+    parser.add_argument(
+        "--metrics-file",
+        default=None,
+        help="Write the Prometheus metrics to this file at each checkpoint and on exit",
+    )
+    args = parser.parse_args()
+
+    stop = threading.Event()
+    # Ctrl+C and SIGTERM (e.g. docker stop) exit with a final checkpoint
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop.set())
+    metrics.install_sqlalchemy_hooks()
+
+    engine = StreamingRulesEngine(
+        name=args.name,
+        batch_size=args.batch_size,
+        checkpoint_interval=args.checkpoint_interval,
+        allowed_lateness=(
+            timedelta(seconds=args.allowed_lateness)
+            if args.allowed_lateness is not None
+            else None
+        ),
+        on_checkpoint=(
+            (lambda: metrics.write_textfile(args.metrics_file))
+            if args.metrics_file and metrics.ENABLED
+            else None
+        ),
+    )
+
+    db = SessionLocal()
+    try:
+        print(f"Streaming rules engine '{args.name}' started.")
+        events, findings = engine.run(db, stop, poll_interval=args.poll_interval)
+    finally:
+        db.close()
+    print(f"Processed {events} events, created {findings} findings.")
+
+
+if __name__ == "__main__":
+    main()
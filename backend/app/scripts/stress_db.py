@@ -0,0 +1,192 @@
+import argparse
+import multiprocessing
+import os
+import statistics
+import tempfile
+import time
+from typing import Dict, List
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.db.session import make_engine, sqlite_pragmas
+from app.schemas.source_event import SourceEventFilter
+from app.services.events_service import insert_events_bulk, query_events_page
+from app.services.findings_service import query_findings
+from app.services.log_generator import generate_fake_events_batch
+from app.services.rules.rules_engine import run_rules_on_new_events
+from app.services.stats_service import get_summary_stats
+
+# SQLite as configured before the engine factory: rollback journal, full
+# fsync, and the 5 s lock wait of Python's sqlite3 module
+LEGACY_PRAGMAS = {"journal_mode": "delete", "synchronous": "full", "busy_timeout": 5000}
+
+
+def _writer(db_url: str, pragmas: Dict, stop, batch: int, results) -> None:
+    """
+    Process entry point (a separate process, like scripts/run_rules.py):
+    ingests `batch` events and runs the rules engine over them, in a loop.
+    """
+    engine = make_engine(db_url, pragmas=pragmas)
+    db = sessionmaker(bind=engine, autoflush=False)()
+    stats = {"events": 0, "rules_runs": 0, "errors": 0}
+    try:
+        while not stop.is_set():
+            try:
+                stats["events"] += insert_events_bulk(
+                    db, generate_fake_events_batch(batch)
+                )
+                run_rules_on_new_events(db)
+                stats["rules_runs"] += 1
+            except OperationalError:
+                db.rollback()
+                stats["errors"] += 1
+    finally:
+        db.close()
+        engine.dispose()
+        results.put(stats)
+
+
+def _reader(db_url: str, pragmas: Dict, stop, results) -> None:
+    """
+    Process entry point: cycles through the dashboard queries on a read-only
+    engine and reports each one's latency (and the failed ones').
+    """
+    engine = make_engine(db_url, read_only=True, pragmas={**pragmas, "query_only": "ON"})
+    ReadSession = sessionmaker(bind=engine, autoflush=False)
+    latencies: List[float] = []
+    errors: List[float] = []
+    queries = [
+        lambda db: query_events_page(db, SourceEventFilter(limit=50)),
+        lambda db: query_findings(db, 1, 20, None, None, None, None),
+        lambda db: get_summary_stats(db),
+    ]
+    i = 0
+    while not stop.is_set():
+        db = ReadSession()
+        start = time.perf_counter()
+        try:
+            queries[i % len(queries)](db)
+            latencies.append(time.perf_counter() - start)
+        except OperationalError:
+            errors.append(time.perf_counter() - start)
+        finally:
+            db.close()
+        i += 1
+    engine.dispose()
+    results.put((latencies, errors))
+
+
+def run_stress(
+    db_url: str,
+    pragmas: Dict,
+    seconds: float,
+    readers: int,
+    batch: int,
+    seed_events: int,
+) -> Dict[str, float]:
+    """
+    One writer process (ingest + rules engine) against `readers` dashboard
+    reader processes for `seconds`; returns read throughput/latency and
+    write throughput.
+    """
+    engine = make_engine(db_url, pragmas=pragmas)
+    try:
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine, autoflush=False)()
+        try:
+            insert_events_bulk(db, generate_fake_events_batch(seed_events))
+            run_rules_on_new_events(db)
+        finally:
+            db.close()
+    finally:
+        engine.dispose()
+
+    context = multiprocessing.get_context("spawn")
+    stop = context.Event()
+    write_results = context.Queue()
+    read_results = context.Queue()
+    processes = [
+        context.Process(target=_writer, args=(db_url, pragmas, stop, batch, write_results))
+    ]
+    processes += [
+        context.Process(target=_reader, args=(db_url, pragmas, stop, read_results))
+        for _ in range(readers)
+    ]
+    for process in processes:
+        process.start()
+    time.sleep(seconds)
+    stop.set()
+    write_stats = write_results.get()
+    latencies: List[float] = []
+    errors: List[float] = []
+    for _ in range(readers):
+        reader_latencies, reader_errors = read_results.get()
+        latencies += reader_latencies
+        errors += reader_errors
+    for process in processes:
+        process.join()
+
+    latencies.sort()
+    if not latencies:
+        latencies = [0.0]
+    return {
+        "reads/s": len(latencies) / seconds,
+        "read p50 ms": statistics.median(latencies) * 1000,
+        "read p99 ms": latencies[int((len(latencies) - 1) * 0.99)] * 1000,
+        "read max ms": latencies[-1] * 1000,
+        "read lock errors": len(errors),
+        "events written/s": write_stats["events"] / seconds,
+        "rules runs": write_stats["rules_runs"],
+        "write lock errors": write_stats["errors"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Stress SQLite with one ingest + rules writer and concurrent "
+        "dashboard readers, with the legacy and the tuned connection settings."
+    )
+    parser.add_argument(
+        "--seconds",
+        type=float,
+        default=15,
+        help="Duration of each run (default: 15)",
+    )
+    parser.add_argument(
+        "--readers",
+        type=int,
+        default=4,
+        help="Concurrent reader processes (default: 4)",
+    )
+    parser.add_argument(
+        "--batch",
+        type=int,
+        default=2000,
+        help="Events the writer ingests before each rules run (default: 2000)",
+    )
+    parser.add_argument(
+        "--seed-events",
+        type=int,
+        default=50_000,
+        help="Events loaded before the run (default: 50000)",
+    )
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, pragmas in (("legacy", LEGACY_PRAGMAS), ("tuned", sqlite_pragmas())):
+            db_url = f"sqlite:///{os.path.join(tmp, label + '.db')}"
+            print(f"Running '{label}' ({args.seconds:g}s, {args.readers} readers) ...")
+            results[label] = run_stress(
+                db_url, pragmas, args.seconds, args.readers, args.batch, args.seed_events
+            )
+
+    print(f"\n{'metric':<22}{'legacy':>12}{'tuned':>12}")
+    for metric, legacy in results["legacy"].items():
+        print(f"{metric:<22}{legacy:>12.1f}{results['tuned'][metric]:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
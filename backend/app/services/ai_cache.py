@@ -0,0 +1,206 @@
+# backend/app/services/ai_cache.py
+
+import hashlib
+import json
+import re
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import AICacheEntry
+
+# Bump when the enrichment prompt changes, so old answers stop matching.
+PROMPT_VERSION = 1
+# Keys per IN (...) lookup
+LOOKUP_BATCH_SIZE = 500
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _normalize(value: Optional[str]) -> str:
+    return _WHITESPACE.sub(" ", (value or "").strip())
+
+
+def enrichment_cache_key(
+    rule_name: Optional[str],
+    severity: Optional[str],
+    description: Optional[str],
+    user: Optional[str],
+    model: Optional[str] = None,
+) -> str:
+    """
+    sha256 of the prompt fields that decide the answer. The finding id is left
+    out on purpose: it is in the prompt but unique per finding.
+    """
+    payload = {
+        "v": PROMPT_VERSION,
+        "model": model or settings.OPENAI_MODEL,
+        "rule_name": _normalize(rule_name),
+        "severity": _normalize(severity).lower(),
+        "description": _normalize(description),
+        "user": _normalize(user),
+    }
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class EnrichmentCache:
+    """
+    DB-backed cache of (risk_score, explanation) results with a TTL and LRU
+    eviction once it holds more than max_entries rows.
+
+    Reads and writes go through the caller's session and are committed with
+    the caller's transaction. Hit/miss counters are per process.
+    """
+
+    def __init__(
+        self,
+        ttl: Optional[timedelta] = None,
+        max_entries: Optional[int] = None,
+    ):
+        self.ttl = ttl or timedelta(seconds=settings.AI_CACHE_TTL_SECONDS)
+        self.max_entries = max_entries or settings.AI_CACHE_MAX_ENTRIES
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def _count(self, **counters: int) -> None:
+        with self._lock:
+            for name, value in counters.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def get_many(
+        self,
+        db: Session,
+        keys: Iterable[str],
+    ) -> Dict[str, Tuple[float, str]]:
+        """
+        Returns {key: (risk_score, explanation)} for the keys with a live
+        entry. Read-only: call touch() for the hits afterwards, so no write
+        transaction is held while the misses go to the LLM.
+        """
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return {}
+        now = datetime.utcnow()
+        found: Dict[str, Tuple[float, str]] = {}
+        for start in range(0, len(keys), LOOKUP_BATCH_SIZE):
+            batch = keys[start : start + LOOKUP_BATCH_SIZE]
+            rows = db.execute(
+                select(
+                    AICacheEntry.key,
+                    AICacheEntry.risk_score,
+                    AICacheEntry.explanation,
+                ).where(
+                    AICacheEntry.key.in_(batch),
+                    AICacheEntry.created_at >= now - self.ttl,
+                )
+            ).all()
+            for key, risk_score, explanation in rows:
+                found[key] = (risk_score, explanation)
+        self._count(hits=len(found), misses=len(keys) - len(found))
+        return found
+
+    def touch(self, db: Session, keys: Iterable[str]) -> None:
+        """
+        Marks entries as recently used (for LRU eviction).
+        """
+        keys = list(keys)
+        now = datetime.utcnow()
+        for start in range(0, len(keys), LOOKUP_BATCH_SIZE):
+            batch = keys[start : start + LOOKUP_BATCH_SIZE]
+            db.execute(
+                update(AICacheEntry)
+                .where(AICacheEntry.key.in_(batch))
+                .values(last_used_at=now, hits=AICacheEntry.hits + 1)
+                .execution_options(synchronize_session=False)
+            )
+
+    def put_many(
+        self,
+        db: Session,
+        results: Dict[str, Tuple[float, str]],
+        model: Optional[str] = None,
+    ) -> None:
+        """
+        Stores fresh results (replacing expired entries with the same key),
+        then evicts expired and least recently used entries if needed.
+        """
+        if not results:
+            return
+        now = datetime.utcnow()
+        keys = list(results)
+        # Write-only (no SELECT first), so a SQLite transaction never has to
+        # upgrade a read lock while another writer holds the database.
+        db.execute(
+            delete(AICacheEntry)
+            .where(AICacheEntry.key.in_(keys))
+            .execution_options(synchronize_session=False)
+        )
+        db.execute(
+            insert(AICacheEntry),
+            [
+                {
+                    "key": key,
+                    "risk_score": risk_score,
+                    "explanation": explanation,
+                    "model": model or settings.OPENAI_MODEL,
+                    "created_at": now,
+                    "last_used_at": now,
+                    "hits": 0,
+                }
+                for key, (risk_score, explanation) in results.items()
+            ],
+        )
+        self._count(stores=len(results))
+        self._evict(db, now)
+
+    def _evict(self, db: Session, now: datetime) -> None:
+        expired = db.execute(
+            delete(AICacheEntry).where(AICacheEntry.created_at < now - self.ttl)
+        ).rowcount
+        entries = db.scalar(select(func.count()).select_from(AICacheEntry)) or 0
+        overflow = entries - self.max_entries
+        evicted = 0
+        if overflow > 0:
+            oldest = (
+                select(AICacheEntry.key)
+                .order_by(AICacheEntry.last_used_at.asc())
+                .limit(overflow)
+            )
+            evicted = db.execute(
+                delete(AICacheEntry).where(AICacheEntry.key.in_(oldest))
+            ).rowcount
+        self._count(evictions=(expired or 0) + (evicted or 0))
+
+    def stats(self, db: Optional[Session] = None) -> dict:
+        lookups = self.hits + self.misses
+        result = {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "stores": self.stores,
+            "evictions": self.evictions,
+        }
+        if db is not None:
+            result["entries"] = (
+                db.scalar(select(func.count()).select_from(AICacheEntry)) or 0
+            )
+        return result
+
+
+# Process-wide cache used by ai_service
+enrichment_cache = EnrichmentCache()
+
+
+def cache_keys_for(findings: List) -> List[str]:
+    return [
+        enrichment_cache_key(f.rule_name, f.severity, f.description, f.user)
+        for f in findings
+    ]
@@ -4,29 +4,89 @@ from typing import List
 
 import json
 import os
-from typing import Tuple, Optional
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Tuple, Optional
 from sqlalchemy import or_
+from sqlalchemy.exc import SQLAlchemyError
 
 from sqlalchemy.orm import Session
 
+from app.core import metrics
+from app.core.config import settings
 from app.models import Finding as FindingModel
 from app.schemas.finding import Finding as FindingSchema
-
-from openai import OpenAI
+from app.services.ai_cache import cache_keys_for, enrichment_cache
+from app.services.rate_limiter import RateLimiter
+from app.services.response_cache import FINDINGS_NAMESPACE, bump_generations
+
+from openai import (
+    APIConnectionError,
+    InternalServerError,
+    OpenAI,
+    RateLimitError,
+)
+
+# Errors worth retrying: transient API failures and malformed model output
+RETRYABLE_ERRORS = (
+    APIConnectionError,  # includes timeouts
+    RateLimitError,
+    InternalServerError,
+    ValueError,  # includes json.JSONDecodeError
+    KeyError,
+)
+RETRY_BASE_DELAY_SECONDS = 0.5
+RETRY_MAX_DELAY_SECONDS = 20.0
+# Rough completion size used to charge the tokens-per-minute bucket
+COMPLETION_TOKENS_ESTIMATE = 150
+
+_client_lock = threading.Lock()
+_client: Optional[OpenAI] = None
+_client_key: Optional[Tuple[str, Optional[str]]] = None
+_rate_limiter: Optional[RateLimiter] = None
 
 
 def _get_openai_client() -> Optional[OpenAI]:
+    """
+    One client per process: it keeps a pooled HTTP connection and is safe to
+    share between threads. Retries are handled here, not by the SDK.
+    """
+    global _client, _client_key
     api_key = os.getenv("OPENAI_API_KEY")
     if not api_key:
         return None
-    return OpenAI(api_key=api_key)
+    key = (api_key, settings.OPENAI_BASE_URL)
+    with _client_lock:
+        if _client is None or _client_key != key:
+            _client = OpenAI(
+                api_key=api_key,
+                base_url=settings.OPENAI_BASE_URL,
+                timeout=settings.AI_TIMEOUT_SECONDS,
+                max_retries=0,
+            )
+            _client_key = key
+        return _client
 
 
-def _build_finding_prompt(finding: FindingModel) -> str:
-    """
-    Build a structured prompt for the LLM to produce risk_score + explanation.
-    """
-    base = {
+def _get_rate_limiter() -> RateLimiter:
+    global _rate_limiter
+    with _client_lock:
+        if _rate_limiter is None:
+            _rate_limiter = RateLimiter(
+                settings.AI_REQUESTS_PER_MINUTE, settings.AI_TOKENS_PER_MINUTE
+            )
+        return _rate_limiter
+
+
+def _estimate_tokens(prompt: str, answers: int = 1) -> int:
+    # ~4 characters per token for English/JSON text
+    return len(prompt) // 4 + COMPLETION_TOKENS_ESTIMATE * answers
+
+
+def _finding_payload(finding: FindingModel) -> dict:
+    return {
         "id": finding.id,
         "rule_name": finding.rule_name,
         "severity": finding.severity,
@@ -34,6 +94,13 @@ def _build_finding_prompt(finding: FindingModel) -> str:
         "user": finding.user,
     }
 
+
+def _build_finding_prompt(finding: FindingModel) -> str:
+    """
+    Build a structured prompt for the LLM to produce risk_score + explanation.
+    """
+    base = _finding_payload(finding)
+
     return (
         "You are a security and compliance risk analyst.\n"
         "You receive a finding from a GRC/log monitoring system.\n"
@@ -46,6 +113,26 @@ def _build_finding_prompt(finding: FindingModel) -> str:
     )
 
 
+def _build_batch_prompt(findings: List[FindingModel]) -> str:
+    """
+    Same task as _build_finding_prompt for several findings in one request;
+    the answer is a JSON array with one item per finding id.
+    """
+    base = [_finding_payload(f) for f in findings]
+
+    return (
+        "You are a security and compliance risk analyst.\n"
+        "You receive a list of findings from a GRC/log monitoring system.\n"
+        "For EACH finding you must:\n"
+        "1) Evaluate its risk on a scale of 0–100 (integer).\n"
+        "2) Provide a short explanation (2–3 sentences) in simple English.\n\n"
+        "Return ONLY a valid JSON array with one item per finding, in this shape:\n"
+        '[{ "id": <finding id>, "risk_score": <int from 0 to 100>, '
+        '"explanation": "<text>" }]\n\n'
+        f"Findings JSON:\n{json.dumps(base, indent=2)}"
+    )
+
+
 def _fallback_risk_and_explanation(finding: FindingModel) -> Tuple[float, str]:
     """
     If OPENAI_API_KEY is not set, use simple logic to create risk_score and explanation.
@@ -87,19 +174,7 @@ def _call_openai_for_finding(finding: FindingModel) -> Tuple[float, str]:
     if client is None:
         raise RuntimeError("OPENAI_API_KEY not configured")
 
-    prompt = _build_finding_prompt(finding)
-
-    # Example call to GPT-4 mini / 4.1 using the new client
-    completion = client.chat.completions.create(
-        model="gpt-4o-mini",  # Or any other model you have access to
-        messages=[
-            {"role": "system", "content": "You are a helpful security assistant."},
-            {"role": "user", "content": prompt},
-        ],
-        temperature=0.2,
-    )
-
-    content = completion.choices[0].message.content
+    content = _complete(client, _build_finding_prompt(finding))
     # Expected JSON – parsed
     data = json.loads(content)
 
@@ -111,6 +186,254 @@ def _call_openai_for_finding(finding: FindingModel) -> Tuple[float, str]:
     return risk_score, explanation
 
 
+def _complete(client: OpenAI, prompt: str, answers: int = 1) -> str:
+    _get_rate_limiter().acquire(_estimate_tokens(prompt, answers))
+    start = time.perf_counter()
+    try:
+        completion = client.chat.completions.create(
+            model=settings.OPENAI_MODEL,
+            messages=[
+                {"role": "system", "content": "You are a helpful security assistant."},
+                {"role": "user", "content": prompt},
+            ],
+            temperature=0.2,
+        )
+    except Exception as e:
+        if metrics.ENABLED:
+            metrics.LLM_REQUEST_SECONDS.observe(
+                time.perf_counter() - start, type(e).__name__
+            )
+        raise
+    if metrics.ENABLED:
+        metrics.LLM_REQUEST_SECONDS.observe(time.perf_counter() - start, "ok")
+        usage = completion.usage
+        if usage is not None:
+            metrics.LLM_TOKENS.inc("prompt", amount=usage.prompt_tokens or 0)
+            metrics.LLM_TOKENS.inc("completion", amount=usage.completion_tokens or 0)
+    return completion.choices[0].message.content
+
+
+def _parse_batch_item(item) -> Optional[Tuple[int, float, str]]:
+    """
+    (id, risk_score, explanation) for a well-formed array item, else None.
+    """
+    if not isinstance(item, dict):
+        return None
+    try:
+        finding_id = int(item["id"])
+        risk_score = float(item["risk_score"])
+        explanation = item["explanation"]
+    except (KeyError, TypeError, ValueError):
+        return None
+    if not isinstance(explanation, str) or not explanation.strip():
+        return None
+    if risk_score != risk_score:  # NaN
+        return None
+    return finding_id, max(0.0, min(100.0, risk_score)), explanation
+
+
+def _call_openai_for_batch(
+    findings: List[FindingModel],
+) -> Dict[int, Tuple[float, str]]:
+    """
+    Scores several findings with one request. Returns {finding id:
+    (risk_score, explanation)} for the valid items only; items that are
+    missing, malformed or for unknown ids are left out. Raises when the
+    answer is not a JSON array at all.
+    """
+    client = _get_openai_client()
+    if client is None:
+        raise RuntimeError("OPENAI_API_KEY not configured")
+
+    content = _complete(client, _build_batch_prompt(findings), answers=len(findings))
+    data = json.loads(content)
+    if isinstance(data, dict):
+        # Some models wrap the array, e.g. {"results": [...]}
+        data = next((v for v in data.values() if isinstance(v, list)), None)
+    if not isinstance(data, list):
+        raise ValueError("Expected a JSON array of results")
+
+    wanted = {f.id for f in findings}
+    results: Dict[int, Tuple[float, str]] = {}
+    for item in data:
+        parsed = _parse_batch_item(item)
+        if parsed is not None and parsed[0] in wanted:
+            results[parsed[0]] = parsed[1:]
+    return results
+
+
+def _retry_delay(attempt: int, error: Exception) -> float:
+    """
+    Exponential backoff with full jitter; honours Retry-After on 429s.
+    """
+    delay = random.uniform(
+        0, min(RETRY_MAX_DELAY_SECONDS, RETRY_BASE_DELAY_SECONDS * 2**attempt)
+    )
+    if isinstance(error, RateLimitError):
+        try:
+            delay = max(delay, float(error.response.headers.get("retry-after", 0)))
+        except (TypeError, ValueError):
+            pass
+    return delay
+
+
+def _call_openai_with_retries(finding: FindingModel) -> Tuple[float, str]:
+    max_retries = settings.AI_MAX_RETRIES
+    for attempt in range(max_retries + 1):
+        try:
+            return _call_openai_for_finding(finding)
+        except RETRYABLE_ERRORS as e:
+            if attempt == max_retries:
+                raise
+            time.sleep(_retry_delay(attempt, e))
+
+
+def _score_finding(finding: FindingModel) -> Optional[Tuple[float, str]]:
+    """
+    (risk_score, explanation) from OpenAI, or None if the call keeps failing.
+    """
+    try:
+        return _call_openai_with_retries(finding)
+    except Exception as e:
+        print(f"Error calling OpenAI for finding {finding.id}: {e}")
+        return None
+
+
+def _score_batch(findings: List[FindingModel]) -> List[Optional[Tuple[float, str]]]:
+    """
+    Scores a batch with one request per attempt. Items missing from (or
+    malformed in) an answer are sent again, in a smaller batch, on the next attempt;
+    whatever is still missing after AI_MAX_RETRIES is None.
+    """
+    results: Dict[int, Tuple[float, str]] = {}
+    remaining = findings
+    max_retries = settings.AI_MAX_RETRIES
+    for attempt in range(max_retries + 1):
+        try:
+            results.update(_call_openai_for_batch(remaining))
+        except RETRYABLE_ERRORS as e:
+            if attempt == max_retries:
+                print(f"Error calling OpenAI for a batch of {len(remaining)}: {e}")
+                break
+            time.sleep(_retry_delay(attempt, e))
+            continue
+        except Exception as e:
+            print(f"Error calling OpenAI for a batch of {len(remaining)}: {e}")
+            break
+        remaining = [f for f in remaining if f.id not in results]
+        if not remaining:
+            break
+    return [results.get(f.id) for f in findings]
+
+
+def _score_concurrently(
+    findings: List[FindingModel],
+    concurrency: Optional[int] = None,
+    batch_size: Optional[int] = None,
+) -> List[Optional[Tuple[float, str]]]:
+    if not findings:
+        return []
+    batch_size = max(1, batch_size or settings.AI_BATCH_SIZE)
+    if batch_size == 1:
+        units = [[f] for f in findings]
+
+        def score(unit: List[FindingModel]) -> List[Optional[Tuple[float, str]]]:
+            return [_score_finding(unit[0])]
+
+    else:
+        units = [
+            findings[start : start + batch_size]
+            for start in range(0, len(findings), batch_size)
+        ]
+        score = _score_batch
+
+    concurrency = max(1, min(concurrency or settings.AI_CONCURRENCY, len(units)))
+    if concurrency == 1:
+        scored = [score(unit) for unit in units]
+    else:
+        # Workers only read already-loaded attributes; the session stays on this thread.
+        with ThreadPoolExecutor(
+            max_workers=concurrency, thread_name_prefix="ai-enrich"
+        ) as executor:
+            scored = list(executor.map(score, units))
+    return [result for unit_results in scored for result in unit_results]
+
+
+def _count_failed(scored: List[Optional[Tuple[float, str]]]) -> None:
+    if metrics.ENABLED:
+        failed = sum(1 for result in scored if result is None)
+        if failed:
+            metrics.LLM_FALLBACKS.inc("error", amount=failed)
+
+
+def score_findings(
+    findings: List[FindingModel],
+    concurrency: Optional[int] = None,
+    db: Optional[Session] = None,
+    batch_size: Optional[int] = None,
+) -> List[Tuple[float, str]]:
+    """
+    Scores findings concurrently (up to AI_CONCURRENCY calls in flight, within
+    the process-wide rate limits). Results are in the order of `findings`;
+    each finding falls back to the heuristic on its own.
+
+    batch_size > 1 packs that many findings into each request
+    (default: AI_BATCH_SIZE).
+
+    With a session, identical findings are answered from the enrichment cache
+    and only one call is made per distinct prompt.
+    """
+    if not findings:
+        return []
+    if _get_openai_client() is None:
+        if metrics.ENABLED:
+            metrics.LLM_FALLBACKS.inc("no_client", amount=len(findings))
+        return [_fallback_risk_and_explanation(f) for f in findings]
+
+    use_cache = db is not None and settings.AI_CACHE_ENABLED
+    if not use_cache:
+        scored = _score_concurrently(findings, concurrency, batch_size)
+        _count_failed(scored)
+        return [
+            result or _fallback_risk_and_explanation(f)
+            for f, result in zip(findings, scored)
+        ]
+
+    keys = cache_keys_for(findings)
+    # Cache problems (e.g. the table not created yet) must not fail enrichment.
+    try:
+        with db.begin_nested():
+            results = enrichment_cache.get_many(db, keys)
+    except SQLAlchemyError as e:
+        print(f"AI cache lookup failed: {e}")
+        results = {}
+    hits = list(results)
+
+    pending: Dict[str, FindingModel] = {}
+    for f, key in zip(findings, keys):
+        if key not in results and key not in pending:
+            pending[key] = f
+    scored = _score_concurrently(list(pending.values()), concurrency, batch_size)
+    _count_failed(scored)
+    if metrics.ENABLED and hits:
+        metrics.LLM_CACHE_HITS.inc(amount=len(hits))
+    fresh = {key: result for key, result in zip(pending, scored) if result}
+    if hits or fresh:
+        try:
+            with db.begin_nested():
+                enrichment_cache.touch(db, hits)
+                enrichment_cache.put_many(db, fresh)
+        except SQLAlchemyError as e:
+            print(f"AI cache store failed: {e}")
+        results.update(fresh)
+
+    # Fallback answers are never cached, so a later run can still reach the AI.
+    return [
+        results.get(key) or _fallback_risk_and_explanation(f)
+        for f, key in zip(findings, keys)
+    ]
+
+
 def enrich_finding_with_ai(db: Session, finding_id: int) -> FindingSchema:
     """
     Fetches Finding, calculates risk_score + ai_explanation (AI or fallback),
@@ -123,16 +446,13 @@ def enrich_finding_with_ai(db: Session, finding_id: int) -> FindingSchema:
         raise ValueError(f"Finding with id={finding_id} not found")
 
     # First try with OpenAI, if it fails, fall back
-    try:
-        risk_score, explanation = _call_openai_for_finding(finding)
-    except Exception as e:
-        print(f"----------------------------------------------------------\nError calling OpenAI for finding {finding_id}: {e}")
-        risk_score, explanation = _fallback_risk_and_explanation(finding)
+    risk_score, explanation = score_findings([finding], db=db)[0]
 
     finding.risk_score = risk_score
     finding.ai_explanation = explanation
 
     db.add(finding)
+    bump_generations(db, FINDINGS_NAMESPACE)
     db.commit()
     db.refresh(finding)
 
@@ -143,6 +463,7 @@ def enrich_finding_with_ai(db: Session, finding_id: int) -> FindingSchema:
 def enrich_missing_findings(
     db: Session,
     limit: int = 50,
+    batch_size: Optional[int] = None,
 ) -> List[FindingSchema]:
     """
     Finds Findings that are missing risk_score or ai_explanation,
@@ -150,6 +471,7 @@ def enrich_missing_findings(
     and returns a list of updated Findings.
 
     limit – how many to process in each call (to avoid overloading ourselves).
+    batch_size – findings per LLM request (1 = one request per finding).
     """
     # Finds all Findings that are missing risk_score or ai_explanation
     missing = (
@@ -170,19 +492,17 @@ def enrich_missing_findings(
 
     updated_schemas: List[FindingSchema] = []
 
-    for f in missing:
-        # Use the same logic as enrich_finding_with_ai,
-        # but without asking the DB again by id.
-        try:
-            risk_score, explanation = _call_openai_for_finding(f)
-        except Exception:
-            risk_score, explanation = _fallback_risk_and_explanation(f)
+    # Same logic as enrich_finding_with_ai, but the calls run concurrently
+    # and nothing is written until every finding has a result.
+    scores = score_findings(missing, db=db, batch_size=batch_size)
 
+    for f, (risk_score, explanation) in zip(missing, scores):
         f.risk_score = risk_score
         f.ai_explanation = explanation
         db.add(f)
         # Don't commit here – we'll commit at the end
 
+    bump_generations(db, FINDINGS_NAMESPACE)
     db.commit()
 
     # Reload for extra security and conversion to schema
@@ -0,0 +1,362 @@
+# backend/app/services/enrichment_jobs.py
+
+import uuid
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from sqlalchemy import and_, case, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import EnrichmentJob, EnrichmentJobBatch, Finding as FindingModel
+from app.services.ai_service import score_findings
+from app.services.response_cache import FINDINGS_NAMESPACE, bump_generations
+
+# Claim attempts when another worker wins the race for the same batch
+CLAIM_RETRIES = 3
+
+
+def _claimable(now: datetime):
+    """
+    A batch can be claimed when it is pending or its worker's lease expired.
+    """
+    return or_(
+        EnrichmentJobBatch.status == "pending",
+        and_(
+            EnrichmentJobBatch.status == "running",
+            EnrichmentJobBatch.lease_expires_at < now,
+        ),
+    )
+
+
+def _queued_finding_ids(db: Session) -> set:
+    """
+    Findings already in a batch that is not finished yet.
+    """
+    rows = db.execute(
+        select(EnrichmentJobBatch.finding_ids).where(
+            EnrichmentJobBatch.status.in_(("pending", "running"))
+        )
+    ).scalars()
+    return {finding_id for ids in rows for finding_id in ids}
+
+
+def submit_enrichment_job(
+    db: Session,
+    finding_ids: Optional[List[int]] = None,
+    limit: int = 500,
+    ai_batch_size: Optional[int] = None,
+    claim_batch_size: Optional[int] = None,
+) -> Optional[EnrichmentJob]:
+    """
+    Queues a job for the given findings, or for up to `limit` findings missing
+    risk_score or ai_explanation that are not queued already. The findings
+    are split into batches of ENRICH_JOB_BATCH_SIZE for the workers.
+    Returns None, without writing anything, when there is nothing to enrich.
+    """
+    claim_batch_size = claim_batch_size or settings.ENRICH_JOB_BATCH_SIZE
+
+    if finding_ids is not None:
+        wanted = list(dict.fromkeys(finding_ids))
+        existing = set(
+            db.execute(
+                select(FindingModel.id).where(FindingModel.id.in_(wanted))
+            ).scalars()
+        )
+        ids = [finding_id for finding_id in wanted if finding_id in existing]
+    else:
+        queued = _queued_finding_ids(db)
+        ids = []
+        rows = db.execute(
+            select(FindingModel.id)
+            .where(
+                or_(
+                    FindingModel.risk_score.is_(None),
+                    FindingModel.ai_explanation.is_(None),
+                )
+            )
+            .order_by(FindingModel.id.asc())
+        ).scalars()
+        for finding_id in rows:
+            if finding_id not in queued:
+                ids.append(finding_id)
+                if len(ids) >= limit:
+                    break
+
+    batches = [
+        ids[start : start + claim_batch_size]
+        for start in range(0, len(ids), claim_batch_size)
+    ]
+    if not batches:
+        return None
+    job = EnrichmentJob(
+        status="pending",
+        ai_batch_size=ai_batch_size,
+        total=len(ids),
+        enriched=0,
+        failed=0,
+        batches_total=len(batches),
+        batches_done=0,
+        batches_failed=0,
+    )
+    db.add(job)
+    db.flush()
+    db.add_all(
+        EnrichmentJobBatch(job_id=job.id, finding_ids=batch, status="pending")
+        for batch in batches
+    )
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def get_enrichment_job(db: Session, job_id: int) -> Optional[EnrichmentJob]:
+    return db.get(EnrichmentJob, job_id)
+
+
+def _finish_batch(
+    db: Session,
+    job_id: int,
+    succeeded: bool,
+    enriched: int,
+    failed: int,
+) -> None:
+    """
+    Adds a finished batch to the job counters (atomic increments, so several
+    workers can finish batches of the same job) and closes the job after
+    its last batch.
+    """
+    counter = (
+        EnrichmentJob.batches_done if succeeded else EnrichmentJob.batches_failed
+    )
+    db.execute(
+        update(EnrichmentJob)
+        .where(EnrichmentJob.id == job_id)
+        .values(
+            {
+                counter: counter + 1,
+                EnrichmentJob.enriched: EnrichmentJob.enriched + enriched,
+                EnrichmentJob.failed: EnrichmentJob.failed + failed,
+            }
+        )
+        .execution_options(synchronize_session=False)
+    )
+    finished = (
+        EnrichmentJob.batches_done + EnrichmentJob.batches_failed
+        >= EnrichmentJob.batches_total
+    )
+    db.execute(
+        update(EnrichmentJob)
+        .where(
+            EnrichmentJob.id == job_id,
+            EnrichmentJob.finished_at.is_(None),
+            finished,
+        )
+        .values(
+            # "failed" only when no batch at all went through
+            status=case((EnrichmentJob.batches_done == 0, "failed"), else_="done"),
+            finished_at=datetime.utcnow(),
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _fail_exhausted_batches(db: Session, now: datetime) -> None:
+    """
+    Batches whose lease expired after ENRICH_MAX_ATTEMPTS claims (e.g. the
+    worker keeps crashing on them) are failed instead of claimed again.
+    """
+    exhausted = db.execute(
+        select(
+            EnrichmentJobBatch.id,
+            EnrichmentJobBatch.job_id,
+            EnrichmentJobBatch.finding_ids,
+        ).where(
+            EnrichmentJobBatch.status == "running",
+            EnrichmentJobBatch.lease_expires_at < now,
+            EnrichmentJobBatch.attempts >= settings.ENRICH_MAX_ATTEMPTS,
+        )
+    ).all()
+    for batch_id, job_id, finding_ids in exhausted:
+        result = db.execute(
+            update(EnrichmentJobBatch)
+            .where(
+                EnrichmentJobBatch.id == batch_id,
+                EnrichmentJobBatch.status == "running",
+                EnrichmentJobBatch.lease_expires_at < now,
+            )
+            .values(
+                status="failed",
+                error="Lease expired too many times",
+                lease_token=None,
+                updated_at=now,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount:
+            _finish_batch(db, job_id, False, 0, len(finding_ids))
+    db.commit()
+
+
+def claim_batch(
+    db: Session,
+    worker_id: str,
+    lease_seconds: Optional[int] = None,
+) -> Optional[EnrichmentJobBatch]:
+    """
+    Leases the oldest claimable batch to this worker, or returns None.
+
+    The claim is a single conditional UPDATE with a fresh lease token, so two
+    workers can never hold the same batch; a crashed worker's batch becomes
+    claimable again once its lease expires.
+    """
+    lease = timedelta(seconds=lease_seconds or settings.ENRICH_LEASE_SECONDS)
+    now = datetime.utcnow()
+    _fail_exhausted_batches(db, now)
+
+    for _ in range(CLAIM_RETRIES):
+        candidate = (
+            select(EnrichmentJobBatch.id)
+            .where(_claimable(now))
+            .order_by(EnrichmentJobBatch.id.asc())
+            .limit(1)
+            .scalar_subquery()
+        )
+        token = uuid.uuid4().hex
+        result = db.execute(
+            update(EnrichmentJobBatch)
+            # Re-checked here: another worker may have claimed it meanwhile.
+            .where(EnrichmentJobBatch.id == candidate, _claimable(now))
+            .values(
+                status="running",
+                lease_owner=worker_id,
+                lease_token=token,
+                lease_expires_at=now + lease,
+                attempts=EnrichmentJobBatch.attempts + 1,
+                updated_at=now,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount:
+            batch = db.execute(
+                select(EnrichmentJobBatch).where(
+                    EnrichmentJobBatch.lease_token == token
+                )
+            ).scalar_one()
+            db.execute(
+                update(EnrichmentJob)
+                .where(
+                    EnrichmentJob.id == batch.job_id,
+                    EnrichmentJob.status == "pending",
+                )
+                .values(status="running", started_at=now)
+                .execution_options(synchronize_session=False)
+            )
+            # Detached snapshot: keeps *our* lease token instead of reloading
+            # whatever token the row holds later.
+            db.expunge(batch)
+            db.commit()
+            return batch
+        db.commit()
+        remaining = db.scalar(
+            select(EnrichmentJobBatch.id).where(_claimable(now)).limit(1)
+        )
+        if remaining is None:
+            return None
+    return None
+
+
+def _release_batch(
+    db: Session,
+    batch: EnrichmentJobBatch,
+    error: str,
+) -> None:
+    """
+    Gives a batch back after an error: retried later, or failed for good
+    after ENRICH_MAX_ATTEMPTS.
+    """
+    now = datetime.utcnow()
+    exhausted = batch.attempts >= settings.ENRICH_MAX_ATTEMPTS
+    result = db.execute(
+        update(EnrichmentJobBatch)
+        .where(
+            EnrichmentJobBatch.id == batch.id,
+            EnrichmentJobBatch.lease_token == batch.lease_token,
+        )
+        .values(
+            status="failed" if exhausted else "pending",
+            lease_owner=None,
+            lease_token=None,
+            lease_expires_at=None,
+            error=error[:2000],
+            updated_at=now,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount and exhausted:
+        _finish_batch(db, batch.job_id, False, 0, len(batch.finding_ids))
+    db.commit()
+
+
+def process_batch(db: Session, batch: EnrichmentJobBatch) -> bool:
+    """
+    Enriches the findings of a claimed batch and writes them, together with
+    the batch/job bookkeeping, in one transaction - only if this worker still
+    holds the lease. Returns False when the lease was lost or the batch
+    failed.
+    """
+    job = db.get(EnrichmentJob, batch.job_id)
+    ai_batch_size = job.ai_batch_size if job is not None else None
+    findings = (
+        db.query(FindingModel)
+        .filter(FindingModel.id.in_(batch.finding_ids))
+        .order_by(FindingModel.id.asc())
+        .all()
+    )
+    try:
+        scores: List[Tuple[float, str]] = score_findings(
+            findings, db=db, batch_size=ai_batch_size
+        )
+    except Exception as e:
+        db.rollback()
+        print(f"Error enriching batch {batch.id} of job {batch.job_id}: {e}")
+        _release_batch(db, batch, str(e))
+        return False
+
+    now = datetime.utcnow()
+    result = db.execute(
+        update(EnrichmentJobBatch)
+        .where(
+            EnrichmentJobBatch.id == batch.id,
+            EnrichmentJobBatch.lease_token == batch.lease_token,
+            EnrichmentJobBatch.status == "running",
+        )
+        .values(status="done", lease_token=None, updated_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    if not result.rowcount:
+        # The lease expired and another worker took over; its write wins.
+        db.rollback()
+        return False
+
+    rows = [
+        {"id": f.id, "risk_score": risk_score, "ai_explanation": explanation}
+        for f, (risk_score, explanation) in zip(findings, scores)
+    ]
+    if rows:
+        # Bulk UPDATE by primary key
+        db.execute(update(FindingModel), rows)
+        bump_generations(db, FINDINGS_NAMESPACE)
+    _finish_batch(db, batch.job_id, True, len(rows), 0)
+    db.commit()
+    return True
+
+
+def run_enrichment_worker_once(db: Session, worker_id: str) -> Optional[bool]:
+    """
+    Claims and processes one batch. Returns None when there was nothing to do.
+    """
+    batch = claim_batch(db, worker_id)
+    if batch is None:
+        return None
+    return process_batch(db, batch)
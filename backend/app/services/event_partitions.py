@@ -0,0 +1,417 @@
+# backend/app/services/event_partitions.py
+
+import gzip
+import json
+import os
+from collections import Counter
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import Select, column, delete, func, select, text, update
+from sqlalchemy import table as table_clause
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.counters import increment_counts
+from app.models import EventDailyCount, EventPartition, SourceEvent
+from app.services.response_cache import STATS_NAMESPACE, bump_generations
+
+PARENT_TABLE = "source_events"
+# PostgreSQL: rows of days without a partition (should stay empty)
+DEFAULT_PARTITION = "source_events_default"
+# Serializes partition DDL between processes (pg_advisory_xact_lock key)
+_PARTITION_LOCK_KEY = 0x5E11
+
+# Whether source_events is a partitioned table, per database URL
+_partitioned: Dict[str, bool] = {}
+
+
+@dataclass
+class RetentionResult:
+    day: date
+    # archived | dropped | skipped
+    action: str
+    rows: int = 0
+    archive_path: Optional[str] = None
+    reason: Optional[str] = None
+
+
+def partition_name(day: date) -> str:
+    return f"{PARENT_TABLE}_p{day:%Y%m%d}"
+
+
+def day_bounds(day: date) -> Tuple[datetime, datetime]:
+    """
+    [start, end) of a day partition.
+    """
+    start = datetime.combine(day, time.min)
+    return start, start + timedelta(days=1)
+
+
+def is_partitioned(db: Session) -> bool:
+    """
+    True when source_events is a PostgreSQL partitioned table (alembic 0003);
+    on other databases days are slices of one table.
+    """
+    bind = db.get_bind()
+    key = str(bind.url)
+    if key not in _partitioned:
+        partitioned = False
+        if bind.dialect.name == "postgresql":
+            relkind = db.execute(
+                text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:name)"),
+                {"name": PARENT_TABLE},
+            ).scalar()
+            partitioned = relkind == "p"
+        _partitioned[key] = partitioned
+    return _partitioned[key]
+
+
+def _create_partition(db: Session, day: date) -> None:
+    """
+    Creates and attaches the partition of `day`, moving the day's rows out
+    of the default partition first (ATTACH refuses to run while the default
+    partition holds rows of the new range).
+    """
+    name = partition_name(day)
+    start, end = day_bounds(day)
+    if db.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar():
+        return
+    db.execute(
+        text(f'CREATE TABLE "{name}" (LIKE {PARENT_TABLE} INCLUDING DEFAULTS)')
+    )
+    db.execute(
+        text(
+            f'WITH moved AS (DELETE FROM "{DEFAULT_PARTITION}" '
+            "WHERE timestamp >= :start AND timestamp < :end RETURNING *) "
+            f'INSERT INTO "{name}" SELECT * FROM moved'
+        ),
+        {"start": start, "end": end},
+    )
+    db.execute(
+        text(
+            f'ALTER TABLE {PARENT_TABLE} ATTACH PARTITION "{name}" '
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        )
+    )
+
+
+def ensure_partitions(db: Session, days: Iterable[date]) -> None:
+    """
+    Makes sure the days are live in the catalog (and have a partition on
+    PostgreSQL) before events of those days are inserted. Call it in the
+    inserting transaction; it costs one primary-key lookup when nothing is
+    missing. A day that retention already archived becomes live again, so
+    the late events are archived by the next retention run.
+    """
+    wanted = set(days)
+    if not wanted:
+        return
+    live = set(
+        db.execute(
+            select(EventPartition.day).where(
+                EventPartition.day.in_(wanted), EventPartition.status == "live"
+            )
+        ).scalars()
+    )
+    missing = sorted(wanted - live)
+    if not missing:
+        return
+
+    if is_partitioned(db):
+        db.execute(
+            text("SELECT pg_advisory_xact_lock(:key)"), {"key": _PARTITION_LOCK_KEY}
+        )
+        for day in missing:
+            _create_partition(db, day)
+
+    known = set(
+        db.execute(
+            select(EventPartition.day).where(EventPartition.day.in_(missing))
+        ).scalars()
+    )
+    for day in missing:
+        if day in known:
+            db.execute(
+                update(EventPartition)
+                .where(EventPartition.day == day)
+                .values(status="live", row_count=None, archived_at=None)
+            )
+        else:
+            db.add(EventPartition(day=day, status="live"))
+    db.flush()
+
+
+def sync_partition_catalog(db: Session) -> int:
+    """
+    Adds the days present in source_events but missing from the catalog
+    (databases that had events before partitioning). Returns days added.
+    """
+    day_column = func.date(SourceEvent.timestamp)
+    days = set()
+    for value in db.execute(
+        select(day_column).where(SourceEvent.timestamp.is_not(None)).distinct()
+    ).scalars():
+        # func.date() returns a string on SQLite and a date elsewhere
+        days.add(date.fromisoformat(value[:10]) if isinstance(value, str) else value)
+    known = set(db.execute(select(EventPartition.day)).scalars())
+    missing = days - known
+    ensure_partitions(db, missing)
+    db.commit()
+    return len(missing)
+
+
+def catalog_days_statement(start: datetime, end: datetime) -> Select:
+    """
+    (day, status) of the catalogued days a [start, end] time range touches,
+    oldest first.
+    """
+    return (
+        select(EventPartition.day, EventPartition.status)
+        .where(EventPartition.day >= start.date(), EventPartition.day <= end.date())
+        .order_by(EventPartition.day.asc())
+    )
+
+
+def precreate_partitions(
+    db: Session,
+    days_ahead: int,
+    today: Optional[date] = None,
+) -> None:
+    """
+    Creates the partitions of the next days ahead of the ingest, so inserts
+    never have to create one.
+    """
+    today = today or datetime.utcnow().date()
+    ensure_partitions(db, (today + timedelta(days=i) for i in range(days_ahead + 1)))
+    db.commit()
+
+
+def _detach_partition(db: Session, day: date) -> Optional[str]:
+    """
+    Detaches the day's partition (PostgreSQL), so no new rows reach it.
+    Returns its table name, or None when there is none.
+    """
+    if not is_partitioned(db):
+        return None
+    name = partition_name(day)
+    db.execute(
+        text("SELECT pg_advisory_xact_lock(:key)"), {"key": _PARTITION_LOCK_KEY}
+    )
+    if not db.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar():
+        db.commit()
+        return None
+    db.execute(text(f'ALTER TABLE {PARENT_TABLE} DETACH PARTITION "{name}"'))
+    db.commit()
+    return name
+
+
+def _day_selects(day: date, detached: Optional[str], max_id: Optional[int]):
+    """
+    SELECTs over the day's rows: the detached partition (all of it) and the
+    rows still in source_events up to max_id.
+    """
+    table = SourceEvent.__table__
+    start, end = day_bounds(day)
+    selects = []
+    if detached is not None:
+        partition = table_clause(
+            detached, *(column(c.name, c.type) for c in table.columns)
+        )
+        selects.append(select(partition))
+    if max_id is not None:
+        selects.append(
+            select(table).where(
+                table.c.timestamp >= start,
+                table.c.timestamp < end,
+                table.c.id <= max_id,
+            )
+        )
+    return selects
+
+
+def _count_by_type(db: Session, day: date, detached, max_id) -> Counter:
+    counts: Counter = Counter()
+    for query in _day_selects(day, detached, max_id):
+        rows = query.subquery()
+        for event_type, count in db.execute(
+            select(rows.c.event_type, func.count()).group_by(rows.c.event_type)
+        ):
+            counts[(day, event_type or "")] += count
+    return counts
+
+
+def _json_default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return str(value)
+
+
+def _archive_day(db: Session, day: date, detached, max_id, archive_dir: str) -> str:
+    """
+    Streams the day's events into <archive_dir>/source_events_YYYYMMDD_<ts>.ndjson.gz
+    (written under a temporary name first).
+    """
+    os.makedirs(archive_dir, exist_ok=True)
+    stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S")
+    base = os.path.join(archive_dir, f"{PARENT_TABLE}_{day:%Y%m%d}_{stamp}")
+    path, n = f"{base}.ndjson.gz", 1
+    # A day revived by late events is archived again: never overwrite
+    while os.path.exists(path):
+        path, n = f"{base}_{n}.ndjson.gz", n + 1
+    with gzip.open(path + ".tmp", "wt", encoding="utf-8") as f:
+        for query in _day_selects(day, detached, max_id):
+            result = db.execute(
+                query.execution_options(
+                    yield_per=settings.EVENT_RETENTION_DELETE_CHUNK
+                )
+            )
+            for row in result.mappings():
+                f.write(
+                    json.dumps(dict(row), default=_json_default, separators=(",", ":"))
+                )
+                f.write("\n")
+    os.replace(path + ".tmp", path)
+    return path
+
+
+def _delete_day_rows(db: Session, day: date, max_id: int, chunk_size: int) -> None:
+    """
+    Deletes the day's rows up to max_id, chunk_size at a time with one short
+    transaction each, so ingest is never blocked for long.
+    """
+    start, end = day_bounds(day)
+    while True:
+        ids = list(
+            db.execute(
+                select(SourceEvent.id)
+                .where(
+                    SourceEvent.timestamp >= start,
+                    SourceEvent.timestamp < end,
+                    SourceEvent.id <= max_id,
+                )
+                .limit(chunk_size)
+            ).scalars()
+        )
+        if not ids:
+            return
+        db.execute(
+            delete(SourceEvent)
+            .where(SourceEvent.id.in_(ids))
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+
+
+def retire_day(
+    db: Session,
+    day: date,
+    archive: bool,
+    archive_dir: str,
+) -> RetentionResult:
+    """
+    Archives (optionally) and removes one day of events.
+
+    On PostgreSQL the day's partition is detached first and then dropped as
+    a whole - no row is deleted one by one. Rows outside it (the default
+    partition, or the only table elsewhere) are deleted in chunks, bounded
+    by the highest id seen at the start: events that arrive meanwhile are
+    kept, and the day then stays live for the next run.
+    """
+    start, end = day_bounds(day)
+    detached = _detach_partition(db, day)
+    max_id = db.scalar(
+        select(func.max(SourceEvent.id)).where(
+            SourceEvent.timestamp >= start, SourceEvent.timestamp < end
+        )
+    )
+    counts = _count_by_type(db, day, detached, max_id)
+    path = _archive_day(db, day, detached, max_id, archive_dir) if archive else None
+
+    if detached is not None:
+        db.execute(text(f'DROP TABLE "{detached}"'))
+        db.commit()
+    if max_id is not None:
+        _delete_day_rows(db, day, max_id, settings.EVENT_RETENTION_DELETE_CHUNK)
+
+    # Take the removed events out of the daily rollup
+    increment_counts(
+        db,
+        EventDailyCount,
+        ("day", "event_type"),
+        {key: -count for key, count in counts.items()},
+    )
+    db.execute(
+        delete(EventDailyCount).where(
+            EventDailyCount.day == day, EventDailyCount.count <= 0
+        )
+    )
+    late = db.scalar(
+        select(SourceEvent.id)
+        .where(SourceEvent.timestamp >= start, SourceEvent.timestamp < end)
+        .limit(1)
+    )
+    action = "archived" if archive else "dropped"
+    db.execute(
+        update(EventPartition)
+        .where(EventPartition.day == day)
+        .values(
+            status="live" if late is not None else action,
+            row_count=sum(counts.values()),
+            archive_path=path,
+            archived_at=datetime.utcnow(),
+        )
+    )
+    bump_generations(db, STATS_NAMESPACE)
+    db.commit()
+    return RetentionResult(day, action, rows=sum(counts.values()), archive_path=path)
+
+
+def apply_retention(
+    db: Session,
+    retention_days: Optional[int] = None,
+    archive: bool = True,
+    archive_dir: Optional[str] = None,
+    dry_run: bool = False,
+    now: Optional[datetime] = None,
+) -> List[RetentionResult]:
+    """
+    Archives (unless archive=False) and removes every live day older than
+    retention_days. Days that still have events the rules engine has not
+    processed are skipped. The removed events are subtracted from
+    event_daily_counts, so /stats/summary keeps matching the stored events.
+    """
+    retention_days = (
+        settings.EVENT_RETENTION_DAYS if retention_days is None else retention_days
+    )
+    archive_dir = archive_dir or settings.EVENT_ARCHIVE_DIR
+    cutoff = (now or datetime.utcnow()).date() - timedelta(days=retention_days)
+
+    expired = db.execute(
+        select(EventPartition.day)
+        .where(EventPartition.status == "live", EventPartition.day < cutoff)
+        .order_by(EventPartition.day.asc())
+    ).scalars().all()
+
+    results: List[RetentionResult] = []
+    for day in expired:
+        start, end = day_bounds(day)
+        pending = db.scalar(
+            select(SourceEvent.id)
+            .where(
+                SourceEvent.processed == False,
+                SourceEvent.timestamp >= start,
+                SourceEvent.timestamp < end,
+            )
+            .limit(1)
+        )
+        if pending is not None:
+            results.append(
+                RetentionResult(day, "skipped", reason="unprocessed events")
+            )
+        elif dry_run:
+            results.append(RetentionResult(day, "archived" if archive else "dropped"))
+        else:
+            results.append(retire_day(db, day, archive, archive_dir))
+    return results
@@ -1,26 +1,214 @@
 # backend/app/services/events_service.py
 
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import Select, false, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app import   models
+from app.core.config import settings
 from app.schemas.source_event import SourceEventFilter
+from app.services.event_partitions import (
+    catalog_days_statement,
+    day_bounds,
+    ensure_partitions,
+)
+from app.services.pagination import count_statement, keyset_statement, split_page
+from app.services.response_cache import STATS_NAMESPACE, bump_generations
+from app.services.rollup_service import add_event_counts
 
 
-def query_events(db:Session , filters: SourceEventFilter):
-    q = db.query(models.SourceEvent)
+def _range_days(start, end) -> int:
+    return (end.date() - start.date()).days + 1
 
-    if filters.event_type:
-        q = q.filter(models.SourceEvent.event_type == filters.event_type)
 
+def _prune_to_days(stmt, catalog, start, end):
+    '''
+    Applies start <= timestamp <= end, narrowed to the live days only when
+    the catalog has a row for every day of the range; a day it does not know
+    (rows written before partitioning or around ensure_partitions) may hold
+    events, so then the plain bounds are used.
+    '''
+    if start is not None:
+        stmt = stmt.filter(models.SourceEvent.timestamp >= start)
+    if end is not None:
+        stmt = stmt.filter(models.SourceEvent.timestamp <= end)
+    if catalog is None or len(catalog) < _range_days(start, end):
+        return stmt
+
+    days = [day for day, status in catalog if status == "live"]
+    if not days:
+        # every day of the range was retired by retention
+        return stmt.filter(false())
+    stmt = stmt.filter(models.SourceEvent.timestamp >= day_bounds(days[0])[0])
+    return stmt.filter(models.SourceEvent.timestamp < day_bounds(days[-1])[1])
+
+def events_in_range(
+    db: Session,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    query=None,
+):
+    '''
+    Restricts `query` (a Query or select(); default: all SourceEvents) to
+    start <= timestamp <= end. When the event_partitions catalog knows every
+    day of a bounded range, the bounds are also narrowed to the first/last
+    live day, so PostgreSQL only scans those partitions and other databases
+    only that slice of the timestamp index; a range whose days were all
+    retired returns nothing without touching the events. Otherwise the plain
+    bounds apply, so events on uncatalogued days are never hidden.
+    '''
+    q = query if query is not None else db.query(models.SourceEvent)
+    catalog = None
+    if start is not None and end is not None and start <= end:
+        catalog = db.execute(catalog_days_statement(start, end)).all()
+    return _prune_to_days(q, catalog, start, end)
+
+async def events_in_range_async(
+    db: AsyncSession,
+    start: Optional[datetime],
+    end: Optional[datetime],
+    stmt: Select,
+) -> Select:
+    catalog = None
+    if start is not None and end is not None and start <= end:
+        catalog = (await db.execute(catalog_days_statement(start, end))).all()
+    return _prune_to_days(stmt, catalog, start, end)
+
+def _events_statement(filters: SourceEventFilter) -> Select:
+    stmt = select(models.SourceEvent)
+    if filters.event_type:
+        stmt = stmt.where(models.SourceEvent.event_type == filters.event_type)
     if filters.user:
-        q = q.filter(models.SourceEvent.user == filters.user)
+        stmt = stmt.where(models.SourceEvent.user == filters.user)
+    return stmt
+
+def _page_statement(stmt: Select, filters: SourceEventFilter) -> Select:
+    return keyset_statement(
+        stmt,
+        models.SourceEvent.timestamp,
+        models.SourceEvent.id,
+        limit=filters.limit,
+        cursor=filters.cursor,
+        offset=0 if filters.cursor else filters.offset,
+    )
+
+def events_export_statement(db: Session, filters: SourceEventFilter) -> Select:
+    '''
+    Every event matching filters (limit/offset/cursor are ignored) as plain
+    columns, oldest first, for the streaming export.
+    '''
+    stmt = _events_statement(filters).with_only_columns(
+        *models.SourceEvent.__table__.columns
+    )
+    if filters.from_timestamp or filters.to_timestamp:
+        stmt = events_in_range(db, filters.from_timestamp, filters.to_timestamp, stmt)
+    return stmt.order_by(models.SourceEvent.timestamp.asc(), models.SourceEvent.id.asc())
+
+def query_events(db:Session , filters: SourceEventFilter):
+    items, _, _ = query_events_page(db, filters)
+    return items
+
+def query_events_page(
+    db: Session,
+    filters: SourceEventFilter,
+) -> Tuple[List[models.SourceEvent], Optional[str], Optional[int]]:
+    '''
+    Newest events first, as (items, next_cursor, total). With filters.cursor
+    the page is read by keyset on (timestamp, id) instead of OFFSET; total is
+    only counted when filters.include_total is set.
+    '''
+    stmt = _events_statement(filters)
+    if filters.from_timestamp or filters.to_timestamp:
+        stmt = events_in_range(db, filters.from_timestamp, filters.to_timestamp, stmt)
+
+    rows = db.execute(_page_statement(stmt, filters)).scalars().all()
+    items, next_cursor = split_page(
+        rows, models.SourceEvent.timestamp, models.SourceEvent.id, filters.limit
+    )
+    total = db.scalar(count_statement(stmt)) if filters.include_total else None
+    return items, next_cursor, total
+
+async def query_events_page_async(
+    db: AsyncSession,
+    filters: SourceEventFilter,
+) -> Tuple[List[models.SourceEvent], Optional[str], Optional[int]]:
+    '''
+    query_events_page() on an AsyncSession (same statements).
+    '''
+    stmt = _events_statement(filters)
+    if filters.from_timestamp or filters.to_timestamp:
+        stmt = await events_in_range_async(
+            db, filters.from_timestamp, filters.to_timestamp, stmt
+        )
+
+    rows = (await db.execute(_page_statement(stmt, filters))).scalars().all()
+    items, next_cursor = split_page(
+        rows, models.SourceEvent.timestamp, models.SourceEvent.id, filters.limit
+    )
+    total = await db.scalar(count_statement(stmt)) if filters.include_total else None
+    return items, next_cursor, total
+
+# Called after each committed insert_events_bulk batch, e.g. to wake the
+# streaming rules engine when it runs in this process
+_insert_listeners: List[Callable[[], None]] = []
+
+def add_insert_listener(listener: Callable[[], None]) -> None:
+    _insert_listeners.append(listener)
+
+def remove_insert_listener(listener: Callable[[], None]) -> None:
+    if listener in _insert_listeners:
+        _insert_listeners.remove(listener)
+
+def _naive_utc(timestamp: Optional[datetime]) -> Optional[datetime]:
+    if timestamp is not None and timestamp.tzinfo is not None:
+        return timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return timestamp
 
-    if filters.from_timestamp:
-        q = q.filter(models.SourceEvent.timestamp >= filters.from_timestamp)
+def insert_events_bulk(
+    db: Session,
+    events: Iterable[Dict[str, Any]],
+    batch_size: Optional[int] = None,
+) -> int:
+    '''
+    Inserts events with executemany-style Core INSERTs, batch_size rows
+    (default: settings.INGEST_BATCH_SIZE) per statement and commit.
+    Each event is a dict with user, event_type, raw_data and an optional timestamp
+    (timezone-aware timestamps are converted to naive UTC).
+    The daily event rollup and the day partitions are updated in the same
+    transaction.
+    Returns the number of inserted rows.
+    '''
+    batch_size = batch_size or settings.INGEST_BATCH_SIZE
+    inserted = 0
+    batch: List[Dict[str, Any]] = []
 
-    if filters.to_timestamp:
-        q = q.filter(models.SourceEvent.timestamp <= filters.to_timestamp)
+    def flush() -> None:
+        ensure_partitions(db, {e["timestamp"].date() for e in batch})
+        db.execute(insert(models.SourceEvent), batch)
+        add_event_counts(db, batch)
+        bump_generations(db, STATS_NAMESPACE)
+        db.commit()
+        for listener in _insert_listeners:
+            listener()
 
-    q = q.order_by(models.SourceEvent.timestamp.desc())
-    q = q.offset(filters.offset).limit(filters.limit)
+    for e in events:
+        batch.append(
+            {
+                "user": e["user"],
+                "event_type": e["event_type"],
+                "raw_data": e.get("raw_data"),
+                "timestamp": _naive_utc(e.get("timestamp")) or datetime.utcnow(),
+                "processed": False,
+            }
+        )
+        if len(batch) >= batch_size:
+            flush()
+            inserted += len(batch)
+            batch = []
 
-    return q.all()
\ No newline at end of file
+    if batch:
+        flush()
+        inserted += len(batch)
+    return inserted
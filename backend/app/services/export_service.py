@@ -0,0 +1,218 @@
+# backend/app/services/export_service.py
+
+import csv
+import io
+from datetime import datetime
+from json.encoder import encode_basestring
+from typing import Callable, Iterator, List, Optional
+
+from sqlalchemy import JSON, Boolean, DateTime, Float, Integer, Select, Text, cast
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import ReadSessionLocal
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet exports are optional
+    pa = None
+    pq = None
+
+# format -> media type
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+def parquet_available() -> bool:
+    return pq is not None
+
+
+def export_filename(name: str, fmt: str) -> str:
+    return f"{name}_{datetime.utcnow():%Y%m%dT%H%M%S}.{fmt}"
+
+
+def _kind(column) -> str:
+    column_type = column.type
+    if isinstance(column_type, JSON):
+        return "json"
+    if isinstance(column_type, DateTime):
+        return "datetime"
+    if isinstance(column_type, Boolean):
+        return "bool"
+    if isinstance(column_type, Integer):
+        return "int"
+    if isinstance(column_type, Float):
+        return "float"
+    return "str"
+
+
+def _wire_statement(stmt: Select, kinds: List[str]) -> Select:
+    """
+    Selects JSON and timestamp columns as their text, so rows skip the
+    decode-then-re-encode round trip through Python objects.
+    """
+    return stmt.with_only_columns(
+        *(
+            cast(c, Text).label(c.name) if kind in ("json", "datetime") else c
+            for c, kind in zip(stmt.selected_columns, kinds)
+        )
+    )
+
+
+def _iso(value: Optional[str]) -> Optional[str]:
+    # "YYYY-MM-DD HH:MM:SS[.ffffff]" as stored -> isoformat()
+    return None if value is None else value.replace(" ", "T", 1)
+
+
+def _ndjson_column(kind: str, values) -> List[str]:
+    if kind == "json":
+        return ["null" if v is None else v for v in values]
+    if kind == "datetime":
+        return ["null" if v is None else '"' + _iso(v) + '"' for v in values]
+    if kind == "bool":
+        return ["null" if v is None else ("true" if v else "false") for v in values]
+    if kind in ("int", "float"):
+        return ["null" if v is None else repr(v) for v in values]
+    return ["null" if v is None else encode_basestring(v) for v in values]
+
+
+def _ndjson_chunks(names: List[str], kinds: List[str], batches) -> Iterator[bytes]:
+    template = "{{" + ",".join(
+        encode_basestring(name).replace("{", "{{").replace("}", "}}") + ":{}"
+        for name in names
+    ) + "}}\n"
+    for rows in batches:
+        columns = [
+            _ndjson_column(kind, values) for kind, values in zip(kinds, zip(*rows))
+        ]
+        yield "".join(map(template.format, *columns)).encode("utf-8")
+
+
+def _csv_chunks(names: List[str], kinds: List[str], batches) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(names)
+    for rows in batches:
+        columns = [
+            list(map(_iso, values)) if kind == "datetime" else values
+            for kind, values in zip(kinds, zip(*rows))
+        ]
+        writer.writerows(zip(*columns))
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    # header only, when nothing matched
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+class _ChunkSink(io.RawIOBase):
+    """
+    Write-only file that keeps what the Parquet writer wrote until drained.
+    """
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data, self._chunks = b"".join(self._chunks), []
+        return data
+
+
+def _arrow_column(kind: str, values, column_type):
+    if kind == "datetime":
+        # Arrow parses the timestamp text itself
+        return pa.array(values, pa.string()).cast(pa.timestamp("us"))
+    return pa.array(values, column_type)
+
+
+def _parquet_chunks(names: List[str], kinds: List[str], batches) -> Iterator[bytes]:
+    """
+    One Parquet row group per batch; the file is streamed as it is written.
+    JSON columns are stored as their text.
+    """
+    schema = pa.schema(
+        [(name, _ARROW_TYPES[kind]) for name, kind in zip(names, kinds)]
+    )
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    try:
+        for rows in batches:
+            arrays = [
+                _arrow_column(kind, values, field.type)
+                for kind, values, field in zip(kinds, zip(*rows), schema)
+            ]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+_ARROW_TYPES = (
+    {
+        "json": pa.string(),
+        "datetime": pa.timestamp("us"),
+        "bool": pa.bool_(),
+        "int": pa.int64(),
+        "float": pa.float64(),
+        "str": pa.string(),
+    }
+    if pa is not None
+    else {}
+)
+
+_WRITERS = {
+    "ndjson": _ndjson_chunks,
+    "csv": _csv_chunks,
+    "parquet": _parquet_chunks,
+}
+
+
+def stream_export(
+    build_statement: Callable[[Session], Select],
+    fmt: str,
+    batch_size: Optional[int] = None,
+) -> Iterator[bytes]:
+    """
+    Yields the rows of build_statement(db) encoded as `fmt`, batch_size rows
+    (default: settings.EXPORT_BATCH_SIZE) at a time. Rows come from a
+    server-side cursor (yield_per), so memory stays flat however many rows
+    match. The generator opens and closes its own read-only session: it
+    keeps running after the route has returned.
+    """
+    if fmt not in _WRITERS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    if fmt == "parquet" and not parquet_available():
+        raise RuntimeError("Parquet exports need pyarrow (pip install pyarrow)")
+    batch_size = batch_size or settings.EXPORT_BATCH_SIZE
+
+    db = ReadSessionLocal()
+    try:
+        stmt = build_statement(db)
+        names = [c.name for c in stmt.selected_columns]
+        kinds = [_kind(c) for c in stmt.selected_columns]
+        # Core execution: plain rows, no ORM loading step
+        result = db.connection().execute(
+            _wire_statement(stmt, kinds).execution_options(yield_per=batch_size)
+        )
+        yield from _WRITERS[fmt](names, kinds, result.partitions())
+    finally:
+        db.close()
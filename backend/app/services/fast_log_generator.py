@@ -0,0 +1,415 @@
+# backend/app/services/fast_log_generator.py
+
+import csv
+import io
+import json
+from collections import Counter
+from datetime import datetime
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import column, insert, table
+from sqlalchemy.orm import Session
+
+from app import models
+from app.db.counters import increment_counts
+from app.services.event_partitions import ensure_partitions
+from app.services.log_generator import EVENT_TYPES, USERS
+from app.services.response_cache import STATS_NAMESPACE, bump_generations
+
+try:
+    import numpy as np
+except ImportError:  # only the fast generator needs it
+    np = None
+
+# Background traffic mix (relative weights, same order as EVENT_TYPES)
+EVENT_TYPE_WEIGHTS = [30, 4, 8, 1, 7, 6, 5, 1, 1, 1, 5, 4.5, 0.5, 0.5, 0.5]
+# Relative activity per UTC hour: quiet nights, working-hours peak
+HOURLY_WEIGHTS = [
+    1, 1, 1, 1, 1, 2, 3, 5, 8, 10, 10, 9,
+    8, 9, 10, 10, 9, 7, 5, 4, 3, 2, 2, 1,
+]
+# User activity follows a Zipf-like law: a few users produce most events
+USER_ZIPF_EXPONENT = 1.1
+# Storms: bursts of login_failed (credential stuffing) or mfa_failed
+# (MFA fatigue) for one user from one IP, seconds apart
+STORM_TYPES = ["login_failed", "mfa_failed"]
+STORM_TYPE_WEIGHTS = [0.7, 0.3]
+STORM_MEAN_SIZE = 40
+STORM_MAX_SIZE = 500
+STORM_MEAN_GAP_SECONDS = 3.0
+# Chance that a storm ends with a success (the attacker got in)
+STORM_SUCCESS_RATE = 0.3
+
+LOCATIONS = ["USA", "Canada", "UK", "Germany", "France", "Spain", "Brazil", "India",
+             "Japan", "Korea", "Turkey", "Russia", "China", "Other"]
+USUAL_LOCATIONS = LOCATIONS[:11]
+UNUSUAL_LOCATIONS = ["Russia", "China", "Other"]
+USER_AGENTS = ["Chrome", "Firefox", "Safari", "Edge", "Opera"]
+MFA_METHODS = ["totp", "sms", "push"]
+REPOS = ["mini-monitor", "backend-service", "frontend-service"]
+BRANCHES = ["main", "develop", "feature/rule-engine"]
+SERVICES = ["auth-service", "billing-api", "frontend-app", "mini-monitor"]
+ENVIRONMENTS = ["dev", "staging", "prod"]
+BUCKETS = ["logs-archive-2024", "user-uploads", "backups", "analytics-data"]
+REGIONS = ["eu-west-1", "us-east-1", "ap-south-1"]
+SCOPES = [["read:repos"], ["read:repos", "write:deploy"], ["admin:*"]]
+# IP addresses each user usually logs in from
+IPS_PER_USER = 3
+
+# source_events without column types: rows are inserted exactly as generated
+# (raw_data already JSON text, timestamps already in storage format)
+_RAW_COLUMNS = ("event_type", "user", "raw_data", "timestamp", "processed")
+_RAW_EVENTS = table("source_events", *(column(name) for name in _RAW_COLUMNS))
+_COPY_SQL = (
+    'COPY source_events (event_type, "user", raw_data, timestamp, processed) '
+    "FROM STDIN WITH (FORMAT csv)"
+)
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise RuntimeError("The fast event generator needs numpy (pip install numpy)")
+
+
+def _json_options(values) -> "np.ndarray":
+    return np.array([json.dumps(v) for v in values], dtype=object)
+
+
+class FastEventGenerator:
+    """
+    Vectorized synthetic events: every field of a chunk is sampled with
+    NumPy at once, and payloads are formatted straight to JSON text.
+    The same seed (and end) always produces the same events.
+
+    Background traffic has Zipf-distributed users, a weighted event type
+    mix and a diurnal timestamp profile; on top of it storm_share of the
+    events come in failed-login / failed-MFA storms, which the rules engine
+    must turn into findings.
+    """
+
+    def __init__(
+        self,
+        seed: Optional[int] = None,
+        users: int = 1000,
+        days: int = 30,
+        storm_share: float = 0.05,
+        end: Optional[datetime] = None,
+    ):
+        _require_numpy()
+        self.rng = np.random.default_rng(seed)
+        self.storm_share = storm_share
+        end = end or datetime.utcnow()
+        self.end_us = np.datetime64(end, "us")
+
+        names = USERS[:users] + [f"user{i:05d}" for i in range(max(0, users - len(USERS)))]
+        self.user_names = names
+        self.users = _json_options(names)
+        weights = 1.0 / np.arange(1, len(names) + 1) ** USER_ZIPF_EXPONENT
+        self.user_p = weights / weights.sum()
+        octets = self.rng.integers(1, 255, size=(len(names) * IPS_PER_USER, 4))
+        self.user_ips = _json_options(".".join(map(str, row)) for row in octets)
+
+        self.event_types = np.array(EVENT_TYPES, dtype=object)
+        type_weights = np.asarray(EVENT_TYPE_WEIGHTS, dtype=float)
+        self.type_p = type_weights / type_weights.sum()
+
+        # Event intensity over [end - days, end]: hour boundaries and the
+        # cumulative HOURLY_WEIGHTS activity up to each of them. Mapping
+        # uniform samples of the activity back to time (np.interp) gives the
+        # diurnal profile, and consecutive activity ranges give consecutive
+        # time ranges, so chunks come out in time order.
+        hour = 3600 * 10**6
+        end_us = int(self.end_us.astype(np.int64))
+        start_us = end_us - days * 24 * hour
+        bounds = np.arange(start_us - start_us % hour, end_us + hour, hour)
+        bounds = np.clip(bounds, start_us, end_us)
+        weights = np.asarray(HOURLY_WEIGHTS, dtype=float)[(bounds[:-1] // hour) % 24]
+        self.time_grid = bounds.astype(float)
+        self.activity = np.concatenate(([0.0], np.cumsum(weights * np.diff(bounds))))
+
+    # ---- sampling helpers ----
+
+    def _pick(self, options, size: int) -> "np.ndarray":
+        options = options if isinstance(options, np.ndarray) else _json_options(options)
+        return options[self.rng.integers(0, len(options), size)]
+
+    def _flags(self, size: int, p: float = 0.5) -> "np.ndarray":
+        return np.where(self.rng.random(size) < p, "true", "false").astype(object)
+
+    def _user_ips(self, user_idx: "np.ndarray") -> "np.ndarray":
+        offsets = self.rng.integers(0, IPS_PER_USER, len(user_idx))
+        return self.user_ips[user_idx * IPS_PER_USER + offsets]
+
+    def _timestamps(self, size: int, low: float, high: float) -> "np.ndarray":
+        """
+        Timestamps of the activity range [low, high) (see time_grid).
+        """
+        activity = self.rng.uniform(low, high, size)
+        micros = np.interp(activity, self.activity, self.time_grid).astype(np.int64)
+        return micros.astype("datetime64[us]")
+
+    # ---- payloads, as JSON text ----
+
+    def _payloads(self, event_type: str, users: "np.ndarray", ips, unusual) -> List[str]:
+        n = len(users)
+        if event_type in ("login_success", "login_failed"):
+            location = self._pick(USUAL_LOCATIONS, n)
+            location[unusual] = self._pick(UNUSUAL_LOCATIONS, int(unusual.sum()))
+            success = "true" if event_type == "login_success" else "false"
+            return [
+                f'{{"ip":{ip},"user_agent":{agent},"location":{loc},"success":{success}}}'
+                for ip, agent, loc in zip(ips, self._pick(USER_AGENTS, n), location)
+            ]
+        if event_type in ("mfa_challenge", "mfa_failed", "mfa_success"):
+            success = "true" if event_type == "mfa_success" else "false"
+            return [
+                f'{{"ip":{ip},"location":{loc},"method":{method},'
+                f'"device_trusted":{trusted},"success":{success}}}'
+                for ip, loc, method, trusted in zip(
+                    ips,
+                    self._pick(["USA", "Germany", "India", "Brazil", "Other"], n),
+                    self._pick(MFA_METHODS, n),
+                    self._flags(n, 0.7),
+                )
+            ]
+        if event_type in ("pull_request_opened", "pull_request_merged"):
+            # mostly small changes, a long tail of huge ones
+            lines = np.clip(self.rng.lognormal(4.0, 1.2, n), 1, 5000).astype(int)
+            approvers = np.append(self.users[: len(USERS)], "null")
+            return [
+                f'{{"repo":{repo},"branch":{branch},"lines_changed":{changed},'
+                f'"approved_by":{approver}}}'
+                for repo, branch, changed, approver in zip(
+                    self._pick(REPOS, n),
+                    self._pick(BRANCHES, n),
+                    lines.tolist(),
+                    self._pick(approvers, n),
+                )
+            ]
+        if event_type == "permission_changed":
+            approvers = np.append(self.users[: len(USERS)], "null")
+            return [
+                f'{{"old_role":{old},"new_role":{new},"approved_by":{approver}}}'
+                for old, new, approver in zip(
+                    self._pick(["viewer", "developer"], n),
+                    self._pick(["developer", "admin"], n),
+                    self._pick(approvers, n),
+                )
+            ]
+        if event_type == "api_token_created":
+            expiry = (
+                self.end_us
+                + self.rng.integers(1, 366, n).astype("timedelta64[D]")
+            )
+            expires_at = np.where(
+                self.rng.random(n) < 0.5,
+                _json_options(np.datetime_as_string(expiry, unit="s")),
+                "null",
+            )
+            return [
+                f'{{"token_id":"tok_{token}","scopes":{scopes},"created_by":{user},'
+                f'"has_expiry":{"false" if expires == "null" else "true"},'
+                f'"expires_at":{expires}}}'
+                for token, scopes, user, expires in zip(
+                    self.rng.integers(1000, 10000, n).tolist(),
+                    self._pick(SCOPES, n),
+                    users,
+                    expires_at,
+                )
+            ]
+        if event_type == "api_token_revoked":
+            return [
+                f'{{"token_id":"tok_{token}","revoked_by":{user}}}'
+                for token, user in zip(self.rng.integers(1000, 10000, n).tolist(), users)
+            ]
+        if event_type.startswith("deployment_"):
+            versions = self.rng.integers((1, 0, 0), (4, 10, 10), size=(n, 3)).tolist()
+            initiated = np.where(self.rng.random(n) < 0.6, '"CI"', users)
+            return [
+                f'{{"service":{service},"environment":{env},'
+                f'"version":"v{v[0]}.{v[1]}.{v[2]}","initiated_by":{by}}}'
+                for service, env, v, by in zip(
+                    self._pick(SERVICES, n),
+                    self._pick(ENVIRONMENTS, n),
+                    versions,
+                    initiated,
+                )
+            ]
+        if event_type == "storage_bucket_created":
+            return [
+                f'{{"bucket_name":{bucket},"public":{public},"region":{region}}}'
+                for bucket, public, region in zip(
+                    self._pick(BUCKETS, n), self._flags(n, 0.2), self._pick(REGIONS, n)
+                )
+            ]
+        if event_type == "storage_bucket_permission_changed":
+            return [
+                f'{{"bucket_name":{bucket},"public":{public},"changed_by":{user}}}'
+                for bucket, public, user in zip(
+                    self._pick(BUCKETS, n), self._flags(n, 0.2), users
+                )
+            ]
+        return ['{"message":"Unknown event type"}'] * n
+
+    # ---- chunks ----
+
+    def _storms(self, size: int, low: float, high: float):
+        """
+        (user_idx, type, timestamps, ips, unusual) of about `size` storm
+        events; each storm may end with a successful login/MFA.
+        """
+        sizes = []
+        while sum(sizes) < size:
+            sizes.append(
+                int(min(STORM_MAX_SIZE, max(3, self.rng.geometric(1 / STORM_MEAN_SIZE))))
+            )
+        sizes = np.array(sizes)
+        storms = len(sizes)
+        storm_user = self.rng.choice(len(self.users), size=storms, p=self.user_p)
+        storm_type = self.rng.choice(len(STORM_TYPES), size=storms, p=STORM_TYPE_WEIGHTS)
+        storm_start = self._timestamps(storms, low, high)
+        octets = self.rng.integers(1, 255, size=(storms, 4))
+        storm_ip = _json_options(".".join(map(str, row)) for row in octets)
+
+        storm_of = np.repeat(np.arange(storms), sizes)
+        gaps = self.rng.exponential(STORM_MEAN_GAP_SECONDS * 10**6, len(storm_of))
+        elapsed = np.cumsum(gaps)
+        # restart the clock at each storm
+        first = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+        elapsed -= np.repeat(elapsed[first] - gaps[first], sizes)
+        timestamps = np.minimum(
+            storm_start[storm_of] + elapsed.astype("timedelta64[us]"), self.end_us
+        )
+
+        types = np.array(STORM_TYPES, dtype=object)[storm_type[storm_of]]
+        # the last event of a storm is the attacker's success, sometimes
+        last = np.cumsum(sizes) - 1
+        succeeded = last[self.rng.random(storms) < STORM_SUCCESS_RATE]
+        types[succeeded] = np.where(
+            types[succeeded] == "login_failed", "login_success", "mfa_success"
+        )
+        return (
+            storm_user[storm_of],
+            types,
+            timestamps,
+            storm_ip[storm_of],
+            np.ones(len(storm_of), dtype=bool),
+        )
+
+    def _chunk(self, size: int, low: float, high: float) -> Tuple[List[tuple], Counter]:
+        """
+        `size` events of the activity range [low, high), in time order, as
+        (event_type, user, raw_data JSON, timestamp text, processed) rows,
+        plus their (day, event_type) counts for the rollup.
+        """
+        storm_size = int(self.rng.binomial(size, self.storm_share))
+        background = size - storm_size
+        user_idx = self.rng.choice(len(self.users), size=background, p=self.user_p)
+        types = self.event_types[self.rng.choice(len(EVENT_TYPES), size=background, p=self.type_p)]
+        timestamps = self._timestamps(background, low, high)
+        ips = self._user_ips(user_idx)
+        # a few ordinary logins come from unusual places too
+        unusual = self.rng.random(background) < 0.02
+        if storm_size:
+            s_user, s_types, s_ts, s_ips, s_unusual = self._storms(storm_size, low, high)
+            keep = size - background
+            user_idx = np.concatenate((user_idx, s_user[:keep]))
+            types = np.concatenate((types, s_types[:keep]))
+            timestamps = np.concatenate((timestamps, s_ts[:keep]))
+            ips = np.concatenate((ips, s_ips[:keep]))
+            unusual = np.concatenate((unusual, s_unusual[:keep]))
+
+        # Time order keeps the index inserts at the right edge of the B-trees
+        order = np.argsort(timestamps, kind="stable")
+        user_idx, types, timestamps = user_idx[order], types[order], timestamps[order]
+        ips, unusual = ips[order], unusual[order]
+        users = self.users[user_idx]
+        raw_data = np.empty(size, dtype=object)
+        for event_type in np.unique(types):
+            mask = types == event_type
+            raw_data[mask] = self._payloads(
+                event_type, users[mask], ips[mask], unusual[mask]
+            )
+
+        stamp_text = np.char.replace(
+            np.datetime_as_string(timestamps, unit="us"), "T", " "
+        ).astype(object)
+        type_names, type_codes = np.unique(types, return_inverse=True)
+        day_numbers = timestamps.astype("datetime64[D]").astype(np.int64)
+        keys, counts = np.unique(
+            day_numbers * len(type_names) + type_codes, return_counts=True
+        )
+        day_counts = Counter(
+            {
+                (
+                    np.datetime64(int(key) // len(type_names), "D").item(),
+                    type_names[key % len(type_names)],
+                ): count
+                for key, count in zip(keys.tolist(), counts.tolist())
+            }
+        )
+        rows = list(
+            zip(
+                types.tolist(),
+                [self.user_names[i] for i in user_idx.tolist()],
+                raw_data.tolist(),
+                stamp_text.tolist(),
+                [False] * size,
+            )
+        )
+        return rows, day_counts
+
+    def chunks(self, n: int, chunk_size: int = 100_000) -> Iterator[Tuple[List[tuple], Counter]]:
+        """
+        n events over the whole period, chunk_size at a time, oldest first.
+        """
+        total = self.activity[-1]
+        for start in range(0, n, chunk_size):
+            size = min(chunk_size, n - start)
+            yield self._chunk(size, total * start / n, total * (start + size) / n)
+
+
+def _copy_rows(db: Session, rows: List[tuple]) -> bool:
+    """
+    COPY FROM STDIN (psycopg2 on PostgreSQL); False when not available.
+    """
+    dbapi_connection = db.connection().connection.dbapi_connection
+    cursor = dbapi_connection.cursor()
+    if not hasattr(cursor, "copy_expert"):
+        cursor.close()
+        return False
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+    try:
+        cursor.copy_expert(_COPY_SQL, buffer)
+    finally:
+        cursor.close()
+    return True
+
+
+def write_event_chunks(
+    db: Session,
+    chunks: Iterator[Tuple[List[tuple], Counter]],
+) -> Iterator[int]:
+    """
+    Writes generated chunks, one transaction each: COPY on PostgreSQL
+    (psycopg2), an executemany INSERT elsewhere. Day partitions and the
+    daily event rollup are kept up to date like insert_events_bulk does.
+    Yields the number of rows written per chunk.
+    """
+    dialect = db.get_bind().dialect
+    use_copy = dialect.name == "postgresql"
+    insert_sql = str(insert(_RAW_EVENTS).compile(dialect=dialect))
+    for rows, day_counts in chunks:
+        ensure_partitions(db, {day for day, _ in day_counts})
+        if not (use_copy and _copy_rows(db, rows)):
+            use_copy = False
+            if not dialect.positional:
+                rows = [dict(zip(_RAW_COLUMNS, row)) for row in rows]
+            # straight to the driver's executemany: no per-row SQLAlchemy work
+            db.connection().exec_driver_sql(insert_sql, rows)
+        increment_counts(db, models.EventDailyCount, ("day", "event_type"), day_counts)
+        bump_generations(db, STATS_NAMESPACE)
+        db.commit()
+        yield len(rows)
@@ -1,20 +1,27 @@
 # backend/app/services/findings_service.py
 
+from sqlalchemy import Select, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app import   models
 from app.schemas.finding import FindingFilter
 from app import schemas
+from app.services.pagination import (
+    count_statement,
+    keyset_statement,
+    planner_row_estimate,
+    split_page,
+)
 from datetime import datetime , time , date
 
-def query_findings(
-    db: Session,
+def _findings_filter(
     page: int,
     page_size: int,
     severity: str | None,
     user: str | None,
     from_date: date | None,
     to_date: date | None,
-):
+) -> FindingFilter:
     # page,page_size → limit,offset
     limit = page_size
     offset = (page - 1) * page_size
@@ -29,7 +36,7 @@ def query_findings(
         # עד סוף היום
         to_timestamp = datetime.combine(to_date, time.max)
 
-    filter_obj = FindingFilter(
+    return FindingFilter(
         severity=severity,
         user=user,
         from_timestamp=from_timestamp,
@@ -38,32 +45,155 @@ def query_findings(
         offset=offset,
     )
 
-    # כאן או שנשתמש ב-filter_obj כדי לבנות query,
-    # או שנעביר אותו לפונקציה אחרת (repository).
-    query = db.query(models.Finding)
 
+def _findings_statement(filter_obj: FindingFilter) -> Select:
+    stmt = select(models.Finding)
     if filter_obj.severity:
-        query = query.filter(models.Finding.severity == filter_obj.severity)
+        stmt = stmt.where(models.Finding.severity == filter_obj.severity)
     if filter_obj.user:
-        query = query.filter(models.Finding.user == filter_obj.user)
+        stmt = stmt.where(models.Finding.user == filter_obj.user)
     if filter_obj.from_timestamp:
-        query = query.filter(models.Finding.created_at  >= filter_obj.from_timestamp)
+        stmt = stmt.where(models.Finding.created_at  >= filter_obj.from_timestamp)
     if filter_obj.to_timestamp:
-        query = query.filter(models.Finding.created_at  <= filter_obj.to_timestamp)
-
-    total = query.count()
-    items = (
-        query
-        .order_by(models.Finding.created_at.desc())
-        .offset(filter_obj.offset)
-        .limit(filter_obj.limit)
-        .all()
+        stmt = stmt.where(models.Finding.created_at  <= filter_obj.to_timestamp)
+    return stmt
+
+
+def _page_statement(stmt: Select, filter_obj: FindingFilter, cursor: str | None) -> Select:
+    return keyset_statement(
+        stmt,
+        models.Finding.created_at,
+        models.Finding.id,
+        limit=filter_obj.limit,
+        cursor=cursor,
+        # page numbers without a cursor: legacy OFFSET paging
+        offset=0 if cursor else filter_obj.offset,
+    )
+
+
+def findings_export_statement(
+    severity: str | None,
+    user: str | None,
+    from_date: date | None,
+    to_date: date | None,
+) -> Select:
+    """
+    Every finding matching the list filters as plain columns, oldest first,
+    for the streaming export.
+    """
+    filter_obj = _findings_filter(1, 1, severity, user, from_date, to_date)
+    return (
+        _findings_statement(filter_obj)
+        .with_only_columns(*models.Finding.__table__.columns)
+        .order_by(models.Finding.created_at.asc(), models.Finding.id.asc())
     )
 
+
+def _rollup_total_statement(filter_obj: FindingFilter) -> Select | None:
+    """
+    Total from the per-day/severity rollup, when the filters allow it.
+    """
+    if filter_obj.user:
+        return None
+    rollup = select(func.sum(models.FindingDailyCount.count))
+    if filter_obj.severity:
+        rollup = rollup.where(models.FindingDailyCount.severity == filter_obj.severity)
+    if filter_obj.from_timestamp:
+        rollup = rollup.where(
+            models.FindingDailyCount.day >= filter_obj.from_timestamp.date()
+        )
+    if filter_obj.to_timestamp:
+        rollup = rollup.where(
+            models.FindingDailyCount.day <= filter_obj.to_timestamp.date()
+        )
+    return rollup
+
+
+def _response(rows, total, total_exact, page, page_size, cursor_limit) -> dict:
+    items, next_cursor = split_page(
+        rows, models.Finding.created_at, models.Finding.id, cursor_limit
+    )
     # החזרה בפורמט שהפרונט אוהב
     return {
         "items": [schemas.Finding.from_orm(f).dict() for f in items],
         "total": total,
+        "total_exact": total_exact,
         "page": page,
         "page_size": page_size,
+        "next_cursor": next_cursor,
     }
+
+
+def query_findings(
+    db: Session,
+    page: int,
+    page_size: int,
+    severity: str | None,
+    user: str | None,
+    from_date: date | None,
+    to_date: date | None,
+    cursor: str | None = None,
+    include_total: bool = False,
+):
+    """
+    Newest findings first. With a cursor (the next_cursor of the previous
+    page) the page is read by keyset on (created_at, id), so deep pages cost
+    the same as the first one; page numbers > 1 still work through OFFSET.
+
+    total is counted (COUNT(*)) only with include_total=True; otherwise it
+    is an estimate from the daily rollups or the planner, or None when
+    neither can answer the filters. total_exact says which one it is.
+    """
+    filter_obj = _findings_filter(page, page_size, severity, user, from_date, to_date)
+    stmt = _findings_statement(filter_obj)
+    rows = db.execute(_page_statement(stmt, filter_obj, cursor)).scalars().all()
+
+    if include_total:
+        total = db.scalar(count_statement(stmt))
+    else:
+        total = _approximate_total(db, stmt, filter_obj)
+    return _response(rows, total, include_total, page, page_size, filter_obj.limit)
+
+
+async def query_findings_async(
+    db: AsyncSession,
+    page: int,
+    page_size: int,
+    severity: str | None,
+    user: str | None,
+    from_date: date | None,
+    to_date: date | None,
+    cursor: str | None = None,
+    include_total: bool = False,
+):
+    """
+    query_findings() on an AsyncSession (same statements).
+    """
+    filter_obj = _findings_filter(page, page_size, severity, user, from_date, to_date)
+    stmt = _findings_statement(filter_obj)
+    rows = (await db.execute(_page_statement(stmt, filter_obj, cursor))).scalars().all()
+
+    if include_total:
+        total = await db.scalar(count_statement(stmt))
+    else:
+        total = None
+        rollup = _rollup_total_statement(filter_obj)
+        if rollup is not None:
+            total = await db.scalar(rollup)
+        if total is None:
+            total = await db.run_sync(planner_row_estimate, stmt)
+    total = int(total) if total is not None else None
+    return _response(rows, total, include_total, page, page_size, filter_obj.limit)
+
+
+def _approximate_total(db: Session, stmt: Select, filter_obj: FindingFilter) -> int | None:
+    """
+    Cheap total: the per-day/severity rollup when the filters allow it,
+    else the PostgreSQL planner estimate. None when there is neither.
+    """
+    rollup = _rollup_total_statement(filter_obj)
+    if rollup is not None:
+        total = db.scalar(rollup)
+        if total is not None:
+            return int(total)
+    return planner_row_estimate(db, stmt)
@@ -0,0 +1,107 @@
+# backend/app/services/ingestion/bulk_ingestor.py
+
+import json
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+
+from app.schemas.source_event import SourceEventCreate
+from app.services.events_service import insert_events_bulk
+
+NDJSON_CONTENT_TYPES = (
+    "application/x-ndjson",
+    "application/ndjson",
+    "application/jsonl",
+)
+
+# Only the first errors are reported back, the count covers all of them
+MAX_REPORTED_ERRORS = 100
+
+
+def is_ndjson(content_type: Optional[str], body: bytes) -> bool:
+    """
+    NDJSON when the content type says so, or when the body is not a JSON array.
+    """
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if media_type in NDJSON_CONTENT_TYPES:
+        return True
+    return not body.lstrip().startswith(b"[")
+
+
+def _iter_records(
+    body: bytes,
+    ndjson: bool,
+) -> Iterator[Tuple[int, Any, Optional[str]]]:
+    """
+    Yields (index, record, parse error) for every record of the payload.
+    """
+    if not ndjson:
+        try:
+            records = json.loads(body)
+        except ValueError as e:
+            yield 0, None, f"Invalid JSON: {e}"
+            return
+        if not isinstance(records, list):
+            yield 0, None, "Expected a JSON array of events"
+            return
+        for index, record in enumerate(records):
+            yield index, record, None
+        return
+
+    index = 0
+    for line in body.splitlines():
+        if not line.strip():
+            continue
+        try:
+            yield index, json.loads(line), None
+        except ValueError as e:
+            yield index, None, f"Invalid JSON: {e}"
+        index += 1
+
+
+def validate_event(record: Any) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """
+    Validates one record against SourceEventCreate.
+    Returns (event dict, None) or (None, error message).
+    """
+    if not isinstance(record, dict):
+        return None, "Expected a JSON object"
+    try:
+        event = SourceEventCreate(**record)
+    except ValidationError as e:
+        return None, "; ".join(
+            f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors()
+        )
+    return event.model_dump(), None
+
+
+def ingest_events_bulk(
+    db: Session,
+    body: bytes,
+    content_type: Optional[str] = None,
+    batch_size: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Parses a JSON array or NDJSON payload of SourceEventCreate records,
+    writes the valid ones with batched Core INSERTs and returns
+    {"accepted", "rejected", "errors"}.
+    """
+    errors: List[Dict[str, Any]] = []
+    rejected = 0
+
+    def valid_events() -> Iterator[Dict[str, Any]]:
+        nonlocal rejected
+        for index, record, error in _iter_records(body, is_ndjson(content_type, body)):
+            event = None
+            if error is None:
+                event, error = validate_event(record)
+            if error is not None:
+                rejected += 1
+                if len(errors) < MAX_REPORTED_ERRORS:
+                    errors.append({"index": index, "detail": error})
+                continue
+            yield event
+
+    accepted = insert_events_bulk(db, valid_events(), batch_size=batch_size)
+    return {"accepted": accepted, "rejected": rejected, "errors": errors}
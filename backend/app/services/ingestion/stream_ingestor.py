@@ -0,0 +1,276 @@
+# backend/app/services/ingestion/stream_ingestor.py
+
+import asyncio
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.core import metrics
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.services.events_service import insert_events_bulk
+from app.services.ingestion.bulk_ingestor import MAX_REPORTED_ERRORS, validate_event
+
+
+class WriteTicket:
+    """
+    Tracks the events one upload queued until the writer has handled them,
+    with the index and error of those whose batch failed to write.
+    """
+
+    def __init__(self):
+        self.pending = 0
+        self.failures: List[Tuple[int, str]] = []
+        self._done = asyncio.Event()
+        self._done.set()
+
+    def add(self) -> None:
+        self.pending += 1
+        self._done.clear()
+
+    def resolve(self, index: int, error: Optional[str] = None) -> None:
+        if error is not None:
+            self.failures.append((index, error))
+        self.pending -= 1
+        if self.pending == 0:
+            self._done.set()
+
+    async def wait(self) -> None:
+        await self._done.wait()
+
+
+class EventWriteQueue:
+    """
+    Bounded in-memory queue between the ingest endpoints and the DB.
+
+    Producers `await put(event)`, which blocks while the queue is full, so a
+    fast upload is slowed down to the write speed instead of growing memory.
+    A background task drains the queue into source_events in batches of
+    INGEST_BATCH_SIZE, or whatever arrived within INGEST_FLUSH_INTERVAL_SECONDS.
+    """
+
+    def __init__(
+        self,
+        maxsize: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+    ):
+        self.maxsize = maxsize or settings.INGEST_QUEUE_SIZE
+        self.batch_size = batch_size or settings.INGEST_BATCH_SIZE
+        self.flush_interval = flush_interval or settings.INGEST_FLUSH_INTERVAL_SECONDS
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.written = 0
+        self.failed = 0
+
+    @property
+    def running(self) -> bool:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+        # A task left over from another (closed) event loop doesn't count.
+        return (
+            self._task is not None
+            and not self._task.done()
+            and self._loop is loop
+        )
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=self.maxsize)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Writes whatever is still queued, then stops the writer task.
+        """
+        if not self.running:
+            return
+        await self._queue.join()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def put(
+        self,
+        event: Dict[str, Any],
+        ticket: Optional[WriteTicket] = None,
+        index: int = 0,
+    ) -> None:
+        """
+        Queues an event; the ticket, if any, is resolved with the event's
+        index once its batch has been written or has failed.
+        """
+        if not self.running:
+            self.start()
+        if ticket is not None:
+            ticket.add()
+        await self._queue.put((event, ticket, index))
+
+    async def join(self) -> None:
+        """
+        Waits until every queued event has been written (or failed).
+        """
+        if self._queue is not None:
+            await self._queue.join()
+
+    def qsize(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def _next_batch(self) -> List[Tuple[Dict[str, Any], Optional[WriteTicket], int]]:
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.flush_interval
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._next_batch()
+            error = None
+            try:
+                # The DB write runs in a worker thread so the event loop keeps
+                # accepting uploads while a batch commits.
+                await run_in_threadpool(_write_batch, [event for event, _, _ in batch])
+                self.written += len(batch)
+                if metrics.ENABLED:
+                    metrics.INGEST_EVENTS.inc("written", amount=len(batch))
+            except Exception as e:
+                self.failed += len(batch)
+                if metrics.ENABLED:
+                    metrics.INGEST_EVENTS.inc("failed", amount=len(batch))
+                error = f"Write failed: {e}"
+                print(f"Error writing {len(batch)} ingested events: {e}")
+            finally:
+                for _, ticket, index in batch:
+                    if ticket is not None:
+                        ticket.resolve(index, error)
+                    self._queue.task_done()
+
+
+def _write_batch(batch: List[Dict[str, Any]]) -> None:
+    db = SessionLocal()
+    try:
+        insert_events_bulk(db, batch, batch_size=len(batch))
+    finally:
+        db.close()
+
+
+# Process-wide queue, started/stopped by the app lifespan in main.py
+event_write_queue = EventWriteQueue()
+
+
+async def iter_ndjson_lines(
+    chunks: AsyncIterator[bytes],
+    max_line_bytes: Optional[int] = None,
+) -> AsyncIterator[Optional[bytes]]:
+    """
+    Splits a streamed body into lines without buffering more than one line.
+    A line longer than max_line_bytes is dropped and yielded as None, so the
+    caller can reject it.
+    """
+    max_line_bytes = max_line_bytes or settings.INGEST_MAX_LINE_BYTES
+    # A bytearray grows in place, so a line arriving in many small chunks
+    # costs linear rather than quadratic copying.
+    buffer = bytearray()
+    skipping = False
+    async for chunk in chunks:
+        # The part already buffered holds no newline; only scan the new chunk.
+        search_from = len(buffer)
+        buffer += chunk
+        start = 0
+        while True:
+            end = buffer.find(b"\n", search_from)
+            if end < 0:
+                break
+            line = bytes(buffer[start:end])
+            start = search_from = end + 1
+            if skipping:
+                skipping = False
+                continue
+            yield line if len(line) <= max_line_bytes else None
+        del buffer[:start]
+        if len(buffer) > max_line_bytes:
+            # Drop the rest of an oversized line instead of buffering it.
+            buffer.clear()
+            if not skipping:
+                skipping = True
+                yield None
+    if buffer and not skipping:
+        yield bytes(buffer)
+
+
+async def ingest_ndjson_stream(
+    chunks: AsyncIterator[bytes],
+    queue: Optional[EventWriteQueue] = None,
+    wait: bool = False,
+) -> Dict[str, Any]:
+    """
+    Parses a streamed NDJSON body line by line and hands the valid events to
+    the write queue. Returns {"accepted", "rejected", "errors"}; accepted
+    events are queued, not necessarily committed yet.
+
+    With wait=True it also waits for the writer to handle this upload's
+    events: accepted events are then committed, and those whose batch failed
+    to write are counted as rejected.
+    """
+    queue = queue or event_write_queue
+    ticket = WriteTicket() if wait else None
+    accepted = 0
+    rejected = 0
+    errors: List[Dict[str, Any]] = []
+    index = 0
+
+    async for line in iter_ndjson_lines(chunks):
+        if line is None:
+            event, error = None, "Line too long"
+        elif not line.strip():
+            continue
+        else:
+            try:
+                event, error = validate_event(json.loads(line))
+            except ValueError as e:
+                event, error = None, f"Invalid JSON: {e}"
+
+        if error is not None:
+            rejected += 1
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append({"index": index, "detail": error})
+        else:
+            await queue.put(event, ticket, index)
+            accepted += 1
+        index += 1
+
+    if ticket is None:
+        return {"accepted": accepted, "rejected": rejected, "errors": errors}
+
+    await ticket.wait()
+    if ticket.failures:
+        accepted -= len(ticket.failures)
+        rejected += len(ticket.failures)
+        for failed_index, error in ticket.failures:
+            errors.append({"index": failed_index, "detail": error})
+        errors.sort(key=lambda error: error["index"])
+        del errors[MAX_REPORTED_ERRORS:]
+
+    return {"accepted": accepted, "rejected": rejected, "errors": errors}
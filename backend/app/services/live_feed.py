@@ -0,0 +1,460 @@
+# backend/app/services/live_feed.py
+
+import asyncio
+import itertools
+import json
+import os
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func, or_, select
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+from app.core.config import settings
+from app.db.session import ReadSessionLocal
+from app.services.events_service import add_insert_listener, remove_insert_listener
+from app.services.response_cache import (
+    FINDINGS_NAMESPACE,
+    STATS_NAMESPACE,
+    get_generations,
+)
+from app.services.stats_service import SEVERITY_ROLLUP
+
+# More new (or newly enriched) findings than this in one poll are not pushed
+# one by one: subscribers get a "resync" and reload the list instead
+MAX_FINDINGS_PER_POLL = 500
+# Unenriched findings watched for their enrichment (the newest ones)
+MAX_PENDING_ENRICHMENT = 10_000
+# Deduplicated findings watched for folded occurrences (the newest ones)
+MAX_WATCHED_AGGREGATES = 2_000
+# Messages kept for clients reconnecting with Last-Event-ID
+REPLAY_BUFFER_SIZE = 1000
+IN_CHUNK = 500
+
+UNENRICHED = or_(models.Finding.risk_score.is_(None), models.Finding.ai_explanation.is_(None))
+
+
+class FeedMessage:
+    __slots__ = ("seq", "id", "event", "data")
+
+    def __init__(self, seq: int, id: str, event: str, data: Dict[str, Any]):
+        self.seq = seq
+        self.id = id
+        self.event = event
+        self.data = data
+
+    def to_sse(self) -> str:
+        return f"id: {self.id}\nevent: {self.event}\ndata: {json.dumps(self.data)}\n\n"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"id": self.id, "event": self.event, "data": self.data}
+
+
+def _finding_data(finding: models.Finding) -> Dict[str, Any]:
+    return schemas.Finding.model_validate(finding).model_dump(mode="json")
+
+
+def _stats_snapshot(db: Session) -> Dict[str, Any]:
+    today = datetime.utcnow().date()
+    by_severity = {"low": 0, "medium": 0, "high": 0, "critical": 0}
+    total_findings = 0
+    for severity, count in db.execute(SEVERITY_ROLLUP).all():
+        total_findings += count or 0
+        if severity in by_severity:
+            by_severity[severity] = count or 0
+    total_events = db.scalar(select(func.sum(models.EventDailyCount.count))) or 0
+    events_today = db.scalar(
+        select(func.sum(models.EventDailyCount.count)).where(
+            models.EventDailyCount.day == today
+        )
+    ) or 0
+    return {
+        "day": str(today),
+        "findings_by_severity": by_severity,
+        "total_findings": total_findings,
+        "total_events": total_events,
+        "events_today": events_today,
+    }
+
+
+def _stats_delta(previous: Dict[str, Any], current: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    What changed between two snapshots, as increments. events_today counts
+    from zero again when the day changes.
+    """
+    delta: Dict[str, Any] = {}
+    severities = {
+        severity: count - previous["findings_by_severity"].get(severity, 0)
+        for severity, count in current["findings_by_severity"].items()
+    }
+    severities = {severity: n for severity, n in severities.items() if n}
+    if severities:
+        delta["findings_by_severity"] = severities
+    for key in ("total_findings", "total_events"):
+        if current[key] != previous[key]:
+            delta[key] = current[key] - previous[key]
+    events_today = current["events_today"] - (
+        previous["events_today"] if previous["day"] == current["day"] else 0
+    )
+    if events_today:
+        delta["events_today"] = events_today
+    return delta
+
+
+class LiveFeedHub:
+    """
+    Fan-out of finding and stats changes to the live feed subscribers
+    (GET /findings/stream, WS /findings/ws) of one API process.
+
+    A single background task watches the response cache generations, which
+    every writer (rules engine, enrichment, ingest, in any process) bumps in
+    its transaction. When they move, it reads what changed once (findings
+    above the last id seen, watched aggregates that folded more occurrences,
+    watched findings that got enriched, the rollup totals) and puts the messages on every subscriber's bounded queue, so the
+    database cost does not grow with the number of clients. It polls every
+    LIVE_FEED_POLL_SECONDS, and right away after an ingest batch of this
+    process; with no subscribers it does not query at all.
+
+    A subscriber whose queue is full is sent "resync" instead of the messages
+    it missed; the list endpoints stay the source of truth.
+    """
+
+    def __init__(
+        self,
+        poll_interval: Optional[float] = None,
+        queue_size: Optional[int] = None,
+    ):
+        self.poll_interval = poll_interval or settings.LIVE_FEED_POLL_SECONDS
+        self.queue_size = queue_size or settings.LIVE_FEED_CLIENT_QUEUE_SIZE
+        # message ids are "<epoch>-<seq>": ids of another process or of a
+        # previous run are not replayable
+        self._epoch = os.urandom(4).hex()
+        self._seq = itertools.count(1)
+        self._replay: Deque[FeedMessage] = deque(maxlen=REPLAY_BUFFER_SIZE)
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._reset()
+
+    def _reset(self) -> None:
+        # state of the database as of the last poll; None = take a baseline
+        self._generations: Optional[Dict[str, int]] = None
+        self._last_finding_id = 0
+        self._pending: "OrderedDict[int, None]" = OrderedDict()
+        # deduplicated finding id -> (occurrence_count, last_seen) last sent
+        self._aggregates: "OrderedDict[int, Tuple[int, Optional[datetime]]]" = OrderedDict()
+        self._stats: Optional[Dict[str, Any]] = None
+
+    # ---------- lifecycle ----------
+
+    @property
+    def running(self) -> bool:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+        return (
+            self._task is not None
+            and not self._task.done()
+            and self._loop is loop
+        )
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._reset()
+        # a hub restarted on a new event loop must not listen twice
+        remove_insert_listener(self.notify)
+        add_insert_listener(self.notify)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Stops polling and ends every subscription.
+        """
+        remove_insert_listener(self.notify)
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for queue in list(self._subscribers):
+            self._close(queue)
+        self._subscribers.clear()
+
+    def notify(self) -> None:
+        """
+        Polls now instead of at the next interval; safe from any thread.
+        """
+        loop, wakeup = self._loop, self._wakeup
+        if loop is None or wakeup is None or loop.is_closed():
+            return
+        try:
+            loop.call_soon_threadsafe(wakeup.set)
+        except RuntimeError:
+            # the loop closed in between
+            pass
+
+    # ---------- subscribers ----------
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self, last_event_id: Optional[str] = None) -> asyncio.Queue:
+        """
+        Queue of FeedMessages for one client; None marks the end of the feed.
+        With last_event_id, the messages since then are replayed if they are
+        still buffered, otherwise the queue starts with a "resync".
+        """
+        if not self.running:
+            self.start()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        if last_event_id:
+            missed = self._since(last_event_id)
+            if missed is None:
+                queue.put_nowait(self._message("resync", {"reason": "expired"}))
+            else:
+                for message in missed[: self.queue_size]:
+                    queue.put_nowait(message)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._subscribers.discard(queue)
+
+    def _since(self, last_event_id: str) -> Optional[List[FeedMessage]]:
+        epoch, _, seq = last_event_id.partition("-")
+        if epoch != self._epoch or not seq.isdigit():
+            return None
+        seq = int(seq)
+        if self._replay and self._replay[0].seq > seq + 1:
+            # some of the missed messages fell out of the buffer
+            return None
+        return [message for message in self._replay if message.seq > seq]
+
+    def _message(self, event: str, data: Dict[str, Any]) -> FeedMessage:
+        seq = next(self._seq)
+        return FeedMessage(seq, f"{self._epoch}-{seq}", event, data)
+
+    def publish(self, event: str, data: Dict[str, Any]) -> FeedMessage:
+        message = self._message(event, data)
+        self._replay.append(message)
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # slow client: drop what it has not read yet
+                self._drain(queue)
+                queue.put_nowait(self._message("resync", {"reason": "lagged"}))
+        return message
+
+    @staticmethod
+    def _drain(queue: asyncio.Queue) -> None:
+        while True:
+            try:
+                queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+
+    def _close(self, queue: asyncio.Queue) -> None:
+        try:
+            queue.put_nowait(None)
+        except asyncio.QueueFull:
+            self._drain(queue)
+            queue.put_nowait(None)
+
+    # ---------- polling ----------
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            if not self._subscribers:
+                # take a new baseline when someone subscribes again
+                self._reset()
+                continue
+            try:
+                messages = await run_in_threadpool(self._poll)
+            except Exception as e:
+                print(f"Live feed poll failed: {e}")
+                continue
+            for event, data in messages:
+                self.publish(event, data)
+
+    def _poll(self) -> List[Tuple[str, Dict[str, Any]]]:
+        db = ReadSessionLocal()
+        try:
+            generations = get_generations(db, (FINDINGS_NAMESPACE, STATS_NAMESPACE))
+            if self._generations is None:
+                self._baseline(db)
+                self._generations = generations
+                return []
+            messages: List[Tuple[str, Dict[str, Any]]] = []
+            if generations[FINDINGS_NAMESPACE] != self._generations[FINDINGS_NAMESPACE]:
+                messages.extend(self._new_findings(db))
+                messages.extend(self._updated_findings(db))
+                messages.extend(self._enriched_findings(db))
+            if generations[STATS_NAMESPACE] != self._generations[STATS_NAMESPACE]:
+                stats = _stats_snapshot(db)
+                delta = _stats_delta(self._stats, stats)
+                self._stats = stats
+                if delta:
+                    messages.append(("stats", {"delta": delta, "totals": stats}))
+            self._generations = generations
+            return messages
+        finally:
+            db.close()
+
+    def _baseline(self, db: Session) -> None:
+        self._last_finding_id = db.scalar(select(func.max(models.Finding.id))) or 0
+        self._watch_unenriched(db)
+        self._watch_aggregates(db)
+        self._stats = _stats_snapshot(db)
+
+    def _watch_unenriched(self, db: Session) -> None:
+        # ix_findings_unenriched
+        ids = db.scalars(
+            select(models.Finding.id)
+            .where(UNENRICHED)
+            .order_by(models.Finding.id.desc())
+            .limit(MAX_PENDING_ENRICHMENT)
+        ).all()
+        self._pending = OrderedDict((finding_id, None) for finding_id in reversed(ids))
+
+    def _watch_aggregates(self, db: Session) -> None:
+        rows = db.execute(
+            select(
+                models.Finding.id,
+                models.Finding.occurrence_count,
+                models.Finding.last_seen,
+            )
+            .where(models.Finding.dedup_key.is_not(None))
+            .order_by(models.Finding.id.desc())
+            .limit(MAX_WATCHED_AGGREGATES)
+        ).all()
+        self._aggregates = OrderedDict(
+            (finding_id, (count, last_seen))
+            for finding_id, count, last_seen in reversed(rows)
+        )
+
+    def _new_findings(self, db: Session) -> List[Tuple[str, Dict[str, Any]]]:
+        findings = db.scalars(
+            select(models.Finding)
+            .where(models.Finding.id > self._last_finding_id)
+            .order_by(models.Finding.id.asc())
+            .limit(MAX_FINDINGS_PER_POLL + 1)
+        ).all()
+        if not findings:
+            return []
+        if len(findings) > MAX_FINDINGS_PER_POLL:
+            # a rules batch: skip ahead instead of pushing thousands of messages
+            self._last_finding_id = db.scalar(select(func.max(models.Finding.id))) or 0
+            self._watch_unenriched(db)
+            self._watch_aggregates(db)
+            return [("resync", {"reason": "too_many_findings"})]
+        self._last_finding_id = findings[-1].id
+        for finding in findings:
+            if finding.risk_score is None or finding.ai_explanation is None:
+                self._pending[finding.id] = None
+            if finding.dedup_key is not None:
+                self._aggregates[finding.id] = (finding.occurrence_count, finding.last_seen)
+        while len(self._pending) > MAX_PENDING_ENRICHMENT:
+            self._pending.popitem(last=False)
+        while len(self._aggregates) > MAX_WATCHED_AGGREGATES:
+            self._aggregates.popitem(last=False)
+        return [("finding", _finding_data(finding)) for finding in findings]
+
+    def _updated_findings(self, db: Session) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        Watched aggregates whose occurrence_count or last_seen advanced since
+        they were last sent (occurrences folded in by the rules engine). One
+        that escalated lost its enrichment and is watched for it again.
+        """
+        if not self._aggregates:
+            return []
+        oldest = next(iter(self._aggregates))
+        rows = db.execute(
+            select(
+                models.Finding.id,
+                models.Finding.occurrence_count,
+                models.Finding.last_seen,
+            )
+            .where(models.Finding.dedup_key.is_not(None))
+            .where(models.Finding.id >= oldest)
+            .where(models.Finding.id <= self._last_finding_id)
+        ).all()
+        changed = []
+        for finding_id, count, last_seen in rows:
+            if finding_id in self._aggregates and self._aggregates[finding_id] != (count, last_seen):
+                self._aggregates[finding_id] = (count, last_seen)
+                changed.append(finding_id)
+        if not changed:
+            return []
+        if len(changed) > MAX_FINDINGS_PER_POLL:
+            return [("resync", {"reason": "too_many_findings"})]
+        findings = db.scalars(
+            select(models.Finding)
+            .where(models.Finding.id.in_(changed))
+            .order_by(models.Finding.id.asc())
+        ).all()
+        unenriched = [
+            finding.id
+            for finding in findings
+            if finding.id not in self._pending
+            and (finding.risk_score is None or finding.ai_explanation is None)
+        ]
+        if unenriched:
+            # _enriched_findings reads from the oldest pending id up
+            self._pending = OrderedDict(
+                (finding_id, None) for finding_id in sorted([*self._pending, *unenriched])
+            )
+            while len(self._pending) > MAX_PENDING_ENRICHMENT:
+                self._pending.popitem(last=False)
+        return [("finding_updated", _finding_data(finding)) for finding in findings]
+
+    def _enriched_findings(self, db: Session) -> List[Tuple[str, Dict[str, Any]]]:
+        if not self._pending:
+            return []
+        oldest = next(iter(self._pending))
+        # ix_findings_unenriched: still unenriched among the watched ones
+        unenriched = set(
+            db.scalars(
+                select(models.Finding.id)
+                .where(UNENRICHED)
+                .where(models.Finding.id >= oldest)
+            ).all()
+        )
+        done = [finding_id for finding_id in self._pending if finding_id not in unenriched]
+        if not done:
+            return []
+        for finding_id in done:
+            del self._pending[finding_id]
+        if len(done) > MAX_FINDINGS_PER_POLL:
+            return [("resync", {"reason": "too_many_findings"})]
+        messages = []
+        for start in range(0, len(done), IN_CHUNK):
+            findings = db.scalars(
+                select(models.Finding)
+                .where(models.Finding.id.in_(done[start:start + IN_CHUNK]))
+                .order_by(models.Finding.id.asc())
+            ).all()
+            messages.extend(
+                ("finding_enriched", _finding_data(finding)) for finding in findings
+            )
+        return messages
+
+
+# Process-wide hub, stopped by the app lifespan in main.py
+live_feed_hub = LiveFeedHub()
@@ -4,7 +4,7 @@ from typing import List , Dict , Any
 
 from sqlalchemy.orm import Session 
 
-from app.models import SourceEvent 
+from app.services.events_service import insert_events_bulk
 
 
 USERS = ["Alice" , "Bob" , "Charlie" , "David" , "Eve" , "Frank" , "George" , "Hannah" , "Isaac" , "James" , "Admin"]
@@ -177,14 +177,4 @@ def generate_fake_events_batch(n: int) -> List[Dict[str, Any]]:
 
 
 def save_events_to_db(events: List[Dict[str, Any]], db: Session) -> None:
-    db_events = [
-        SourceEvent(
-            user=e["user"],
-            event_type=e["event_type"],
-            raw_data=e["raw_data"],
-            timestamp=e["timestamp"],
-        )
-        for e in events
-    ]
-    db.add_all(db_events)
-    db.commit()
\ No newline at end of file
+    insert_events_bulk(db, events)
\ No newline at end of file
@@ -0,0 +1,132 @@
+# backend/app/services/pagination.py
+
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Sequence, Tuple
+
+from sqlalchemy import Select, and_, func, or_, select
+from sqlalchemy.orm import Session
+
+# (sort timestamp, id) of the last row of a page
+CursorKey = Tuple[datetime, int]
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(timestamp: datetime, row_id: int) -> str:
+    """
+    Opaque cursor token for the row a page ended with.
+    """
+    if timestamp is None:
+        raise ValueError(f"Row {row_id} has no timestamp to page from")
+    payload = json.dumps([timestamp.isoformat(), row_id], separators=(",", ":"))
+    token = base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+    return token.rstrip("=")
+
+
+def decode_cursor(cursor: str) -> CursorKey:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = base64.urlsafe_b64decode(padded.encode("ascii"))
+        timestamp, row_id = json.loads(payload)
+        return datetime.fromisoformat(timestamp), int(row_id)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(f"Invalid cursor {cursor!r}") from e
+
+
+def keyset_statement(
+    stmt: Select,
+    timestamp_column,
+    id_column,
+    limit: int,
+    cursor: Optional[str] = None,
+    offset: int = 0,
+) -> Select:
+    """
+    Newest-first page of `stmt` that starts after `cursor`:
+    WHERE (ts, id) < cursor ORDER BY ts DESC, id DESC LIMIT limit + 1 (the
+    extra row tells whether there is a next page). With an index on (ts, id)
+    every page costs the same, however deep it is. `offset` is only there
+    for callers that still page by number.
+
+    Rows with a NULL ts have no place on the keyset (SQLite sorts NULLs
+    last, PostgreSQL first) and are left out; PostgreSQL source_events
+    cannot hold them at all (see alembic 0003).
+    """
+    stmt = stmt.where(timestamp_column.is_not(None))
+    if cursor:
+        timestamp, row_id = decode_cursor(cursor)
+        stmt = stmt.where(
+            or_(
+                timestamp_column < timestamp,
+                and_(timestamp_column == timestamp, id_column < row_id),
+            )
+        )
+    return (
+        stmt.order_by(timestamp_column.desc(), id_column.desc())
+        .offset(offset or None)
+        .limit(limit + 1)
+    )
+
+
+def split_page(rows: Sequence, timestamp_column, id_column, limit: int):
+    """
+    Rows of a keyset_statement() -> (page rows, next_cursor); next_cursor is
+    None on the last page.
+    """
+    rows = list(rows)
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(
+            getattr(last, timestamp_column.key), getattr(last, id_column.key)
+        )
+    return rows, next_cursor
+
+
+def keyset_page(
+    db: Session,
+    stmt: Select,
+    timestamp_column,
+    id_column,
+    limit: int,
+    cursor: Optional[str] = None,
+    offset: int = 0,
+):
+    """
+    Runs keyset_statement() for an ORM entity select; returns
+    (rows, next_cursor).
+    """
+    page = keyset_statement(stmt, timestamp_column, id_column, limit, cursor, offset)
+    rows = db.execute(page).scalars().all()
+    return split_page(rows, timestamp_column, id_column, limit)
+
+
+def count_statement(stmt: Select) -> Select:
+    """
+    SELECT count(*) over the rows of `stmt`.
+    """
+    return select(func.count()).select_from(stmt.order_by(None).subquery())
+
+
+def planner_row_estimate(db: Session, stmt: Select) -> Optional[int]:
+    """
+    Row count estimated by the PostgreSQL planner (EXPLAIN, nothing is
+    executed), or None on other databases.
+    """
+    bind = db.get_bind()
+    if bind.dialect.name != "postgresql":
+        return None
+    compiled = stmt.compile(bind)
+    plan = (
+        db.connection()
+        .exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params)
+        .scalar()
+    )
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
@@ -0,0 +1,58 @@
+# backend/app/services/rate_limiter.py
+
+import threading
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: refills `rate_per_minute` tokens per minute up
+    to `capacity` (default: one minute worth). acquire() blocks until enough
+    tokens are available.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate_per_second = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate_per_second
+        )
+        self._updated = now
+
+    def acquire(self, amount: float = 1.0) -> None:
+        # A request bigger than the bucket would wait forever; cap it.
+        amount = min(amount, self.capacity)
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return
+                wait = (amount - self._tokens) / self.rate_per_second
+            time.sleep(wait)
+
+
+class RateLimiter:
+    """
+    Requests-per-minute and tokens-per-minute limits, as LLM APIs enforce them.
+    A limit <= 0 disables that bucket.
+    """
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        self.requests = (
+            TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        )
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+
+    def acquire(self, tokens: int) -> None:
+        if self.requests is not None:
+            self.requests.acquire(1)
+        if self.tokens is not None:
+            self.tokens.acquire(tokens)
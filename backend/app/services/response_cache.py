@@ -0,0 +1,147 @@
+# backend/app/services/response_cache.py
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Sequence, Tuple
+
+from sqlalchemy import Select, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.counters import increment_counts
+from app.models import CacheGeneration
+
+try:  # Redis is only needed for RESPONSE_CACHE_BACKEND=redis
+    import redis
+except ImportError:  # pragma: no cover - depends on the environment
+    redis = None
+
+STATS_NAMESPACE = "stats"
+FINDINGS_NAMESPACE = "findings"
+
+
+class CacheBackend:
+    """
+    Minimal byte-string cache interface used by the response cache.
+    """
+
+    def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: bytes, ttl: int) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    In-process LRU cache with per-entry expiry, capped at max_bytes of values.
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None):
+        self.max_bytes = max_bytes or settings.RESPONSE_CACHE_MAX_BYTES
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl: int) -> None:
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._size += len(value)
+            while self._size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _remove(self, key: str) -> None:
+        _, value = self._entries.pop(key)
+        self._size -= len(value)
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Shared cache on a Redis-compatible server; eviction is left to the
+    server's maxmemory policy (e.g. allkeys-lru).
+    """
+
+    prefix = "mcm:response:"
+
+    def __init__(self, url: Optional[str] = None):
+        if redis is None:
+            raise RuntimeError(
+                "The redis package is required for RESPONSE_CACHE_BACKEND=redis"
+            )
+        self._client = redis.Redis.from_url(url or settings.RESPONSE_CACHE_REDIS_URL)
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._client.get(self.prefix + key)
+
+    def set(self, key: str, value: bytes, ttl: int) -> None:
+        self._client.set(self.prefix + key, value, ex=ttl)
+
+    def clear(self) -> None:
+        for key in self._client.scan_iter(self.prefix + "*"):
+            self._client.delete(key)
+
+
+def create_cache_backend(name: Optional[str] = None) -> Optional[CacheBackend]:
+    """
+    Backend for RESPONSE_CACHE_BACKEND, or None when caching is off.
+    """
+    name = (name or settings.RESPONSE_CACHE_BACKEND).lower()
+    if name == "none":
+        return None
+    if name == "memory":
+        return MemoryCacheBackend()
+    if name == "redis":
+        return RedisCacheBackend()
+    raise ValueError(f"Unknown RESPONSE_CACHE_BACKEND={name!r}")
+
+
+def bump_generations(db: Session, *namespaces: str) -> None:
+    """
+    Invalidates the cached responses of the namespaces. Call it in the
+    transaction that changes the data, before commit.
+    """
+    increment_counts(
+        db,
+        CacheGeneration,
+        ("namespace",),
+        {(namespace,): 1 for namespace in namespaces},
+        value_column="generation",
+    )
+
+
+def generations_statement(namespaces: Sequence[str]) -> Select:
+    return select(CacheGeneration.namespace, CacheGeneration.generation).where(
+        CacheGeneration.namespace.in_(list(namespaces))
+    )
+
+
+def get_generations(db: Session, namespaces: Sequence[str]) -> Dict[str, int]:
+    rows = db.execute(generations_statement(namespaces)).all()
+    generations = {namespace: 0 for namespace in namespaces}
+    generations.update(dict(rows))
+    return generations
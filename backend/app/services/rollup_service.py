@@ -0,0 +1,99 @@
+# backend/app/services/rollup_service.py
+
+from collections import Counter
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, Tuple
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from app import models
+from app.db.counters import increment_counts
+from app.services.response_cache import STATS_NAMESPACE, bump_generations
+
+
+def _day(value: Any) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.utcnow().date()
+
+
+def add_event_counts(db: Session, events: Iterable[Dict[str, Any]]) -> None:
+    """
+    Counts newly inserted events (dicts with timestamp and event_type) into
+    event_daily_counts. Call it in the transaction that inserts them.
+    """
+    counts = Counter(
+        (_day(e.get("timestamp")), e.get("event_type") or "") for e in events
+    )
+    increment_counts(db, models.EventDailyCount, ("day", "event_type"), counts)
+
+
+def add_finding_counts(db: Session, findings: Iterable[Dict[str, Any]]) -> None:
+    """
+    Counts newly inserted findings (dicts with created_at and severity) into
+    finding_daily_counts. Call it in the transaction that inserts them.
+    """
+    counts = Counter(
+        (_day(f.get("created_at")), f.get("severity") or "") for f in findings
+    )
+    increment_counts(db, models.FindingDailyCount, ("day", "severity"), counts)
+
+
+def move_finding_counts(db: Session, findings: Iterable[Dict[str, Any]]) -> None:
+    """
+    Moves findings whose severity changed (dicts with created_at, severity
+    and previous_severity) to their new severity in finding_daily_counts.
+    Call it in the transaction that updates them.
+    """
+    counts: Counter = Counter()
+    for f in findings:
+        day = _day(f.get("created_at"))
+        counts[(day, f.get("previous_severity") or "")] -= 1
+        counts[(day, f.get("severity") or "")] += 1
+    increment_counts(db, models.FindingDailyCount, ("day", "severity"), counts)
+
+
+def rebuild_rollups(db: Session) -> Tuple[int, int]:
+    """
+    Recomputes both rollup tables from source_events and findings (backfill,
+    or repair after manual changes). Returns the number of rollup rows.
+    """
+    event_day = func.date(models.SourceEvent.timestamp)
+    finding_day = func.date(models.Finding.created_at)
+
+    db.execute(delete(models.EventDailyCount))
+    db.execute(delete(models.FindingDailyCount))
+
+    event_rows = [
+        {"day": _parse_day(day), "event_type": event_type or "", "count": count}
+        for day, event_type, count in db.execute(
+            select(event_day, models.SourceEvent.event_type, func.count())
+            .where(models.SourceEvent.timestamp.is_not(None))
+            .group_by(event_day, models.SourceEvent.event_type)
+        )
+    ]
+    finding_rows = [
+        {"day": _parse_day(day), "severity": severity or "", "count": count}
+        for day, severity, count in db.execute(
+            select(finding_day, models.Finding.severity, func.count())
+            .where(models.Finding.created_at.is_not(None))
+            .group_by(finding_day, models.Finding.severity)
+        )
+    ]
+    if event_rows:
+        db.execute(insert(models.EventDailyCount), event_rows)
+    if finding_rows:
+        db.execute(insert(models.FindingDailyCount), finding_rows)
+    bump_generations(db, STATS_NAMESPACE)
+    db.commit()
+    return len(event_rows), len(finding_rows)
+
+
+def _parse_day(value: Any) -> date:
+    # func.date() returns a string on SQLite and a date elsewhere
+    if isinstance(value, str):
+        return date.fromisoformat(value[:10])
+    return _day(value)
@@ -0,0 +1,339 @@
+# backend/app/services/rules/builtin_rules.py
+
+from datetime import timedelta
+
+from app.core.config import settings
+from app.services.rules.registry import RuleRegistry, window_label
+
+MAX_EVENTS_PER_HOUR = 30
+
+
+def register_builtin_rules(registry: RuleRegistry) -> RuleRegistry:
+    """
+    Registers the built-in rules (A–H). Thresholds live in each rule's
+    `thresholds` dict so they can be tuned from a rules file.
+
+    The rules that fire on every event of a burst (failed logins, MFA
+    failures, overall activity) fold their repeats within
+    FINDINGS_SUPPRESSION_SECONDS; the others report each occurrence.
+    """
+    repeats = timedelta(seconds=settings.FINDINGS_SUPPRESSION_SECONDS)
+
+    # ========== A. Auth / Login ==========
+    @registry.rule(
+        "failed_logins",
+        event_types=["login_failed"],
+        window=timedelta(hours=1),
+        thresholds={"critical": 8, "high": 5, "medium": 3},
+        suppression=repeats,
+    )
+    def failed_logins(ctx, rule):
+        # How many login_failed events were there for the user in the window?
+        failed_count = ctx.count("login_failed", rule.window)
+        description = (
+            f"User {ctx.event.user} had {failed_count} failed login attempts "
+            f"in the last {window_label(rule.window)}."
+        )
+
+        if failed_count >= rule.thresholds["critical"]:
+            return [
+                ctx.finding(
+                    rule_name="too_many_failed_logins_critical",
+                    description=description,
+                    severity="critical",
+                )
+            ]
+        if failed_count >= rule.thresholds["high"]:
+            return [
+                ctx.finding(
+                    rule_name="too_many_failed_logins",
+                    description=description,
+                    severity="high",
+                )
+            ]
+        if failed_count >= rule.thresholds["medium"]:
+            return [
+                ctx.finding(
+                    rule_name="multiple_failed_logins",
+                    description=description,
+                    severity="medium",
+                )
+            ]
+        # Also give some low to see some variety in the dashboard
+        return [
+            ctx.finding(
+                rule_name="single_failed_login",
+                description=f"User {ctx.event.user} had a failed login attempt.",
+                severity="low",
+            )
+        ]
+
+    @registry.rule(
+        "suspicious_login_after_failures",
+        event_types=["login_success"],
+        window=timedelta(minutes=30),
+        thresholds={
+            "min_failed_before": 3,
+            "unusual_locations": ["Russia", "China", "Other"],
+        },
+    )
+    def suspicious_login_after_failures(ctx, rule):
+        location = ctx.raw.get("location", "Unknown")
+        if location not in rule.thresholds["unusual_locations"]:
+            return []
+
+        # How many failures were there before this success?
+        failed_before = ctx.count("login_failed", rule.window)
+        if failed_before < rule.thresholds["min_failed_before"]:
+            return []
+
+        return [
+            ctx.finding(
+                rule_name="suspicious_login_after_failures",
+                description=(
+                    f"User {ctx.event.user} logged in successfully from {location} "
+                    f"after {failed_before} recent failed attempts."
+                ),
+                severity="critical",
+            )
+        ]
+
+    # ========== B. MFA ==========
+    @registry.rule(
+        "mfa_failures",
+        event_types=["mfa_failed"],
+        window=timedelta(minutes=10),
+        thresholds={"high": 5, "medium": 3},
+        suppression=repeats,
+    )
+    def mfa_failures(ctx, rule):
+        mfa_failed_count = ctx.count("mfa_failed", rule.window)
+        description = (
+            f"User {ctx.event.user} had {mfa_failed_count} MFA failures in the "
+            f"last {window_label(rule.window)}."
+        )
+
+        if mfa_failed_count >= rule.thresholds["high"]:
+            return [
+                ctx.finding(
+                    rule_name="too_many_mfa_failures",
+                    description=description,
+                    severity="high",
+                )
+            ]
+        if mfa_failed_count >= rule.thresholds["medium"]:
+            return [
+                ctx.finding(
+                    rule_name="multiple_mfa_failures",
+                    description=description,
+                    severity="medium",
+                )
+            ]
+        return []
+
+    # Also give low on mfa_success after failures
+    @registry.rule(
+        "mfa_success_after_failures",
+        event_types=["mfa_success"],
+        window=timedelta(minutes=10),
+        thresholds={"min_failures": 1},
+    )
+    def mfa_success_after_failures(ctx, rule):
+        mfa_failed_count = ctx.count("mfa_failed", rule.window)
+        if mfa_failed_count < rule.thresholds["min_failures"]:
+            return []
+
+        return [
+            ctx.finding(
+                rule_name="mfa_success_after_failures",
+                description=(
+                    f"User {ctx.event.user} had MFA success after {mfa_failed_count} "
+                    "recent failures."
+                ),
+                severity="low",
+            )
+        ]
+
+    # ========== C. Permissions / Roles ==========
+    @registry.rule("role_changes", event_types=["permission_changed"])
+    def role_changes(ctx, rule):
+        old_role = ctx.raw.get("old_role")
+        new_role = ctx.raw.get("new_role")
+        approved_by = ctx.raw.get("approved_by")
+
+        if new_role == "admin" and old_role != "admin":
+            severity = "critical" if not approved_by else "high"
+            return [
+                ctx.finding(
+                    rule_name="privilege_escalation_admin",
+                    description=(
+                        f"User {ctx.event.user} role changed from {old_role} to "
+                        f"{new_role}. Approved by: {approved_by}."
+                    ),
+                    severity=severity,
+                )
+            ]
+        if old_role == "viewer" and new_role == "developer":
+            return [
+                ctx.finding(
+                    rule_name="viewer_to_developer",
+                    description=(
+                        f"User {ctx.event.user} role changed from {old_role} to "
+                        f"{new_role}."
+                    ),
+                    severity="medium",
+                )
+            ]
+        return []
+
+    # ========== D. API Tokens ==========
+    @registry.rule("api_tokens", event_types=["api_token_created"])
+    def api_tokens(ctx, rule):
+        scopes = ctx.raw.get("scopes", [])
+        has_expiry = ctx.raw.get("has_expiry", True)
+
+        if "admin:*" in scopes:
+            return [
+                ctx.finding(
+                    rule_name="api_token_admin_scope",
+                    description=(
+                        f"User {ctx.event.user} created an API token with admin "
+                        f"scope: {scopes}."
+                    ),
+                    severity="critical",
+                )
+            ]
+        if not has_expiry:
+            return [
+                ctx.finding(
+                    rule_name="api_token_without_expiry",
+                    description=(
+                        f"User {ctx.event.user} created an API token without expiry."
+                    ),
+                    severity="high",
+                )
+            ]
+        return [
+            ctx.finding(
+                rule_name="api_token_created",
+                description=(
+                    f"User {ctx.event.user} created an API token with scopes: "
+                    f"{scopes}."
+                ),
+                severity="medium",
+            )
+        ]
+
+    # ========== E. Pull Requests / Code ==========
+    @registry.rule(
+        "pull_request_size",
+        event_types=["pull_request_merged"],
+        thresholds={"large_lines": 400, "medium_lines": 150},
+    )
+    def pull_request_size(ctx, rule):
+        lines_changed = ctx.raw.get("lines_changed", 0)
+        repo = ctx.raw.get("repo", "unknown")
+
+        if lines_changed > rule.thresholds["large_lines"]:
+            severity = "high"
+            rule_name = "large_pr_merged"
+        elif lines_changed > rule.thresholds["medium_lines"]:
+            severity = "medium"
+            rule_name = "medium_pr_merged"
+        else:
+            severity = "low"
+            rule_name = "small_pr_merged"
+
+        return [
+            ctx.finding(
+                rule_name=rule_name,
+                description=(
+                    f"Pull request merged into {repo} with {lines_changed} lines changed."
+                ),
+                severity=severity,
+            )
+        ]
+
+    # ========== F. Deployments ==========
+    @registry.rule(
+        "deployment_failed",
+        event_types=["deployment_failed"],
+        thresholds={
+            "severity_by_environment": {"prod": "high", "staging": "medium"},
+            "default_severity": "low",
+        },
+    )
+    def deployment_failed(ctx, rule):
+        env = ctx.raw.get("environment", "unknown")
+        service = ctx.raw.get("service", "unknown")
+        severity = rule.thresholds["severity_by_environment"].get(
+            env, rule.thresholds["default_severity"]
+        )
+
+        return [
+            ctx.finding(
+                rule_name="deployment_failed",
+                description=f"Deployment failed for service {service} in {env}.",
+                severity=severity,
+            )
+        ]
+
+    # ========== G. Storage / Buckets ==========
+    @registry.rule(
+        "bucket_exposure",
+        event_types=["storage_bucket_created", "storage_bucket_permission_changed"],
+    )
+    def bucket_exposure(ctx, rule):
+        bucket_name = ctx.raw.get("bucket_name", "unknown")
+        public = ctx.raw.get("public", False)
+        event_type = ctx.event.event_type
+
+        if public:
+            return [
+                ctx.finding(
+                    rule_name="public_bucket_detected",
+                    description=(
+                        f"Bucket {bucket_name} is publicly accessible "
+                        f"(event_type={event_type})."
+                    ),
+                    severity="critical",
+                )
+            ]
+        # low to see some variety in the dashboard
+        return [
+            ctx.finding(
+                rule_name="bucket_checked",
+                description=(
+                    f"Bucket {bucket_name} permission event "
+                    f"(event_type={event_type}, public={public})."
+                ),
+                severity="low",
+            )
+        ]
+
+    # ========== H. High activity generic rule ==========
+    # This is a reminder of the MAX_EVENTS_PER_HOUR concept.
+    @registry.rule(
+        "very_high_activity",
+        window=timedelta(hours=1),
+        thresholds={"max_events": MAX_EVENTS_PER_HOUR * 10},
+        scope="global",
+        suppression=repeats,
+    )
+    def very_high_activity(ctx, rule):
+        total = ctx.count_global(rule.window)
+        if total <= rule.thresholds["max_events"]:
+            return []
+
+        return [
+            ctx.finding(
+                rule_name="very_high_activity_last_hour",
+                description=(
+                    f"There were {total} events in the last "
+                    f"{window_label(rule.window)} overall."
+                ),
+                severity="high",
+            )
+        ]
+
+    return registry
@@ -0,0 +1,218 @@
+# backend/app/services/rules/dedup.py
+
+import hashlib
+import json
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import bindparam, case, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.db.counters import upsert_insert
+from app.models import Finding
+from app.services.rules.registry import Rule
+
+# Suppression windows are aligned on multiples of their length since this date
+EPOCH = datetime(1970, 1, 1)
+LOOKUP_BATCH_SIZE = 500
+# A burst that escalates is reported at the highest severity it reached
+SEVERITY_RANK = {"low": 0, "medium": 1, "high": 2, "critical": 3}
+
+_table = Finding.__table__
+
+# Folds a chunk's occurrences into an existing finding. The description and
+# sample event stay those the finding was created with, so an AI explanation
+# or risk score already written for it still matches.
+_FOLD_OCCURRENCES = (
+    update(_table)
+    .where(_table.c.dedup_key == bindparam("b_dedup_key"))
+    .values(
+        occurrence_count=_table.c.occurrence_count + bindparam("b_occurrence_count"),
+        first_seen=case(
+            (_table.c.first_seen > bindparam("b_first_seen"), bindparam("b_first_seen")),
+            else_=_table.c.first_seen,
+        ),
+        last_seen=case(
+            (_table.c.last_seen < bindparam("b_last_seen"), bindparam("b_last_seen")),
+            else_=_table.c.last_seen,
+        ),
+    )
+)
+
+# Raises an existing finding to a higher severity. It takes the description
+# and sample event of the escalating occurrence and is enriched again. The
+# severity it was read with guards against a concurrent writer.
+_ESCALATE_OCCURRENCE = (
+    update(_table)
+    .where(_table.c.dedup_key == bindparam("b_dedup_key"))
+    .where(_table.c.severity == bindparam("b_previous_severity"))
+    .values(
+        severity=bindparam("b_severity"),
+        rule_name=bindparam("b_rule_name"),
+        description=bindparam("b_description"),
+        sample_event_id=bindparam("b_sample_event_id"),
+        ai_explanation=None,
+        risk_score=None,
+    )
+)
+
+
+def _rank(severity: Optional[str]) -> int:
+    return SEVERITY_RANK.get(severity or "", -1)
+
+
+def suppression_window(rule: Rule) -> Optional[timedelta]:
+    """
+    The rule's suppression window, or None when every occurrence is its own
+    finding (rules opt in to suppression).
+    """
+    window = rule.suppression
+    return window if window is not None and window > timedelta(0) else None
+
+
+def dedup_key(
+    rule_name: str,
+    user: Optional[str],
+    seen_at: datetime,
+    window: timedelta,
+) -> str:
+    """
+    sha256 of what identifies an aggregated finding: rule, user and the
+    window seen_at falls in. rule_name is the rule's name, not the finding's,
+    so a burst that escalates stays one finding. Windows are fixed (tumbling)
+    event-time buckets, so the key does not depend on processing order or on
+    which process evaluates the event.
+    """
+    start = EPOCH + ((seen_at - EPOCH) // window) * window
+    encoded = json.dumps(
+        [rule_name, user, start.isoformat(), int(window.total_seconds())]
+    )
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def stamp_dedup_keys(findings: List[Finding], rule: Rule) -> None:
+    """
+    Sets the dedup_key of the findings a rule produced. Findings of global
+    rules are keyed without their user: one per window overall.
+    """
+    window = suppression_window(rule)
+    if window is None:
+        return
+    for finding in findings:
+        finding.dedup_key = dedup_key(
+            rule.name,
+            finding.user if rule.scope == "user" else None,
+            finding.first_seen,
+            window,
+        )
+
+
+def merge_occurrences(rows: Iterable[dict]) -> List[dict]:
+    """
+    Folds finding rows that share a dedup_key into one row per key. Its
+    severity, rule name, description and sample event are those of the
+    earliest occurrence at the highest severity.
+    """
+    merged: Dict[str, dict] = {}
+    # (rank, first_seen) of the occurrence each merged row describes
+    described: Dict[str, tuple] = {}
+    for row in rows:
+        key = row["dedup_key"]
+        current = merged.get(key)
+        if current is None:
+            merged[key] = dict(row)
+            described[key] = (_rank(row["severity"]), row["first_seen"])
+            continue
+        current["occurrence_count"] += row["occurrence_count"]
+        rank = _rank(row["severity"])
+        best_rank, best_seen = described[key]
+        if rank > best_rank or (rank == best_rank and row["first_seen"] < best_seen):
+            described[key] = (rank, row["first_seen"])
+            for name in ("severity", "rule_name", "description", "sample_event_id"):
+                current[name] = row[name]
+        if row["first_seen"] < current["first_seen"]:
+            current["first_seen"] = row["first_seen"]
+        if row["last_seen"] > current["last_seen"]:
+            current["last_seen"] = row["last_seen"]
+    return list(merged.values())
+
+
+def _existing_severities(db: Session, keys: List[str]) -> Dict[str, tuple]:
+    """(severity, created_at) of the findings holding the given keys."""
+    existing: Dict[str, tuple] = {}
+    for start in range(0, len(keys), LOOKUP_BATCH_SIZE):
+        existing.update(
+            (key, (severity, created_at))
+            for key, severity, created_at in db.execute(
+                select(_table.c.dedup_key, _table.c.severity, _table.c.created_at)
+                .where(_table.c.dedup_key.in_(keys[start : start + LOOKUP_BATCH_SIZE]))
+            )
+        )
+    return existing
+
+
+def write_findings(db: Session, rows: List[dict]) -> Tuple[List[dict], List[dict]]:
+    """
+    Writes a chunk's finding rows in the caller's transaction: rows without
+    a dedup_key are inserted as they are, the others are merged per key and
+    either inserted or folded into the finding already holding their key,
+    raising its severity when the chunk reached a higher one.
+
+    Returns (created, escalated) for the rollups: the rows that created a
+    finding, and for each escalated finding its created_at, severity and
+    previous_severity.
+    """
+    plain = [row for row in rows if row["dedup_key"] is None]
+    if plain:
+        db.execute(insert(Finding), plain)
+    merged = merge_occurrences(row for row in rows if row["dedup_key"] is not None)
+    if not merged:
+        return plain, []
+
+    dialect_insert = upsert_insert(db)
+    if dialect_insert is not None:
+        # the keys that were actually inserted; concurrent writers are safe
+        stmt = (
+            dialect_insert(_table)
+            .on_conflict_do_nothing(index_elements=["dedup_key"])
+            .returning(_table.c.dedup_key)
+        )
+        inserted = set(db.scalars(stmt, merged).all())
+        existing = None
+    else:
+        keys = [row["dedup_key"] for row in merged]
+        existing = _existing_severities(db, keys)
+        inserted = set(keys) - set(existing)
+        new_rows = [row for row in merged if row["dedup_key"] in inserted]
+        if new_rows:
+            db.execute(insert(_table), new_rows)
+
+    repeated = [row for row in merged if row["dedup_key"] not in inserted]
+    escalated: List[dict] = []
+    if repeated:
+        db.execute(_FOLD_OCCURRENCES, [
+            {f"b_{name}": row[name] for name in (
+                "dedup_key", "occurrence_count", "first_seen", "last_seen",
+            )}
+            for row in repeated
+        ])
+        if existing is None:
+            existing = _existing_severities(db, [row["dedup_key"] for row in repeated])
+        for row in repeated:
+            previous, created_at = existing.get(row["dedup_key"], (None, None))
+            if _rank(row["severity"]) <= _rank(previous):
+                continue
+            # one row per escalation (rare): only the writer that changed it moves the rollup
+            result = db.execute(_ESCALATE_OCCURRENCE, {
+                "b_previous_severity": previous,
+                **{f"b_{name}": row[name] for name in (
+                    "dedup_key", "severity", "rule_name", "description", "sample_event_id",
+                )},
+            })
+            if result.rowcount:
+                escalated.append({
+                    "created_at": created_at,
+                    "severity": row["severity"],
+                    "previous_severity": previous,
+                })
+    return plain + [row for row in merged if row["dedup_key"] in inserted], escalated
@@ -0,0 +1,295 @@
+# backend/app/services/rules/parallel.py
+
+import multiprocessing
+import queue as queue_module
+import traceback
+import zlib
+from datetime import datetime, timedelta
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal, engine
+from app.models import SourceEvent
+from app.services.rules.rules_engine import (
+    _evaluate_chunk,
+    _iter_event_chunks,
+    _write_chunk,
+    event_key,
+    get_rule_registry,
+    resolve_time_mode,
+    run_rules_on_new_events,
+)
+from app.services.rules.window_counters import EventTimeFeed, WindowCounters
+
+# Partition number of the worker that evaluates the global rules
+GLOBAL_PARTITION = -1
+
+EventKey = Tuple[datetime, int]
+
+
+def user_partition(user: Optional[str], workers: int) -> int:
+    """
+    Stable user -> partition mapping (the same in every process, unlike hash()).
+    """
+    if user is None:
+        return 0
+    return zlib.crc32(user.encode("utf-8")) % workers
+
+
+def _partition_filter(
+    partition: int,
+    workers: int,
+) -> Callable[[Optional[str]], bool]:
+    return lambda user: user_partition(user, workers) == partition
+
+
+def _iter_partition_chunks(
+    db: Session,
+    chunk_size: int,
+    user_filter: Callable[[Optional[str]], bool],
+    watermark: Optional[datetime],
+    max_id: int,
+) -> Iterator[Tuple[List[SourceEvent], EventKey]]:
+    """
+    Walks the unprocessed (id, user, timestamp) keys in keyset order and only
+    loads full SourceEvent objects for the users of this partition.
+    Yields (events, last key scanned).
+    """
+    for keys in _iter_event_chunks(
+        db,
+        chunk_size,
+        end=watermark,
+        max_id=max_id,
+        columns=(SourceEvent.id, SourceEvent.user, SourceEvent.timestamp),
+    ):
+        last_key = event_key(keys[-1])
+        ids = [key.id for key in keys if user_filter(key.user)]
+        if not ids:
+            yield [], last_key
+            continue
+        events = (
+            db.query(SourceEvent)
+            .filter(SourceEvent.id.in_(ids))
+            .order_by(SourceEvent.timestamp.asc(), SourceEvent.id.asc())
+            .all()
+        )
+        yield events, last_key
+
+
+def _iter_global_chunks(
+    db: Session,
+    chunk_size: int,
+    watermark: Optional[datetime],
+    max_id: int,
+) -> Iterator[Tuple[List, EventKey]]:
+    """
+    Same walk for the global rules, reading columns only (no ORM objects).
+    """
+    for rows in _iter_event_chunks(
+        db,
+        chunk_size,
+        end=watermark,
+        max_id=max_id,
+        columns=(
+            SourceEvent.id,
+            SourceEvent.user,
+            SourceEvent.event_type,
+            SourceEvent.timestamp,
+            SourceEvent.raw_data,
+        ),
+    ):
+        yield rows, event_key(rows[-1])
+
+
+def _rules_worker(
+    partition: int,
+    workers: int,
+    results: multiprocessing.Queue,
+    max_id: int,
+    watermark: Optional[datetime],
+    time_mode: str,
+    chunk_size: int,
+) -> None:
+    """
+    Process entry point. A user partition evaluates the per-user rules for its
+    users and sends ("chunk", rows, event ids, last key) messages; the
+    GLOBAL_PARTITION worker evaluates the global rules over every event and
+    sends ("global", rows, [], last key). Both end with
+    ("done", [], [partition], error).
+    """
+    # Never reuse connections inherited from the parent process.
+    engine.dispose(close=False)
+    db = SessionLocal()
+    error = None
+    try:
+        is_global = partition == GLOBAL_PARTITION
+        registry = get_rule_registry(reload=True).subset(
+            "global" if is_global else "user"
+        )
+        user_filter = None if is_global else _partition_filter(partition, workers)
+        counters = WindowCounters(max_window=registry.max_window)
+        feed: Optional[EventTimeFeed] = None
+        if time_mode == "event_time":
+            feed = EventTimeFeed(
+                db, counters, chunk_size=chunk_size, user_filter=user_filter
+            )
+        else:
+            counters.load(db, datetime.utcnow(), user_filter=user_filter)
+
+        if is_global:
+            chunks = _iter_global_chunks(db, chunk_size, watermark, max_id)
+        else:
+            chunks = _iter_partition_chunks(
+                db, chunk_size, user_filter, watermark, max_id
+            )
+
+        for events, last_key in chunks:
+            rows = _evaluate_chunk(db, events, counters, registry, feed)
+            if is_global:
+                results.put(("global", rows, [], last_key))
+            else:
+                ids = [event.id for event in events]
+                results.put(("chunk", rows, ids, last_key))
+            db.expunge_all()
+            if feed is None:
+                counters.evict(datetime.utcnow() - counters.max_window)
+    except Exception:
+        error = traceback.format_exc()
+    finally:
+        db.close()
+        results.put(("done", [], [partition], error))
+
+
+def run_rules_parallel(
+    db: Session,
+    workers: int,
+    chunk_size: Optional[int] = None,
+    time_mode: Optional[str] = None,
+    allowed_lateness: Optional[timedelta] = None,
+) -> Tuple[int, int]:
+    """
+    Same result as run_rules_on_new_events, spread over `workers` processes.
+
+    Unprocessed events are hash-partitioned by user; each worker keeps the
+    window state for its own users and sends its findings back to this
+    process, the single writer, which bulk-inserts them and marks the events
+    processed. One extra worker evaluates the global rules (e.g. overall
+    activity in the last hour) on the side, over a column-only scan.
+
+    Events are only marked processed once the global worker has scanned past
+    them, so it sees the same snapshot of unprocessed events as the
+    partition workers.
+
+    Returns (processed events, created findings).
+    """
+    if workers <= 1:
+        return run_rules_on_new_events(
+            db,
+            chunk_size=chunk_size,
+            time_mode=time_mode,
+            allowed_lateness=allowed_lateness,
+        )
+
+    chunk_size = chunk_size or settings.RULES_CHUNK_SIZE
+    time_mode, watermark = resolve_time_mode(time_mode, allowed_lateness)
+
+    # Snapshot: events inserted while we run are left for the next run.
+    max_id = db.query(func.max(SourceEvent.id)).scalar()
+    if max_id is None:
+        return 0, 0
+
+    partitions = list(range(workers))
+    if any(rule.enabled for rule in get_rule_registry(reload=True).subset("global").rules):
+        partitions.append(GLOBAL_PARTITION)
+
+    method = "fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn"
+    context = multiprocessing.get_context(method)
+    # Bounded, so workers pause when the writer falls behind.
+    results = context.Queue(maxsize=len(partitions) * 4)
+    processes = [
+        context.Process(
+            target=_rules_worker,
+            args=(partition, workers, results, max_id, watermark, time_mode, chunk_size),
+            daemon=True,
+        )
+        for partition in partitions
+    ]
+    for process in processes:
+        process.start()
+
+    total_events = 0
+    total_findings = 0
+    running = len(processes)
+    errors: List[str] = []
+    # Global progress: events up to this key may be marked processed.
+    global_done = GLOBAL_PARTITION not in partitions
+    global_key: Optional[EventKey] = None
+    # (last key, rows, event ids) of partition chunks waiting for the global worker
+    waiting: List[Tuple[EventKey, List[dict], List[int]]] = []
+    ready_rows: List[dict] = []
+    ready_ids: List[int] = []
+
+    def release() -> None:
+        nonlocal waiting
+        still_waiting = []
+        for last_key, rows, ids in waiting:
+            if global_done or (global_key is not None and last_key <= global_key):
+                ready_rows.extend(rows)
+                ready_ids.extend(ids)
+            else:
+                still_waiting.append((last_key, rows, ids))
+        waiting = still_waiting
+
+    def flush() -> None:
+        nonlocal total_events, total_findings
+        total_findings += _write_chunk(db, ready_rows, ready_ids)
+        total_events += len(ready_ids)
+        ready_rows.clear()
+        ready_ids.clear()
+
+    try:
+        while running:
+            try:
+                # Coalesce worker chunks into one commit while messages keep coming.
+                kind, rows, ids, payload = results.get(
+                    timeout=0 if ready_rows or ready_ids else 1
+                )
+            except queue_module.Empty:
+                if ready_rows or ready_ids:
+                    flush()
+                elif not any(process.is_alive() for process in processes):
+                    errors.append("A rules worker exited without reporting")
+                    break
+                continue
+
+            if kind == "chunk":
+                waiting.append((payload, rows, ids))
+            elif kind == "global":
+                ready_rows.extend(rows)
+                global_key = payload
+            else:
+                running -= 1
+                if payload:
+                    errors.append(payload)
+                    break
+                if ids == [GLOBAL_PARTITION]:
+                    global_done = True
+            release()
+            if len(ready_ids) + len(ready_rows) >= chunk_size:
+                flush()
+    finally:
+        for process in processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+
+    if errors:
+        raise RuntimeError(f"Rules worker failed:\n{errors[0]}")
+
+    global_done = True
+    release()
+    flush()
+    return total_events, total_findings
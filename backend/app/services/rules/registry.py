@@ -0,0 +1,259 @@
+# backend/app/services/rules/registry.py
+
+import json
+from dataclasses import dataclass, field
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:  # YAML rule files are optional, JSON always works
+    import yaml
+except ImportError:  # pragma: no cover - depends on the environment
+    yaml = None
+
+ALL_EVENT_TYPES = "*"
+
+# evaluate(ctx, rule) -> findings created for ctx.event
+RuleEvaluator = Callable[[Any, "Rule"], Iterable[Any]]
+
+
+@dataclass
+class Rule:
+    """
+    A single detection rule.
+
+    - event_types: event types the rule applies to ("*" = every event)
+    - window: look-back window for rules that count events, if any
+    - thresholds: tunable numbers/values read by the evaluator
+    - scope: "user" (state only depends on event.user) or "global"
+    - suppression: window within which repeated findings are folded into one
+      (None or 0 = one finding per occurrence)
+    """
+
+    name: str
+    evaluate: RuleEvaluator
+    event_types: Tuple[str, ...] = (ALL_EVENT_TYPES,)
+    window: Optional[timedelta] = None
+    thresholds: Dict[str, Any] = field(default_factory=dict)
+    scope: str = "user"
+    enabled: bool = True
+    suppression: Optional[timedelta] = None
+
+    @property
+    def applies_to_all(self) -> bool:
+        return ALL_EVENT_TYPES in self.event_types
+
+
+class RuleRegistry:
+    """
+    Holds the rules and compiles them into an event_type -> rules dispatch table,
+    so each event only runs the rules declared for its type (plus "*" rules).
+    """
+
+    def __init__(self):
+        self._rules: Dict[str, Rule] = {}
+        self._dispatch: Optional[Dict[str, List[Rule]]] = None
+        self._wildcard: List[Rule] = []
+
+    def register(self, rule: Rule) -> Rule:
+        if rule.name in self._rules:
+            raise ValueError(f"Rule {rule.name!r} is already registered")
+        self._rules[rule.name] = rule
+        self._dispatch = None
+        return rule
+
+    def rule(
+        self,
+        name: str,
+        event_types: Sequence[str] = (ALL_EVENT_TYPES,),
+        window: Optional[timedelta] = None,
+        thresholds: Optional[Dict[str, Any]] = None,
+        scope: str = "user",
+        suppression: Optional[timedelta] = None,
+    ) -> Callable[[RuleEvaluator], RuleEvaluator]:
+        """
+        Decorator that registers a Python function as a rule evaluator.
+        """
+
+        def decorator(evaluate: RuleEvaluator) -> RuleEvaluator:
+            self.register(
+                Rule(
+                    name=name,
+                    evaluate=evaluate,
+                    event_types=tuple(event_types),
+                    window=window,
+                    thresholds=dict(thresholds or {}),
+                    scope=scope,
+                    suppression=suppression,
+                )
+            )
+            return evaluate
+
+        return decorator
+
+    def subset(self, scope: str) -> "RuleRegistry":
+        """
+        A compiled registry holding only the rules with the given scope
+        ("user" or "global"), e.g. for partitioned workers.
+        """
+        registry = RuleRegistry()
+        for rule in self._rules.values():
+            if rule.scope == scope:
+                registry.register(rule)
+        registry.compile()
+        return registry
+
+    def get(self, name: str) -> Rule:
+        try:
+            return self._rules[name]
+        except KeyError:
+            raise ValueError(f"Unknown rule {name!r}") from None
+
+    @property
+    def rules(self) -> List[Rule]:
+        return list(self._rules.values())
+
+    @property
+    def max_window(self) -> timedelta:
+        windows = [r.window for r in self._rules.values() if r.enabled and r.window]
+        return max(windows, default=timedelta(0))
+
+    def compile(self) -> None:
+        """
+        Builds the dispatch table. Rules keep their registration order, and
+        "*" rules run after the type-specific ones.
+        """
+        enabled = [r for r in self._rules.values() if r.enabled]
+        self._wildcard = [r for r in enabled if r.applies_to_all]
+        specific: Dict[str, List[Rule]] = {}
+        for rule in enabled:
+            if rule.applies_to_all:
+                continue
+            for event_type in rule.event_types:
+                specific.setdefault(event_type, []).append(rule)
+        self._dispatch = {
+            event_type: rules + self._wildcard for event_type, rules in specific.items()
+        }
+
+    def rules_for(self, event_type: str) -> List[Rule]:
+        if self._dispatch is None:
+            self.compile()
+        return self._dispatch.get(event_type, self._wildcard)
+
+    def apply_config(self, config: Dict[str, Any]) -> None:
+        """
+        Applies a rules config (the parsed content of a JSON/YAML rules file):
+
+            {"rules": [
+                {"name": "failed_logins", "thresholds": {"critical": 10}},
+                {"name": "bucket_exposure", "enabled": false},
+                {"name": "very_high_activity", "suppression_seconds": 86400},
+                {"name": "many_token_revocations", "kind": "count_threshold",
+                 "event_types": ["api_token_revoked"], "window_seconds": 600,
+                 "levels": [{"min": 3, "severity": "medium"}]}
+            ]}
+
+        Entries naming an existing rule override its settings, entries with a
+        "kind" add a new declarative rule.
+        """
+        for spec in config.get("rules", []):
+            name = spec["name"]
+            if "kind" in spec:
+                self.register(_build_declarative_rule(spec))
+                continue
+
+            rule = self.get(name)
+            if "thresholds" in spec:
+                rule.thresholds.update(spec["thresholds"])
+            if "window_seconds" in spec:
+                rule.window = timedelta(seconds=spec["window_seconds"])
+            if "event_types" in spec:
+                rule.event_types = tuple(spec["event_types"])
+            if "enabled" in spec:
+                rule.enabled = bool(spec["enabled"])
+            if "suppression_seconds" in spec:
+                rule.suppression = timedelta(seconds=spec["suppression_seconds"])
+        self._dispatch = None
+
+
+def load_rules_file(path: str) -> Dict[str, Any]:
+    """
+    Reads a rules config from a .json, .yaml or .yml file.
+    """
+    file_path = Path(path)
+    text = file_path.read_text(encoding="utf-8")
+    if file_path.suffix.lower() in (".yaml", ".yml"):
+        if yaml is None:
+            raise RuntimeError(
+                f"PyYAML is required to load {path}; install it or use a JSON file"
+            )
+        return yaml.safe_load(text) or {}
+    return json.loads(text)
+
+
+def window_label(window: timedelta) -> str:
+    """
+    Human wording for a window, e.g. "hour", "10 minutes", "2 hours".
+    """
+    seconds = int(window.total_seconds())
+    if seconds % 3600 == 0:
+        hours = seconds // 3600
+        return "hour" if hours == 1 else f"{hours} hours"
+    if seconds % 60 == 0:
+        return f"{seconds // 60} minutes"
+    return f"{seconds} seconds"
+
+
+def _build_declarative_rule(spec: Dict[str, Any]) -> Rule:
+    """
+    Builds a rule defined purely as data. Supported kinds:
+    - count_threshold: counts `count_event_type` (default: the triggering
+      event's type) for the user in the window and emits a finding for the
+      first level whose "min" is reached.
+    """
+    kind = spec["kind"]
+    if kind != "count_threshold":
+        raise ValueError(f"Unknown rule kind {kind!r} for rule {spec['name']!r}")
+
+    levels = sorted(spec["levels"], key=lambda level: level["min"], reverse=True)
+    template = spec.get(
+        "description",
+        "User {user} had {count} {event_type} events in the last {window}.",
+    )
+
+    def evaluate(ctx, rule: Rule):
+        event_type = rule.thresholds.get("count_event_type") or ctx.event.event_type
+        count = ctx.count(event_type, rule.window)
+        for level in rule.thresholds["levels"]:
+            if count >= level["min"]:
+                return [
+                    ctx.finding(
+                        rule_name=level.get("rule_name", rule.name),
+                        description=template.format(
+                            user=ctx.event.user,
+                            count=count,
+                            event_type=event_type,
+                            window=window_label(rule.window),
+                        ),
+                        severity=level["severity"],
+                    )
+                ]
+        return []
+
+    return Rule(
+        name=spec["name"],
+        evaluate=evaluate,
+        event_types=tuple(spec.get("event_types", (ALL_EVENT_TYPES,))),
+        window=timedelta(seconds=spec.get("window_seconds", 3600)),
+        thresholds={
+            "levels": levels,
+            "count_event_type": spec.get("count_event_type"),
+        },
+        scope="user",
+        enabled=spec.get("enabled", True),
+        suppression=(
+            timedelta(seconds=spec["suppression_seconds"])
+            if "suppression_seconds" in spec
+            else None
+        ),
+    )
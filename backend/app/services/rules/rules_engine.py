@@ -1,12 +1,25 @@
+import time
 from datetime import datetime, timedelta
-from typing import List, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
 
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import and_, func, or_, update
 
+from app.core import metrics
+from app.core.config import settings
 from app.models import SourceEvent, Finding
-
-MAX_EVENTS_PER_HOUR = 30  
+from app.services.response_cache import (
+    FINDINGS_NAMESPACE,
+    STATS_NAMESPACE,
+    bump_generations,
+)
+from app.services.rollup_service import add_finding_counts, move_finding_counts
+from app.services.rules.dedup import stamp_dedup_keys, write_findings
+from app.services.rules.builtin_rules import MAX_EVENTS_PER_HOUR, register_builtin_rules
+from app.services.rules.registry import RuleRegistry, load_rules_file
+from app.services.rules.window_counters import EventTimeFeed, WindowCounters
+
+TIME_MODES = ("wall_clock", "event_time")
 
 def _create_finding(
     event: SourceEvent,
@@ -17,11 +30,16 @@ def _create_finding(
     """
     Helper function to create a Finding from an event.
     """
+    seen_at = event.timestamp or datetime.utcnow()
     return Finding(
         rule_name=rule_name,
         description=description,
         severity=severity,
         user=event.user,
+        occurrence_count=1,
+        first_seen=seen_at,
+        last_seen=seen_at,
+        sample_event_id=event.id,
     )
 
 
@@ -30,344 +48,433 @@ def _count_events(
     user: str,
     event_type: str,
     since: datetime,
+    until: Optional[datetime] = None,
 ) -> int:
-    return (
+    query = (
         db.query(func.count(SourceEvent.id))
         .filter(SourceEvent.user == user)
         .filter(SourceEvent.event_type == event_type)
         .filter(SourceEvent.timestamp >= since)
-        .scalar()
-        or 0
     )
+    if until is not None:
+        query = query.filter(SourceEvent.timestamp <= until)
+    return query.scalar() or 0
+
+
+def _count_all_events(
+    db: Session,
+    since: datetime,
+    until: Optional[datetime] = None,
+) -> int:
+    query = db.query(func.count(SourceEvent.id)).filter(SourceEvent.timestamp >= since)
+    if until is not None:
+        query = query.filter(SourceEvent.timestamp <= until)
+    return query.scalar() or 0
 
 
-def apply_rules_to_event(event: SourceEvent, db: Session) -> List[Finding]:
+def _window_count(
+    db: Session,
+    counters: Optional[WindowCounters],
+    user: str,
+    event_type: str,
+    since: datetime,
+    until: Optional[datetime] = None,
+) -> int:
+    """
+    Counts from the in-memory counters when available, otherwise from the DB.
+    """
+    if counters is not None:
+        return counters.count(user, event_type, since, until)
+    return _count_events(db, user, event_type, since, until)
+
+
+class RuleContext:
+    """
+    What a rule sees while evaluating one event: the event, its raw_data,
+    windowed counts and a helper to build findings.
+    """
+
+    __slots__ = ("event", "raw", "db", "counters", "now", "until")
+
+    def __init__(
+        self,
+        event: SourceEvent,
+        db: Session,
+        counters: Optional[WindowCounters],
+        now: datetime,
+        until: Optional[datetime],
+    ):
+        self.event = event
+        self.raw = event.raw_data or {}
+        self.db = db
+        self.counters = counters
+        self.now = now
+        self.until = until
+
+    def count(self, event_type: str, window: timedelta) -> int:
+        """
+        Events of event_type for this event's user in the window.
+        """
+        return _window_count(
+            self.db,
+            self.counters,
+            self.event.user,
+            event_type,
+            self.now - window,
+            self.until,
+        )
+
+    def count_global(self, window: timedelta) -> int:
+        """
+        Events of any type/user in the window.
+        """
+        since = self.now - window
+        if self.counters is not None:
+            return self.counters.count_global(since, self.until)
+        return _count_all_events(self.db, since, self.until)
+
+    def finding(self, rule_name: str, description: str, severity: str) -> Finding:
+        return _create_finding(self.event, rule_name, description, severity)
+
+
+def build_rule_registry(rules_file: Optional[str] = None) -> RuleRegistry:
+    """
+    Built-in rules, plus the overrides / extra rules from rules_file
+    (default: settings.RULES_FILE) when one is configured.
+    """
+    registry = register_builtin_rules(RuleRegistry())
+    rules_file = rules_file or settings.RULES_FILE
+    if rules_file:
+        registry.apply_config(load_rules_file(rules_file))
+    registry.compile()
+    return registry
+
+
+_default_registry: Optional[RuleRegistry] = None
+
+
+def get_rule_registry(reload: bool = False) -> RuleRegistry:
+    """
+    Process-wide registry. reload=True re-reads the rules file, so thresholds
+    can be tuned without a deploy.
+    """
+    global _default_registry
+    if _default_registry is None or reload:
+        _default_registry = build_rule_registry()
+    return _default_registry
+
+
+def apply_rules_to_event(
+    event: SourceEvent,
+    db: Session,
+    counters: Optional[WindowCounters] = None,
+    as_of: Optional[datetime] = None,
+    registry: Optional[RuleRegistry] = None,
+) -> List[Finding]:
     """
     Takes a single event, returns a list of Findings created from it.
+    Only the rules registered for event.event_type (plus "*" rules) run.
+
+    counters – optional pre-filled WindowCounters; without them every
+    windowed rule runs its own COUNT query.
+    as_of – event-time mode: windows cover [as_of - window, as_of] (normally
+    as_of = event.timestamp). When None, windows are anchored to the wall
+    clock and open-ended, as in live processing.
+
+    Findings of rules with a suppression window carry a dedup_key; writing
+    them folds repeats into one finding (see rules/dedup.py).
     """
+    registry = registry or get_rule_registry()
+    ctx = RuleContext(event, db, counters, now=as_of or datetime.utcnow(), until=as_of)
+
     findings: List[Finding] = []
-    raw = event.raw_data or {}
-    now = datetime.utcnow()
-
-    # ========== A. Auth / Login ==========
-    if event.event_type == "login_failed":
-        # How many login_failed events were there for the user in the last hour?
-        since = now - timedelta(hours=1)
-        failed_count = _count_events(db, event.user, "login_failed", since)
-
-        if failed_count >= 8:
-            findings.append(
-                _create_finding(
-                    event,
-                    rule_name="too_many_failed_logins_critical",
-                    description=(
-                        f"User {event.user} had {failed_count} failed login attempts "
-                        f"in the last hour."
-                    ),
-                    severity="critical",
-                )
-            )
-        elif failed_count >= 5:
-            findings.append(
-                _create_finding(
-                    event,
-                    rule_name="too_many_failed_logins",
-                    description=(
-                        f"User {event.user} had {failed_count} failed login attempts "
-                        f"in the last hour."
-                    ),
-                    severity="high",
-                )
-            )
-        elif failed_count >= 3:
-            findings.append(
-                _create_finding(
-                    event,
-                    rule_name="multiple_failed_logins",
-                    description=(
-                        f"User {event.user} had {failed_count} failed login attempts "
-                        f"in the last hour."
-                    ),
-                    severity="medium",
-                )
-            )
-        else:
-            # Also give some low to see some variety in the dashboard
-            findings.append(
-                _create_finding(
-                    event,
-                    rule_name="single_failed_login",
-                    description=f"User {event.user} had a failed login attempt.",
-                    severity="low",
-                )
-            )
+    if not metrics.ENABLED:
+        for rule in registry.rules_for(event.event_type):
+            produced = list(rule.evaluate(ctx, rule))
+            if produced:
+                stamp_dedup_keys(produced, rule)
+                findings.extend(produced)
+        return findings
+
+    for rule in registry.rules_for(event.event_type):
+        start = time.perf_counter()
+        produced = list(rule.evaluate(ctx, rule))
+        metrics.RULE_SECONDS.observe(time.perf_counter() - start, rule.name)
+        if produced:
+            metrics.RULE_HITS.inc(rule.name, amount=len(produced))
+            stamp_dedup_keys(produced, rule)
+        findings.extend(produced)
+    return findings
 
-    if event.event_type == "login_success":
-        location = raw.get("location", "Unknown")
-        # How many failures were there before this success?
-        since = now - timedelta(minutes=30)
-        failed_before = _count_events(db, event.user, "login_failed", since)
-        unusual_locations = {"Russia", "China", "Other"}
-
-        if failed_before >= 3 and location in unusual_locations:
-            findings.append(
-                _create_finding(
-                    event,
-                    rule_name="suspicious_login_after_failures",
-                    description=(
-                        f"User {event.user} logged in successfully from {location} "
-                        f"after {failed_before} recent failed attempts."
-                    ),
-                    severity="critical",
-                )
-            )
 
-    # ========== B. MFA ==========
-    if event.event_type == "mfa_failed":
-        since = now - timedelta(minutes=10)
-        mfa_failed_count = _count_events(db, event.user, "mfa_failed", since)
-
-        if mfa_failed_count >= 5:
-            findings.append(
-                _create_finding(
-                    event,
-                    rule_name="too_many_mfa_failures",
-                    description=(
-                        f"User {event.user} had {mfa_failed_count} MFA failures in the "
-                        "last 10 minutes."
-                    ),
-                    severity="high",
-                )
-            )
-        elif mfa_failed_count >= 3:
-            findings.append(
-                _create_finding(
-                    event,
-                    rule_name="multiple_mfa_failures",
-                    description=(
-                        f"User {event.user} had {mfa_failed_count} MFA failures in the "
-                        "last 10 minutes."
-                    ),
-                    severity="medium",
-                )
-            )
+def _finding_to_row(finding: Finding) -> dict:
+    return {
+        "rule_name": finding.rule_name,
+        "description": finding.description,
+        "severity": finding.severity,
+        "user": finding.user,
+        "occurrence_count": finding.occurrence_count,
+        "first_seen": finding.first_seen,
+        "last_seen": finding.last_seen,
+        "sample_event_id": finding.sample_event_id,
+        "dedup_key": finding.dedup_key,
+    }
 
-    # Also give low on mfa_success after failures
-    if event.event_type == "mfa_success":
-        since = now - timedelta(minutes=10)
-        mfa_failed_count = _count_events(db, event.user, "mfa_failed", since)
-        if mfa_failed_count > 0:
-            findings.append(
-                _create_finding(
-                    event,
-                    rule_name="mfa_success_after_failures",
-                    description=(
-                        f"User {event.user} had MFA success after {mfa_failed_count} "
-                        "recent failures."
-                    ),
-                    severity="low",
-                )
-            )
 
-    # ========== C. Permissions / Roles ==========
-    if event.event_type == "permission_changed":
-        old_role = raw.get("old_role")
-        new_role = raw.get("new_role")
-        approved_by = raw.get("approved_by")
-
-        if new_role == "admin" and old_role != "admin":
-            severity = "critical" if not approved_by else "high"
-            findings.append(
-                _create_finding(
-                    event,
-                    rule_name="privilege_escalation_admin",
-                    description=(
-                        f"User {event.user} role changed from {old_role} to {new_role}. "
-                        f"Approved by: {approved_by}."
-                    ),
-                    severity=severity,
-                )
-            )
-        elif old_role == "viewer" and new_role == "developer":
-            findings.append(
-                _create_finding(
-                    event,
-                    rule_name="viewer_to_developer",
-                    description=(
-                        f"User {event.user} role changed from {old_role} to {new_role}."
-                    ),
-                    severity="medium",
-                )
-            )
+# Sort key of events without a timestamp: the walk yields them last
+NULL_TIMESTAMP_KEY = datetime.max
 
-    # ========== D. API Tokens ==========
-    if event.event_type == "api_token_created":
-        scopes = raw.get("scopes", [])
-        has_expiry = raw.get("has_expiry", True)
-
-        if "admin:*" in scopes:
-            findings.append(
-                _create_finding(
-                    event,
-                    rule_name="api_token_admin_scope",
-                    description=(
-                        f"User {event.user} created an API token with admin scope: "
-                        f"{scopes}."
-                    ),
-                    severity="critical",
-                )
-            )
-        elif not has_expiry:
-            findings.append(
-                _create_finding(
-                    event,
-                    rule_name="api_token_without_expiry",
-                    description=(
-                        f"User {event.user} created an API token without expiry."
-                    ),
-                    severity="high",
-                )
-            )
-        else:
-            findings.append(
-                _create_finding(
-                    event,
-                    rule_name="api_token_created",
-                    description=(
-                        f"User {event.user} created an API token with scopes: {scopes}."
-                    ),
-                    severity="medium",
+
+def event_key(event: Any) -> Tuple[datetime, int]:
+    """
+    (timestamp, id) position of an event (or row) in _iter_event_chunks order.
+    """
+    return (
+        event.timestamp if event.timestamp is not None else NULL_TIMESTAMP_KEY,
+        event.id,
+    )
+
+
+def _iter_event_chunks(
+    db: Session,
+    chunk_size: int,
+    unprocessed_only: bool = True,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    max_id: Optional[int] = None,
+    columns: Optional[Sequence[Any]] = None,
+) -> Iterator[List[Any]]:
+    """
+    Walks events in (timestamp, id) keyset order, chunk_size at a time, then
+    the events without a timestamp in id order (not when start is given: a
+    time range cannot contain them).
+    - unprocessed_only: only events with processed == False
+    - start / end: optional inclusive timestamp bounds
+    - max_id: ignore events inserted after a snapshot of the table
+    - columns: load only these columns (must include id and timestamp)
+      instead of full SourceEvent objects
+    """
+
+    def base_query():
+        query = db.query(*columns) if columns else db.query(SourceEvent)
+        if unprocessed_only:
+            query = query.filter(SourceEvent.processed == False)
+        if max_id is not None:
+            query = query.filter(SourceEvent.id <= max_id)
+        return query
+
+    last_key: Optional[Tuple[datetime, int]] = None
+    while True:
+        # NULL timestamps would make the keyset predicate NULL
+        query = base_query().filter(SourceEvent.timestamp.is_not(None))
+        if start is not None:
+            query = query.filter(SourceEvent.timestamp >= start)
+        if end is not None:
+            query = query.filter(SourceEvent.timestamp <= end)
+        if last_key is not None:
+            last_ts, last_id = last_key
+            query = query.filter(
+                or_(
+                    SourceEvent.timestamp > last_ts,
+                    and_(SourceEvent.timestamp == last_ts, SourceEvent.id > last_id),
                 )
             )
-
-    # ========== E. Pull Requests / Code ==========
-    if event.event_type == "pull_request_merged":
-        lines_changed = raw.get("lines_changed", 0)
-        repo = raw.get("repo", "unknown")
-
-        if lines_changed > 400:
-            severity = "high"
-            rule_name = "large_pr_merged"
-        elif lines_changed > 150:
-            severity = "medium"
-            rule_name = "medium_pr_merged"
-        else:
-            severity = "low"
-            rule_name = "small_pr_merged"
-
-        findings.append(
-            _create_finding(
-                event,
-                rule_name=rule_name,
-                description=(
-                    f"Pull request merged into {repo} with {lines_changed} lines changed."
-                ),
-                severity=severity,
+        with metrics.timed(metrics.RULES_PHASE_SECONDS, "load"):
+            chunk = (
+                query.order_by(SourceEvent.timestamp.asc(), SourceEvent.id.asc())
+                .limit(chunk_size)
+                .all()
             )
+        if not chunk:
+            break
+        # Read the key before the caller commits and expunges the chunk.
+        last_key = (chunk[-1].timestamp, chunk[-1].id)
+        yield chunk
+
+    if start is not None:
+        return
+    last_id = 0
+    while True:
+        query = (
+            base_query()
+            .filter(SourceEvent.timestamp.is_(None))
+            .filter(SourceEvent.id > last_id)
         )
+        with metrics.timed(metrics.RULES_PHASE_SECONDS, "load"):
+            chunk = query.order_by(SourceEvent.id.asc()).limit(chunk_size).all()
+        if not chunk:
+            return
+        last_id = chunk[-1].id
+        yield chunk
 
-    # ========== F. Deployments ==========
-    if event.event_type == "deployment_failed":
-        env = raw.get("environment", "unknown")
-        service = raw.get("service", "unknown")
-
-        if env == "prod":
-            severity = "high"
-        elif env == "staging":
-            severity = "medium"
-        else:
-            severity = "low"
-
-        findings.append(
-            _create_finding(
-                event,
-                rule_name="deployment_failed",
-                description=f"Deployment failed for service {service} in {env}.",
-                severity=severity,
-            )
-        )
 
-    # ========== G. Storage / Buckets ==========
-    if event.event_type in ("storage_bucket_created", "storage_bucket_permission_changed"):
-        bucket_name = raw.get("bucket_name", "unknown")
-        public = raw.get("public", False)
-
-        if public:
-            findings.append(
-                _create_finding(
-                    event,
-                    rule_name="public_bucket_detected",
-                    description=(
-                        f"Bucket {bucket_name} is publicly accessible "
-                        f"(event_type={event.event_type})."
-                    ),
-                    severity="critical",
-                )
-            )
-        else:
-            # low to see some variety in the dashboard
-            findings.append(
-                _create_finding(
-                    event,
-                    rule_name="bucket_checked",
-                    description=(
-                        f"Bucket {bucket_name} permission event "
-                        f"(event_type={event.event_type}, public={public})."
-                    ),
-                    severity="low",
+def _evaluate_chunk(
+    db: Session,
+    chunk: List[SourceEvent],
+    counters: WindowCounters,
+    registry: RuleRegistry,
+    feed: Optional[EventTimeFeed] = None,
+) -> List[dict]:
+    """
+    Runs the rules on every event of a chunk and returns the findings as rows.
+    With a feed the rules run in event-time mode (events without a timestamp
+    against the wall clock).
+    """
+    rows: List[dict] = []
+    with metrics.timed(metrics.RULES_PHASE_SECONDS, "evaluate"):
+        for event in chunk:
+            if feed is not None and event.timestamp is not None:
+                feed.advance_to(event.timestamp)
+                findings = apply_rules_to_event(
+                    event, db, counters, as_of=event.timestamp, registry=registry
                 )
-            )
+            else:
+                findings = apply_rules_to_event(event, db, counters, registry=registry)
+            rows.extend(_finding_to_row(f) for f in findings)
+    if metrics.ENABLED:
+        metrics.RULES_EVENTS.inc(amount=len(chunk))
+    return rows
+
+
+def resolve_time_mode(
+    time_mode: Optional[str],
+    allowed_lateness: Optional[timedelta],
+) -> Tuple[str, Optional[datetime]]:
+    """
+    Returns (time_mode, watermark). The watermark is only set in event-time
+    mode: events newer than it are left for a later run.
+    """
+    time_mode = time_mode or settings.RULES_TIME_MODE
+    if time_mode not in TIME_MODES:
+        raise ValueError(f"Unknown time_mode={time_mode!r}, expected one of {TIME_MODES}")
+    if time_mode != "event_time":
+        return time_mode, None
+    if allowed_lateness is None:
+        allowed_lateness = timedelta(seconds=settings.RULES_ALLOWED_LATENESS_SECONDS)
+    return time_mode, datetime.utcnow() - allowed_lateness
 
-    # ========== H. High activity generic rule ==========
-    # This is a reminder of the MAX_EVENTS_PER_HOUR concept.
-    since = now - timedelta(hours=1)
-    total_last_hour = (
-        db.query(func.count(SourceEvent.id))
-        .filter(SourceEvent.timestamp >= since)
-        .scalar()
-        or 0
-    )
 
-    if total_last_hour > MAX_EVENTS_PER_HOUR * 10:
-        findings.append(
-            _create_finding(
-                event,
-                rule_name="very_high_activity_last_hour",
-                description=(
-                    f"There were {total_last_hour} events in the last hour overall."
-                ),
-                severity="high",
+def _write_chunk(db: Session, rows: List[dict], event_ids: List[int]) -> int:
+    """
+    Bulk-writes a chunk's findings (repeats folded into their existing
+    finding), updates the findings rollup, invalidates cached stats/findings
+    responses, marks its events processed with one UPDATE and commits.
+    Returns the number of findings created.
+    """
+    created: List[dict] = []
+    with metrics.timed(metrics.RULES_PHASE_SECONDS, "insert"):
+        if rows:
+            now = datetime.utcnow()
+            for row in rows:
+                # Stamped here so the row and its rollup day agree
+                row.setdefault("created_at", now)
+            created, escalated = write_findings(db, rows)
+            # the rollup counts findings, not occurrences
+            add_finding_counts(db, created)
+            move_finding_counts(db, escalated)
+            bump_generations(db, STATS_NAMESPACE, FINDINGS_NAMESPACE)
+        if event_ids:
+            db.execute(
+                update(SourceEvent)
+                .where(SourceEvent.id.in_(event_ids))
+                .values(processed=True)
+                .execution_options(synchronize_session=False)
             )
-        )
-
-    return findings
+    with metrics.timed(metrics.RULES_PHASE_SECONDS, "commit"):
+        db.commit()
+    return len(created)
 
 
-def run_rules_on_new_events(db: Session) -> Tuple[int, int]:
+def run_rules_on_new_events(
+    db: Session,
+    chunk_size: Optional[int] = None,
+    time_mode: Optional[str] = None,
+    allowed_lateness: Optional[timedelta] = None,
+) -> Tuple[int, int]:
     """
     Runs all rules on events that haven't been processed yet (processed == False),
     marks them as processed, and returns:
     - How many events were processed
-    - How many findings were created
+    - How many findings were created (occurrences folded into an existing
+      finding are not counted)
+
+    Events are streamed in chunks of chunk_size (default: settings.RULES_CHUNK_SIZE).
+    Each chunk bulk-inserts its findings, marks its events processed with one
+    UPDATE and commits, so memory stays flat and a crash only loses the
+    current chunk.
+
+    time_mode (default: settings.RULES_TIME_MODE):
+    - "wall_clock": windows are anchored to the current time.
+    - "event_time": windows are anchored to each event's timestamp. Only events
+      older than the watermark (now - allowed_lateness) are processed, so events
+      that arrive up to allowed_lateness late are still counted in their windows.
     """
-    new_events = (
-        db.query(SourceEvent)
-        .filter(SourceEvent.processed == False) 
-        .order_by(SourceEvent.timestamp.asc())
-        .all()
-    )
+    chunk_size = chunk_size or settings.RULES_CHUNK_SIZE
+    time_mode, watermark = resolve_time_mode(time_mode, allowed_lateness)
 
-    if not new_events:
-        return 0, 0
+    registry = get_rule_registry(reload=True)
+    counters = WindowCounters(max_window=registry.max_window)
+    feed: Optional[EventTimeFeed] = None
 
+    if time_mode == "event_time":
+        feed = EventTimeFeed(db, counters, chunk_size=chunk_size)
+    else:
+        # One query up front instead of two or three COUNT queries per event.
+        counters.load(db, datetime.utcnow())
+
+    total_events = 0
     total_findings = 0
 
-    for event in new_events:
-        findings = apply_rules_to_event(event, db)
-        for finding in findings:
-            db.add(finding)
-        event.processed = True
-        total_findings += len(findings)
+    for chunk in _iter_event_chunks(db, chunk_size, end=watermark):
+        rows = _evaluate_chunk(db, chunk, counters, registry, feed)
+        created = _write_chunk(db, rows, [event.id for event in chunk])
+        # Drop the chunk's ORM objects so the session doesn't grow with the backlog.
+        db.expunge_all()
+
+        total_events += len(chunk)
+        total_findings += created
+        if feed is None:
+            counters.evict(datetime.utcnow() - counters.max_window)
+
+    return total_events, total_findings
 
-    db.commit()
-    return len(new_events), total_findings
+
+def replay_rules(
+    db: Session,
+    start: datetime,
+    end: datetime,
+    chunk_size: Optional[int] = None,
+    write: bool = False,
+) -> Tuple[int, Dict[str, int]]:
+    """
+    Re-runs the rules in event-time mode over every event with
+    start <= timestamp <= end, processed or not.
+
+    Replays are deterministic: each window only depends on the events stored in
+    the table, not on when the replay runs. Events are not marked processed, and
+    findings are only inserted when write=True.
+
+    Returns (events replayed, finding occurrences per rule_name, before
+    deduplication).
+    """
+    chunk_size = chunk_size or settings.RULES_CHUNK_SIZE
+    registry = get_rule_registry(reload=True)
+    counters = WindowCounters(max_window=registry.max_window)
+    feed = EventTimeFeed(db, counters, chunk_size=chunk_size)
+
+    total_events = 0
+    by_rule: Dict[str, int] = {}
+
+    for chunk in _iter_event_chunks(
+        db, chunk_size, unprocessed_only=False, start=start, end=end
+    ):
+        rows = _evaluate_chunk(db, chunk, counters, registry, feed)
+        for row in rows:
+            by_rule[row["rule_name"]] = by_rule.get(row["rule_name"], 0) + 1
+
+        if write and rows:
+            _write_chunk(db, rows, [])
+        db.expunge_all()
+        total_events += len(chunk)
+
+    return total_events, by_rule
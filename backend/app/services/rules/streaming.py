@@ -0,0 +1,360 @@
+# backend/app/services/rules/streaming.py
+
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional, Tuple
+
+from sqlalchemy import func, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.core import metrics
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models import RulesCheckpoint, SourceEvent
+from app.services.events_service import add_insert_listener, remove_insert_listener
+from app.services.rules.rules_engine import (
+    _finding_to_row,
+    _write_chunk,
+    apply_rules_to_event,
+    get_rule_registry,
+)
+from app.services.rules.window_counters import WindowCounters
+
+DEFAULT_CHECKPOINT = "default"
+# How often events below the high-water mark that are still unprocessed
+# (ids committed out of order by concurrent writers) are picked up
+STRAGGLER_SWEEP_SECONDS = 5.0
+
+
+class StreamingRulesEngine:
+    """
+    Evaluates the rules on new events as they are committed, instead of in
+    scheduled run_rules batches.
+
+    Tails source_events by id above a high-water mark, keeps the window
+    counters in memory across batches and evaluates each event in event time
+    (windows end at event.timestamp, like replay_rules). The high-water mark
+    is committed with each batch's findings, so a restart neither loses nor
+    repeats findings; the counters are checkpointed every
+    checkpoint_interval seconds and brought up to date from source_events
+    on restart.
+
+    Only one engine should consume a table at a time, and not alongside
+    scheduled run_rules runs: both would evaluate the same unprocessed events.
+    """
+
+    def __init__(
+        self,
+        name: str = DEFAULT_CHECKPOINT,
+        batch_size: Optional[int] = None,
+        checkpoint_interval: Optional[float] = None,
+        allowed_lateness: Optional[timedelta] = None,
+        on_checkpoint: Optional[Callable[[], None]] = None,
+    ):
+        self.name = name
+        self.on_checkpoint = on_checkpoint
+        self.batch_size = batch_size or settings.RULES_STREAM_BATCH_SIZE
+        self.checkpoint_interval = (
+            checkpoint_interval or settings.RULES_STREAM_CHECKPOINT_SECONDS
+        )
+        if allowed_lateness is None:
+            allowed_lateness = timedelta(seconds=settings.RULES_ALLOWED_LATENESS_SECONDS)
+        self.allowed_lateness = allowed_lateness
+        self.registry = get_rule_registry(reload=True)
+        self.counters = WindowCounters(max_window=self.registry.max_window)
+        self.high_water_mark = 0
+        self._state_high_water_mark: Optional[int] = None
+        self._last_checkpoint = time.monotonic()
+        self._last_sweep = time.monotonic()
+
+    # ---------- start / checkpoints ----------
+
+    def start(self, db: Session) -> None:
+        """
+        Restores the high-water mark and the window counters from the
+        checkpoint, or starts at the oldest unprocessed event.
+        """
+        checkpoint = db.get(RulesCheckpoint, self.name)
+        if checkpoint is None:
+            first_unprocessed = db.scalar(
+                db.query(func.min(SourceEvent.id))
+                .filter(SourceEvent.processed == False)
+                .statement
+            )
+            if first_unprocessed is not None:
+                self.high_water_mark = first_unprocessed - 1
+            else:
+                self.high_water_mark = db.scalar(
+                    db.query(func.max(SourceEvent.id)).statement
+                ) or 0
+            db.add(
+                RulesCheckpoint(
+                    name=self.name,
+                    high_water_mark=self.high_water_mark,
+                    updated_at=datetime.utcnow(),
+                )
+            )
+            db.commit()
+            self._load_window(db)
+            return
+
+        self.high_water_mark = checkpoint.high_water_mark
+        counters = None
+        if checkpoint.state is not None:
+            try:
+                counters = WindowCounters.from_state(checkpoint.state)
+            except (ValueError, KeyError, TypeError) as e:
+                print(f"Ignoring unreadable rules checkpoint state: {e}")
+        if counters is None or counters.max_window != self.registry.max_window:
+            # no snapshot, or the rules changed their longest window
+            self._load_window(db)
+            return
+        self.counters = counters
+        self._state_high_water_mark = checkpoint.state_high_water_mark or 0
+        # catch up with the events consumed after the snapshot
+        rows = (
+            db.query(SourceEvent.user, SourceEvent.event_type, SourceEvent.timestamp)
+            .filter(SourceEvent.id > self._state_high_water_mark)
+            .filter(SourceEvent.id <= self.high_water_mark)
+            .yield_per(10_000)
+        )
+        for user, event_type, timestamp in rows:
+            self.counters.add(user, event_type, timestamp)
+        db.rollback()
+
+    def _load_window(self, db: Session) -> None:
+        """
+        Rebuilds the counters from the stored events up to the high-water
+        mark that are recent enough to matter for the next events.
+        """
+        self.counters = WindowCounters(max_window=self.registry.max_window)
+        newest = db.scalar(
+            db.query(func.max(SourceEvent.timestamp))
+            .filter(SourceEvent.id <= self.high_water_mark)
+            .statement
+        )
+        if newest is not None:
+            rows = (
+                db.query(SourceEvent.user, SourceEvent.event_type, SourceEvent.timestamp)
+                .filter(SourceEvent.id <= self.high_water_mark)
+                .filter(SourceEvent.timestamp >= newest - self._retention)
+                .yield_per(10_000)
+            )
+            for user, event_type, timestamp in rows:
+                self.counters.add(user, event_type, timestamp)
+        db.rollback()
+
+    def checkpoint(self, db: Session) -> None:
+        """
+        Saves the window counters as of the current high-water mark.
+        """
+        now = datetime.utcnow()
+        db.execute(
+            update(RulesCheckpoint)
+            .where(RulesCheckpoint.name == self.name)
+            .values(
+                high_water_mark=self.high_water_mark,
+                state=self.counters.to_state(),
+                state_high_water_mark=self.high_water_mark,
+                state_saved_at=now,
+                updated_at=now,
+            )
+        )
+        db.commit()
+        self._state_high_water_mark = self.high_water_mark
+        self._last_checkpoint = time.monotonic()
+        if self.on_checkpoint is not None:
+            self.on_checkpoint()
+
+    # ---------- window state ----------
+
+    @property
+    def _retention(self) -> timedelta:
+        # late events still need the window before them
+        return self.counters.max_window + self.allowed_lateness
+
+    def _evict(self) -> None:
+        newest = self.counters.newest()
+        if newest is not None:
+            self.counters.evict(newest - self._retention)
+
+    # ---------- processing ----------
+
+    def _evaluate(self, db: Session, events: List[SourceEvent], new: bool) -> List[dict]:
+        """
+        Adds the events to the counters and runs the rules on the unprocessed
+        ones. Within the batch events are taken in (timestamp, id) order and
+        each one sees every event of the batch up to its own timestamp.
+        new=False (stragglers): the events are already in the counters.
+        """
+        events = sorted(events, key=lambda e: (e.timestamp or datetime.min, e.id))
+        rows: List[dict] = []
+        added = 0
+        for event in events:
+            while new and added < len(events) and (
+                event.timestamp is None
+                or (events[added].timestamp or datetime.min) <= event.timestamp
+            ):
+                other = events[added]
+                self.counters.add(other.user, other.event_type, other.timestamp)
+                added += 1
+            if event.processed:
+                # already evaluated by someone else: only counted
+                continue
+            findings = apply_rules_to_event(
+                event, db, self.counters, as_of=event.timestamp, registry=self.registry
+            )
+            rows.extend(_finding_to_row(f) for f in findings)
+        return rows
+
+    def _commit(self, db: Session, rows: List[dict], events: List[SourceEvent]) -> int:
+        # the high-water mark commits in the findings' transaction
+        db.execute(
+            update(RulesCheckpoint)
+            .where(RulesCheckpoint.name == self.name)
+            .values(high_water_mark=self.high_water_mark, updated_at=datetime.utcnow())
+        )
+        created = _write_chunk(db, rows, [e.id for e in events if not e.processed])
+        db.expunge_all()
+        return created
+
+    def _sweep_stragglers(self, db: Session) -> Tuple[int, int]:
+        """
+        Events below the high-water mark that are still unprocessed: on
+        PostgreSQL a transaction can commit after one with higher ids.
+        """
+        self._last_sweep = time.monotonic()
+        events = (
+            db.query(SourceEvent)
+            .filter(SourceEvent.processed == False)
+            .filter(SourceEvent.id <= self.high_water_mark)
+            .order_by(SourceEvent.id.asc())
+            .limit(self.batch_size)
+            .all()
+        )
+        if not events:
+            return 0, 0
+        for event in events:
+            self.counters.add(event.user, event.event_type, event.timestamp)
+        with metrics.timed(metrics.RULES_PHASE_SECONDS, "evaluate"):
+            rows = self._evaluate(db, events, new=False)
+        return len(events), self._commit(db, rows, events)
+
+    def poll_once(self, db: Session) -> Tuple[int, int]:
+        """
+        Processes the next batch of events above the high-water mark.
+        Returns (events consumed, findings created).
+        """
+        events = (
+            db.query(SourceEvent)
+            .filter(SourceEvent.id > self.high_water_mark)
+            .order_by(SourceEvent.id.asc())
+            .limit(self.batch_size)
+            .all()
+        )
+        consumed, created = 0, 0
+        if events:
+            with metrics.timed(metrics.RULES_PHASE_SECONDS, "evaluate"):
+                rows = self._evaluate(db, events, new=True)
+            if metrics.ENABLED:
+                metrics.RULES_EVENTS.inc(amount=len(events))
+            self.high_water_mark = events[-1].id
+            created = self._commit(db, rows, events)
+            self._evict()
+            consumed = len(events)
+        else:
+            db.rollback()
+
+        if time.monotonic() - self._last_sweep >= STRAGGLER_SWEEP_SECONDS:
+            created += self._sweep_stragglers(db)[1]
+        if (
+            self.high_water_mark != self._state_high_water_mark
+            and time.monotonic() - self._last_checkpoint >= self.checkpoint_interval
+        ):
+            self.checkpoint(db)
+        return consumed, created
+
+    def run(
+        self,
+        db: Session,
+        stop: threading.Event,
+        wakeup: Optional[threading.Event] = None,
+        poll_interval: Optional[float] = None,
+    ) -> Tuple[int, int]:
+        """
+        Polls until stop is set: right away while there is a backlog,
+        otherwise after poll_interval (default RULES_STREAM_POLL_SECONDS) or
+        as soon as wakeup is set. Database errors (e.g. a locked SQLite
+        database) roll back the batch and reload the window state from the
+        checkpoint. Returns the totals (events consumed, findings created).
+        """
+        poll_interval = poll_interval or settings.RULES_STREAM_POLL_SECONDS
+        wakeup = wakeup or threading.Event()
+        total_events, total_findings = 0, 0
+        self.start(db)
+        while not stop.is_set():
+            wakeup.clear()
+            try:
+                with metrics.scope("stream_rules"):
+                    consumed, created = self.poll_once(db)
+            except SQLAlchemyError as e:
+                print(f"Streaming rules batch failed, retrying: {e}")
+                db.rollback()
+                db.expunge_all()
+                self.start(db)
+                stop.wait(poll_interval)
+                continue
+            total_events += consumed
+            total_findings += created
+            if consumed < self.batch_size:
+                # caught up
+                wakeup.wait(poll_interval)
+        try:
+            self.checkpoint(db)
+        except SQLAlchemyError as e:
+            print(f"Could not save the rules checkpoint: {e}")
+            db.rollback()
+        return total_events, total_findings
+
+
+class StreamingRulesService:
+    """
+    Runs a StreamingRulesEngine on a background thread of the API process
+    (RULES_STREAM_IN_API), woken by every committed insert_events_bulk batch
+    of that process.
+    """
+
+    def __init__(self, name: str = DEFAULT_CHECKPOINT):
+        self.name = name
+        self._stop = threading.Event()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _run(self) -> None:
+        db = SessionLocal()
+        try:
+            StreamingRulesEngine(self.name).run(db, self._stop, self._wakeup)
+        except Exception as e:
+            print(f"Streaming rules engine stopped: {e}")
+        finally:
+            db.close()
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        add_insert_listener(self._wakeup.set)
+        self._thread = threading.Thread(
+            target=self._run, name="stream-rules", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        remove_insert_listener(self._wakeup.set)
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
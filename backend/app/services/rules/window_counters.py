@@ -0,0 +1,240 @@
+# backend/app/services/rules/window_counters.py
+
+import json
+import zlib
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict
+from datetime import datetime, timedelta
+from itertools import accumulate
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from app.models import SourceEvent
+
+WINDOW_10_MIN = timedelta(minutes=10)
+WINDOW_30_MIN = timedelta(minutes=30)
+WINDOW_1_HOUR = timedelta(hours=1)
+
+# Optional predicate on event.user, used to keep only one partition of users
+UserFilter = Callable[[Optional[str]], bool]
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def _encode_timeline(timestamps: List[datetime]) -> List[int]:
+    # microseconds since the epoch, delta-encoded: mostly small numbers
+    micros = [(ts - _EPOCH) // _MICROSECOND for ts in timestamps]
+    return [micros[0]] + [b - a for a, b in zip(micros, micros[1:])] if micros else []
+
+
+def _decode_timeline(deltas: List[int]) -> List[datetime]:
+    return [_EPOCH + timedelta(microseconds=m) for m in accumulate(deltas)]
+
+
+def _count_range(
+    timestamps: List[datetime],
+    since: datetime,
+    until: Optional[datetime],
+) -> int:
+    start = bisect_left(timestamps, since)
+    end = len(timestamps) if until is None else bisect_right(timestamps, until)
+    return max(0, end - start)
+
+
+class WindowCounters:
+    """
+    In-memory sliding-window counters used by the rules engine instead of
+    one COUNT query per event.
+
+    Timestamps are kept sorted per (user, event_type) plus one global
+    timeline (for the "events in the last hour" rule), and only as far back
+    as the longest window, so any window up to max_window is answered
+    exactly with a binary search.
+    """
+
+    def __init__(self, max_window: timedelta = WINDOW_1_HOUR):
+        self.max_window = max_window
+        self._by_key: Dict[Tuple[str, str], List[datetime]] = defaultdict(list)
+        self._global: List[datetime] = []
+
+    def load(
+        self,
+        db: Session,
+        now: datetime,
+        user_filter: Optional[UserFilter] = None,
+    ) -> int:
+        """
+        Fills the counters from the DB with every event newer than
+        now - max_window (the same rows the per-event COUNT queries see),
+        optionally only for the users accepted by user_filter.
+        Returns how many events were loaded.
+        """
+        rows = (
+            db.query(SourceEvent.user, SourceEvent.event_type, SourceEvent.timestamp)
+            .filter(SourceEvent.timestamp >= now - self.max_window)
+            .order_by(SourceEvent.timestamp.asc())
+            .yield_per(10_000)
+        )
+        loaded = 0
+        for user, event_type, timestamp in rows:
+            if user_filter is not None and not user_filter(user):
+                continue
+            self.add(user, event_type, timestamp)
+            loaded += 1
+        return loaded
+
+    def add(self, user: Optional[str], event_type: str, timestamp: datetime) -> None:
+        """
+        Records one event. Events usually arrive in timestamp order, in which
+        case this is an append.
+        """
+        if timestamp is None:
+            return
+        insort(self._global, timestamp)
+        if user is not None:
+            insort(self._by_key[(user, event_type)], timestamp)
+
+    def count(
+        self,
+        user: Optional[str],
+        event_type: str,
+        since: datetime,
+        until: Optional[datetime] = None,
+    ) -> int:
+        """
+        Number of events for (user, event_type) with since <= timestamp (<= until).
+        """
+        if user is None:
+            # Same as the SQL `user = NULL` comparison, which never matches.
+            return 0
+        timestamps = self._by_key.get((user, event_type))
+        if not timestamps:
+            return 0
+        return _count_range(timestamps, since, until)
+
+    def count_global(self, since: datetime, until: Optional[datetime] = None) -> int:
+        """
+        Number of events of any type/user with since <= timestamp (<= until).
+        """
+        return _count_range(self._global, since, until)
+
+    def newest(self) -> Optional[datetime]:
+        """
+        Latest timestamp counted, if any.
+        """
+        return self._global[-1] if self._global else None
+
+    def evict(self, before: datetime) -> None:
+        """
+        Drops timestamps older than `before` to keep memory bounded.
+        """
+        del self._global[: bisect_left(self._global, before)]
+        for key in list(self._by_key):
+            timestamps = self._by_key[key]
+            del timestamps[: bisect_left(timestamps, before)]
+            if not timestamps:
+                del self._by_key[key]
+
+    def to_state(self) -> bytes:
+        """
+        Compact snapshot of the counters (for checkpoints).
+        """
+        state = {
+            "max_window": self.max_window.total_seconds(),
+            "global": _encode_timeline(self._global),
+            "keys": [
+                [user, event_type, _encode_timeline(timestamps)]
+                for (user, event_type), timestamps in self._by_key.items()
+            ],
+        }
+        return zlib.compress(json.dumps(state, separators=(",", ":")).encode("utf-8"))
+
+    @classmethod
+    def from_state(cls, data: bytes) -> "WindowCounters":
+        state = json.loads(zlib.decompress(data))
+        counters = cls(max_window=timedelta(seconds=state["max_window"]))
+        counters._global = _decode_timeline(state["global"])
+        for user, event_type, deltas in state["keys"]:
+            counters._by_key[(user, event_type)] = _decode_timeline(deltas)
+        return counters
+
+
+class EventTimeFeed:
+    """
+    Feeds WindowCounters from the source_events table in (timestamp, id) order
+    for event-time processing.
+
+    Callers evaluate events in timestamp order and call advance_to(event.timestamp)
+    first, so the counters hold exactly the stored events with
+    timestamp <= event.timestamp (processed or not) and a window
+    [t - w, t] gives the same answer however late or often it is computed.
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        counters: WindowCounters,
+        chunk_size: int = 10_000,
+        user_filter: Optional[UserFilter] = None,
+    ):
+        self.db = db
+        self.counters = counters
+        self.chunk_size = chunk_size
+        self.user_filter = user_filter
+        self._buffer: List[Tuple[Optional[str], str, datetime, int]] = []
+        self._pos = 0
+        self._last_key: Optional[Tuple[datetime, int]] = None
+        self._start: Optional[datetime] = None
+        self._exhausted = False
+
+    def _fetch(self) -> None:
+        query = self.db.query(
+            SourceEvent.user,
+            SourceEvent.event_type,
+            SourceEvent.timestamp,
+            SourceEvent.id,
+        )
+        if self._last_key is None:
+            query = query.filter(SourceEvent.timestamp >= self._start)
+        else:
+            last_ts, last_id = self._last_key
+            query = query.filter(
+                or_(
+                    SourceEvent.timestamp > last_ts,
+                    and_(SourceEvent.timestamp == last_ts, SourceEvent.id > last_id),
+                )
+            )
+        self._buffer = (
+            query.order_by(SourceEvent.timestamp.asc(), SourceEvent.id.asc())
+            .limit(self.chunk_size)
+            .all()
+        )
+        self._pos = 0
+        if not self._buffer:
+            self._exhausted = True
+            return
+        last = self._buffer[-1]
+        self._last_key = (last.timestamp, last.id)
+
+    def advance_to(self, until: datetime) -> None:
+        """
+        Adds every stored event with timestamp <= until to the counters.
+        """
+        if self._start is None:
+            # Only the longest window before the first evaluated event matters.
+            self._start = until - self.counters.max_window
+
+        while not self._exhausted:
+            if self._pos >= len(self._buffer):
+                self.counters.evict(until - self.counters.max_window)
+                self._fetch()
+                continue
+            user, event_type, timestamp, _ = self._buffer[self._pos]
+            if timestamp > until:
+                return
+            if self.user_filter is None or self.user_filter(user):
+                self.counters.add(user, event_type, timestamp)
+            self._pos += 1
@@ -1,10 +1,93 @@
 # backend/app/services/stats_service.py
 
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, select
 from app import models
 
+SEVERITY_ROLLUP = select(
+    models.FindingDailyCount.severity,
+    func.sum(models.FindingDailyCount.count),
+).group_by(models.FindingDailyCount.severity)
+
+EVENTS_PER_DAY_ROLLUP = (
+    select(models.EventDailyCount.day, func.sum(models.EventDailyCount.count))
+    .group_by(models.EventDailyCount.day)
+    .order_by(models.EventDailyCount.day)
+)
+
+# _rollups_missing(): any rollup row / any base table row
+ROLLUP_PROBES = (
+    select(models.EventDailyCount.day).limit(1),
+    select(models.FindingDailyCount.day).limit(1),
+)
+BASE_TABLE_PROBES = (
+    select(models.SourceEvent.id).limit(1),
+    select(models.Finding.id).limit(1),
+)
+
+
+def _summary(severity_rows, date_rows) -> dict:
+    severity_map = {"low": 0, "medium": 0, "high": 0, "critical": 0}
+    total_findings = 0
+    for severity, count in severity_rows:
+        total_findings += count or 0
+        if severity in severity_map:
+            severity_map[severity] = count
+
+    events_over_time = [
+        {"date": str(day), "count": count}
+        for day, count in date_rows
+    ]
+    total_events = sum(point["count"] for point in events_over_time)
+
+    return {
+        "total_events": total_events,
+        "total_findings": total_findings,
+        "findings_by_severity": severity_map,
+        "events_over_time": events_over_time,
+    }
+
+
 def get_summary_stats(db: Session) -> dict:
+    '''
+    Summary for the dashboard, read from the rollup tables (constant cost
+    however many events there are). Falls back to scanning the base tables
+    while the rollups have not been built yet (scripts/rebuild_rollups.py).
+    '''
+    if _rollups_missing(db):
+        return _summary_from_base_tables(db)
+    return _summary(
+        db.execute(SEVERITY_ROLLUP).all(),
+        db.execute(EVENTS_PER_DAY_ROLLUP).all(),
+    )
+
+
+async def get_summary_stats_async(db: AsyncSession) -> dict:
+    '''
+    get_summary_stats() on an AsyncSession (same statements).
+    '''
+    for probe in ROLLUP_PROBES:
+        if (await db.execute(probe)).first() is not None:
+            return _summary(
+                (await db.execute(SEVERITY_ROLLUP)).all(),
+                (await db.execute(EVENTS_PER_DAY_ROLLUP)).all(),
+            )
+    # No rollups: rare (empty or never rebuilt database), reuse the sync path
+    return await db.run_sync(get_summary_stats)
+
+
+def _rollups_missing(db: Session) -> bool:
+    '''
+    True when there are events/findings but no rollup rows at all, e.g. on a
+    database created before the rollup tables existed.
+    '''
+    if any(db.execute(probe).first() is not None for probe in ROLLUP_PROBES):
+        return False
+    return any(db.execute(probe).first() is not None for probe in BASE_TABLE_PROBES)
+
+
+def _summary_from_base_tables(db: Session) -> dict:
     total_events = db.query(func.count(models.SourceEvent.id)).scalar() or 0
     total_findings = db.query(func.count(models.Finding.id)).scalar() or 0
 
@@ -0,0 +1,438 @@
+"""
+Benchmark suite: ingest throughput, rules engine throughput, API route
+latency and peak RSS on deterministic data sets, with a JSON history and a
+regression check.
+
+    cd backend
+    python -m benchmarks.suite run --size 10k
+    python -m benchmarks.suite compare --threshold 0.1
+
+Every phase runs in a fresh process, so its peak RSS is its own. The app
+modules are only imported inside those processes, after DB_URL points at
+the benchmark database.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+# Seeded SQLite data sets are cached here and copied for each run
+DATA_DIR = BENCHMARKS_DIR / ".data"
+DEFAULT_HISTORY = BENCHMARKS_DIR / "history.json"
+
+SIZES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000, "10m": 10_000_000}
+# Fixed anchor, so the same seed gives the same events on every run
+DATASET_END = datetime(2026, 1, 1)
+INGEST_EVENTS = 20_000
+API_ROUTES = [
+    "/events?limit=50",
+    "/events?user=Alice&limit=50",
+    "/events?event_type=login_failed&limit=50",
+    "/findings?page_size=20",
+    "/findings?page_size=20&severity=critical",
+    "/findings?page_size=20&user=Bob",
+    "/findings?page_size=20&include_total=true",
+    "/stats/summary",
+]
+
+
+# ---------- phases (run in child processes) ----------
+
+def _alembic_upgrade(db_url: str) -> None:
+    from alembic import command
+    from app.scripts.benchmark_indexes import _alembic_config
+
+    command.upgrade(_alembic_config(db_url), "head")
+
+
+def phase_seed(db_url: str, size: int, seed: int) -> Dict[str, float]:
+    from app.db.session import SessionLocal, engine
+    from app.services.fast_log_generator import FastEventGenerator, write_event_chunks
+
+    _alembic_upgrade(db_url)
+    generator = FastEventGenerator(seed=seed, end=DATASET_END)
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        written = sum(write_event_chunks(db, generator.chunks(size)))
+        return {"seed events/s": written / (time.perf_counter() - start)}
+    finally:
+        db.close()
+        # closing the last connection checkpoints SQLite's WAL into the file
+        engine.dispose()
+
+
+def phase_ingest(db_url: str, seed: int) -> Dict[str, float]:
+    """
+    insert_events_bulk (the /events/bulk and stream ingest path).
+    """
+    from app.db.session import SessionLocal
+    from app.services.events_service import insert_events_bulk
+    from app.services.fast_log_generator import FastEventGenerator
+
+    # cached datasets may predate the latest migrations
+    _alembic_upgrade(db_url)
+    rows, _ = next(
+        FastEventGenerator(seed=seed + 1, end=DATASET_END, days=1).chunks(INGEST_EVENTS)
+    )
+    events = [
+        {
+            "event_type": event_type,
+            "user": user,
+            "raw_data": json.loads(raw_data),
+            "timestamp": datetime.fromisoformat(timestamp),
+        }
+        for event_type, user, raw_data, timestamp, _ in rows
+    ]
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        inserted = insert_events_bulk(db, events)
+        return {"ingest events/s": inserted / (time.perf_counter() - start)}
+    finally:
+        db.close()
+
+
+def phase_rules(db_url: str) -> Dict[str, float]:
+    from app.db.session import SessionLocal
+    from app.services.rules.rules_engine import run_rules_on_new_events
+
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        # the data set lies in the past: evaluate windows in event time
+        processed, created = run_rules_on_new_events(db, time_mode="event_time")
+        elapsed = time.perf_counter() - start
+        return {"rules events/s": processed / elapsed, "rules findings": created}
+    finally:
+        db.close()
+
+
+def _percentile(sorted_values: List[float], p: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p))]
+
+
+def phase_api(db_url: str, requests: int, warmup: int) -> Dict[str, float]:
+    try:
+        from fastapi.testclient import TestClient
+    except RuntimeError as e:  # starlette's TestClient needs httpx
+        raise RuntimeError("The API benchmarks need httpx (pip install httpx)") from e
+    from app.main import app
+
+    timings: Dict[str, List[float]] = {route: [] for route in API_ROUTES}
+    with TestClient(app) as client:
+        for _ in range(warmup):
+            for route in API_ROUTES:
+                client.get(route)
+        # routes take turns, so a noisy moment on the machine hits all of them
+        for _ in range(requests):
+            for route in API_ROUTES:
+                start = time.perf_counter()
+                response = client.get(route)
+                timings[route].append((time.perf_counter() - start) * 1000)
+                if response.status_code != 200:
+                    raise RuntimeError(f"GET {route}: {response.status_code}")
+
+    results = {}
+    for route, values in timings.items():
+        values.sort()
+        results[f"api {route} p50 ms"] = _percentile(values, 0.50)
+        results[f"api {route} p99 ms"] = _percentile(values, 0.99)
+    return results
+
+
+PHASES = {
+    "seed": phase_seed,
+    "ingest": phase_ingest,
+    "rules": phase_rules,
+    "api": phase_api,
+}
+
+
+def _child(phase: str, db_url: str, args: tuple) -> Dict[str, float]:
+    os.environ["DB_URL"] = db_url
+    # measure the database work, not the response cache
+    os.environ["RESPONSE_CACHE_BACKEND"] = "none"
+    os.environ.setdefault("OPENAI_API_KEY", "")
+    metrics = PHASES[phase](db_url, *args)
+    # KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    metrics[f"{phase} peak rss MB"] = peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    return metrics
+
+
+def run_phase(phase: str, db_url: str, *args) -> Dict[str, float]:
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(1) as pool:
+        return pool.apply(_child, (phase, db_url, args))
+
+
+# ---------- run / history / compare ----------
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=BENCHMARKS_DIR,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _sqlite_dataset(size_label: str, seed: int) -> Path:
+    """
+    Path of the seeded data set, seeding it on first use.
+    """
+    DATA_DIR.mkdir(exist_ok=True)
+    path = DATA_DIR / f"events_{size_label}_seed{seed}.db"
+    if not path.exists():
+        print(f"Seeding {size_label} events (seed {seed}) into {path} ...")
+        partial = path.with_suffix(".partial")
+        partial.unlink(missing_ok=True)
+        run_phase("seed", f"sqlite:///{partial}", SIZES[size_label], seed)
+        partial.rename(path)
+    return path
+
+
+def run_suite(
+    size_label: str,
+    seed: int,
+    requests: int,
+    warmup: int,
+    db_url: Optional[str] = None,
+) -> dict:
+    metrics: Dict[str, float] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        if db_url:
+            # an empty scratch database (e.g. PostgreSQL in a container)
+            metrics.update(run_phase("seed", db_url, SIZES[size_label], seed))
+        else:
+            work = Path(tmp) / "bench.db"
+            shutil.copyfile(_sqlite_dataset(size_label, seed), work)
+            db_url = f"sqlite:///{work}"
+        for phase, args in (
+            ("ingest", (seed,)),
+            ("rules", ()),
+            ("api", (requests, warmup)),
+        ):
+            print(f"Running {phase} ...")
+            metrics.update(run_phase(phase, db_url, *args))
+
+    return {
+        "timestamp": datetime.utcnow().isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "dataset": {"size": size_label, "seed": seed},
+        "database": db_url.split(":", 1)[0],
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "metrics": metrics,
+    }
+
+
+def load_history(path: Path) -> List[dict]:
+    if not path.exists():
+        return []
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def append_history(path: Path, run: dict) -> None:
+    history = load_history(path)
+    history.append(run)
+    path.write_text(json.dumps(history, indent=2) + "\n", encoding="utf-8")
+
+
+def higher_is_better(metric: str) -> bool:
+    return metric.endswith("/s")
+
+
+def baseline_metrics(runs: List[dict]) -> Dict[str, float]:
+    """
+    Per-metric median of runs, so one noisy run doesn't set the bar.
+    """
+    values: Dict[str, List[float]] = {}
+    for run in runs:
+        for metric, value in run["metrics"].items():
+            values.setdefault(metric, []).append(value)
+    return {metric: statistics.median(v) for metric, v in values.items()}
+
+
+def compare_runs(
+    baseline: Dict[str, float],
+    current: Dict[str, float],
+    threshold: float,
+    min_delta_ms: float = 0.0,
+) -> List[dict]:
+    """
+    Per metric present in both: relative change (positive = better) and
+    whether it is a regression beyond threshold (0.1 = 10%). Latencies that
+    moved by less than min_delta_ms are never regressions: at a couple of
+    milliseconds per request, scheduler jitter alone is tens of percent.
+    """
+    rows = []
+    for metric, before in baseline.items():
+        after = current.get(metric)
+        if after is None or not before or metric.endswith("findings"):
+            continue
+        change = (after - before) / before
+        if not higher_is_better(metric):
+            change = -change
+        regression = change < -threshold
+        if metric.endswith(" ms") and after - before < min_delta_ms:
+            regression = False
+        rows.append(
+            {
+                "metric": metric,
+                "baseline": before,
+                "current": after,
+                "change": change,
+                "regression": regression,
+            }
+        )
+    return rows
+
+
+def _same_setup(a: dict, b: dict) -> bool:
+    return a["dataset"] == b["dataset"] and a["database"] == b["database"]
+
+
+def print_comparison(rows: List[dict], baselines: List[dict], current: dict) -> None:
+    commits = ", ".join(str(run["commit"]) for run in baselines)
+    print(
+        f"baseline: median of {len(baselines)} run(s) ({commits})  ->  "
+        f"current {current['commit']} ({current['timestamp']})"
+    )
+    print(f"\n{'metric':<58}{'baseline':>12}{'current':>12}{'change':>9}")
+    for row in rows:
+        flag = "  REGRESSION" if row["regression"] else ""
+        print(
+            f"{row['metric']:<58}{row['baseline']:>12.2f}{row['current']:>12.2f}"
+            f"{row['change']:>+9.1%}{flag}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark ingest, the rules engine and the API routes, "
+        "and track the results in a JSON history."
+    )
+    parser.add_argument(
+        "--history",
+        type=Path,
+        default=DEFAULT_HISTORY,
+        help=f"History file (default: {DEFAULT_HISTORY})",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Run the suite and append the results")
+    run.add_argument(
+        "--size",
+        choices=SIZES,
+        default="10k",
+        help="Events in the data set (default: 10k)",
+    )
+    run.add_argument(
+        "--seed",
+        type=int,
+        default=42,
+        help="Data set seed (default: 42)",
+    )
+    run.add_argument(
+        "--requests",
+        type=int,
+        default=200,
+        help="Timed requests per API route (default: 200)",
+    )
+    run.add_argument(
+        "--warmup",
+        type=int,
+        default=10,
+        help="Untimed requests per API route first (default: 10)",
+    )
+    run.add_argument(
+        "--db-url",
+        default=None,
+        help="Empty scratch database to seed and run against instead of the "
+        "cached SQLite data sets, e.g. a PostgreSQL container",
+    )
+    run.add_argument(
+        "--no-history",
+        action="store_true",
+        help="Print the results without recording them",
+    )
+
+    compare = commands.add_parser(
+        "compare",
+        help="Compare the latest run with an earlier one of the same data set",
+    )
+    compare.add_argument(
+        "--baseline",
+        default=None,
+        help="Compare with the runs of this commit instead of the latest ones",
+    )
+    compare.add_argument(
+        "--window",
+        type=int,
+        default=3,
+        help="Earlier runs of the same data set whose median is the baseline "
+        "(default: 3)",
+    )
+    compare.add_argument(
+        "--min-delta-ms",
+        type=float,
+        default=0.5,
+        help="Latency increases below this are not regressions (default: 0.5)",
+    )
+    compare.add_argument(
+        "--threshold",
+        type=float,
+        default=0.10,
+        help="Relative slowdown reported as a regression (default: 0.10)",
+    )
+    args = parser.parse_args()
+
+    if args.command == "run":
+        result = run_suite(args.size, args.seed, args.requests, args.warmup, args.db_url)
+        for metric, value in result["metrics"].items():
+            print(f"{metric:<58}{value:>12.2f}")
+        if not args.no_history:
+            append_history(args.history, result)
+            print(f"\nRecorded in {args.history}")
+        return
+
+    history = load_history(args.history)
+    if not history:
+        sys.exit(f"No runs in {args.history}")
+    current = history[-1]
+    candidates = [run for run in history[:-1] if _same_setup(run, current)]
+    if args.baseline:
+        candidates = [run for run in candidates if run["commit"] == args.baseline]
+    if not candidates:
+        sys.exit("No earlier run of the same data set to compare with")
+    baselines = candidates[-args.window:]
+    rows = compare_runs(
+        baseline_metrics(baselines), current["metrics"], args.threshold, args.min_delta_ms
+    )
+    print_comparison(rows, baselines, current)
+    regressions = [row["metric"] for row in rows if row["regression"]]
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
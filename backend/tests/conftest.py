@@ -0,0 +1,32 @@
+# backend/tests/conftest.py
+
+import os
+import tempfile
+
+# Settings are read at import time: point the app at a scratch SQLite file
+# (a file, not :memory:, so the parallel rules workers see the same data)
+_tmp = tempfile.mkdtemp(prefix="mcm-tests-")
+os.environ["DB_URL"] = f"sqlite:///{_tmp}/test.db"
+os.environ.setdefault("OPENAI_API_KEY", "")
+os.environ.pop("READ_DB_URL", None)
+os.environ.pop("RULES_FILE", None)
+
+import pytest
+
+from app.db.base import Base
+from app.db.session import SessionLocal, engine
+import app.models  # noqa: F401  (registers the tables)
+
+
+@pytest.fixture
+def db():
+    """
+    A session on an empty schema, dropped again after the test.
+    """
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(bind=engine)
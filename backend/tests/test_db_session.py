@@ -0,0 +1,43 @@
+# backend/tests/test_db_session.py
+
+import threading
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app.db.session import make_engine, make_read_engine
+
+
+def test_in_memory_sqlite_reads_share_the_write_engine():
+    engine = make_engine("sqlite://")
+    read_engine = make_read_engine("sqlite://", engine)
+    assert read_engine is engine
+
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE t (x INTEGER)"))
+        conn.execute(text("INSERT INTO t VALUES (1)"))
+
+    # other threads (the threadpool of the sync routes) see the same database
+    counts = []
+    thread = threading.Thread(
+        target=lambda: counts.append(
+            read_engine.connect().execute(text("SELECT count(*) FROM t")).scalar()
+        )
+    )
+    thread.start()
+    thread.join()
+    assert counts == [1]
+
+
+def test_file_sqlite_gets_a_read_only_engine(tmp_path):
+    url = f"sqlite:///{tmp_path}/read.db"
+    engine = make_engine(url)
+    read_engine = make_read_engine(url, engine)
+    assert read_engine is not engine
+
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE t (x INTEGER)"))
+    with pytest.raises(OperationalError):
+        with read_engine.begin() as conn:
+            conn.execute(text("INSERT INTO t VALUES (1)"))
@@ -0,0 +1,165 @@
+# backend/tests/test_dedup.py
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models import Finding, FindingDailyCount
+from app.services.events_service import insert_events_bulk
+from app.services.rules import dedup
+from app.services.rules.builtin_rules import register_builtin_rules
+from app.services.rules.dedup import dedup_key, suppression_window
+from app.services.rules.registry import RuleRegistry
+from app.services.rules.rules_engine import _write_chunk, run_rules_on_new_events
+
+T0 = datetime(2024, 3, 1, 9, 0, 0)
+HOUR = timedelta(hours=1)
+
+
+RULE_NAMES = {"medium": "multiple_failed_logins", "high": "too_many_failed_logins"}
+
+
+def _row(seen_at, event_id, description, severity="high"):
+    return {
+        "rule_name": RULE_NAMES[severity],
+        "description": description,
+        "severity": severity,
+        "user": "alice",
+        "occurrence_count": 1,
+        "first_seen": seen_at,
+        "last_seen": seen_at,
+        "sample_event_id": event_id,
+        "dedup_key": dedup_key("failed_logins", "alice", seen_at, HOUR),
+    }
+
+
+def _severity_counts(db):
+    return {
+        row.severity: row.count for row in db.query(FindingDailyCount).all() if row.count
+    }
+
+
+@pytest.fixture(params=[True, False], ids=["upsert", "select-then-insert"])
+def upsert(request, monkeypatch):
+    if not request.param:
+        monkeypatch.setattr(dedup, "upsert_insert", lambda db: None)
+    return request.param
+
+
+def test_only_burst_rules_suppress_repeats():
+    registry = register_builtin_rules(RuleRegistry())
+    suppressed = {rule.name for rule in registry.rules if suppression_window(rule)}
+
+    assert suppressed == {"failed_logins", "mfa_failures", "very_high_activity"}
+
+
+def test_occurrences_fold_within_a_window_and_split_across_it(db, upsert):
+    created = _write_chunk(db, [
+        _row(T0 + timedelta(minutes=10), 1, "first"),
+        _row(T0 + timedelta(minutes=65), 2, "next window"),
+    ], [])
+    assert created == 2
+
+    created = _write_chunk(db, [
+        _row(T0 + timedelta(minutes=50), 3, "later"),
+        _row(T0 + timedelta(minutes=5), 4, "earlier, written late"),
+        _row(T0 + timedelta(minutes=59, seconds=59), 5, "end of window"),
+    ], [])
+    assert created == 0
+
+    findings = db.query(Finding).order_by(Finding.first_seen).all()
+    assert [(f.occurrence_count, f.first_seen, f.last_seen) for f in findings] == [
+        (4, T0 + timedelta(minutes=5), T0 + timedelta(minutes=59, seconds=59)),
+        (1, T0 + timedelta(minutes=65), T0 + timedelta(minutes=65)),
+    ]
+    # the finding keeps what it was created with
+    assert (findings[0].description, findings[0].sample_event_id) == ("first", 1)
+    # the rollup counts findings, not occurrences
+    assert sum(row.count for row in db.query(FindingDailyCount).all()) == 2
+
+
+def test_fold_keeps_the_enrichment(db, upsert):
+    _write_chunk(db, [_row(T0, 1, "first")], [])
+    finding = db.query(Finding).one()
+    finding.ai_explanation = "explained"
+    finding.risk_score = 7.5
+    db.commit()
+
+    _write_chunk(db, [_row(T0 + timedelta(minutes=30), 2, "second")], [])
+
+    db.expire_all()
+    finding = db.query(Finding).one()
+    assert finding.occurrence_count == 2
+    assert (finding.description, finding.ai_explanation, finding.risk_score) == (
+        "first", "explained", 7.5,
+    )
+
+
+def test_an_escalating_burst_stays_one_finding_at_its_highest_severity(db, upsert):
+    _write_chunk(db, [
+        _row(T0 + timedelta(minutes=1), 1, "three failures", "medium"),
+        _row(T0 + timedelta(minutes=2), 2, "four failures", "medium"),
+    ], [])
+    finding = db.query(Finding).one()
+    finding.ai_explanation = "explained"
+    finding.risk_score = 4.0
+    db.commit()
+
+    created = _write_chunk(db, [
+        _row(T0 + timedelta(minutes=4), 4, "six failures", "high"),
+        _row(T0 + timedelta(minutes=3), 3, "five failures", "high"),
+    ], [])
+    assert created == 0
+
+    db.expire_all()
+    finding = db.query(Finding).one()
+    assert (finding.severity, finding.rule_name, finding.occurrence_count) == (
+        "high", "too_many_failed_logins", 4,
+    )
+    assert (finding.first_seen, finding.last_seen) == (
+        T0 + timedelta(minutes=1), T0 + timedelta(minutes=4),
+    )
+    # described by the first occurrence at that severity, and enriched again
+    assert (finding.description, finding.sample_event_id) == ("five failures", 3)
+    assert (finding.ai_explanation, finding.risk_score) == (None, None)
+    assert _severity_counts(db) == {"high": 1}
+
+    # a later, lower occurrence only folds in
+    _write_chunk(db, [_row(T0 + timedelta(minutes=20), 5, "back to three", "medium")], [])
+    db.expire_all()
+    finding = db.query(Finding).one()
+    assert (finding.severity, finding.description, finding.occurrence_count) == (
+        "high", "five failures", 5,
+    )
+    assert _severity_counts(db) == {"high": 1}
+
+
+def test_rules_without_suppression_report_every_occurrence(db):
+    insert_events_bulk(db, [
+        {"user": "alice", "event_type": "storage_bucket_created",
+         "raw_data": {"bucket_name": f"bucket-{i}", "public": True},
+         "timestamp": T0 + timedelta(minutes=i)}
+        for i in range(3)
+    ] + [
+        {"user": "bob", "event_type": "login_failed", "raw_data": {},
+         "timestamp": T0 + timedelta(minutes=i)}
+        for i in range(6)
+    ])
+
+    _, created = run_rules_on_new_events(
+        db, time_mode="event_time", allowed_lateness=timedelta(0)
+    )
+
+    buckets = db.query(Finding).filter(Finding.rule_name == "public_bucket_detected").all()
+    assert sorted(f.description for f in buckets) == [
+        f"Bucket bucket-{i} is publicly accessible (event_type=storage_bucket_created)."
+        for i in range(3)
+    ]
+    assert all(f.dedup_key is None for f in buckets)
+    # bob's six failed logins escalate from low to high within one finding
+    login = db.query(Finding).filter(Finding.user == "bob").one()
+    assert (login.occurrence_count, login.severity, login.rule_name) == (
+        6, "high", "too_many_failed_logins",
+    )
+    assert created == db.query(Finding).count()
+    assert sum(row.count for row in db.query(FindingDailyCount).all()) == created
@@ -0,0 +1,105 @@
+# backend/tests/test_enrichment_jobs.py
+
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+
+from app.main import app
+from app.models import EnrichmentJob, EnrichmentJobBatch, Finding
+from app.services.enrichment_jobs import (
+    claim_batch,
+    process_batch,
+    submit_enrichment_job,
+)
+
+
+def _seed_findings(db, n):
+    db.add_all(
+        Finding(rule_name="failed_logins", severity="high", description="x", user=f"u{i}")
+        for i in range(n)
+    )
+    db.commit()
+
+
+def _expire_leases(db):
+    db.execute(
+        update(EnrichmentJobBatch).values(
+            lease_expires_at=datetime.utcnow() - timedelta(seconds=1)
+        )
+    )
+    db.commit()
+
+
+def test_nothing_to_enrich_stores_no_job(db):
+    assert submit_enrichment_job(db) is None
+    assert submit_enrichment_job(db, finding_ids=[12345]) is None
+    assert db.query(EnrichmentJob).count() == 0
+
+
+def test_route_answers_204_when_there_is_nothing_to_enrich(db):
+    with TestClient(app) as client:
+        response = client.post("/findings/enrichment_jobs")
+
+    assert response.status_code == 204
+    assert response.content == b""
+    assert db.query(EnrichmentJob).count() == 0
+
+
+def test_route_returns_the_queued_job(db):
+    _seed_findings(db, 3)
+    with TestClient(app) as client:
+        response = client.post("/findings/enrichment_jobs")
+        polled = client.get(f"/findings/enrichment_jobs/{response.json()['id']}")
+
+    assert response.status_code == 202
+    assert (response.json()["status"], response.json()["total"]) == ("pending", 3)
+    assert polled.json() == response.json()
+
+
+def test_claims_do_not_overlap(db):
+    _seed_findings(db, 5)
+    submit_enrichment_job(db, claim_batch_size=3)
+
+    first = claim_batch(db, "worker-a")
+    second = claim_batch(db, "worker-b")
+
+    assert first.id != second.id
+    assert claim_batch(db, "worker-c") is None
+
+
+def test_expired_lease_is_reclaimed_and_processed_once(db):
+    _seed_findings(db, 4)
+    job = submit_enrichment_job(db)
+    stale = claim_batch(db, "worker-a")
+    _expire_leases(db)
+
+    fresh = claim_batch(db, "worker-b")
+    assert fresh.id == stale.id
+    assert fresh.attempts == 2
+
+    # The first worker comes back after losing its lease: its write is dropped
+    assert process_batch(db, stale) is False
+    assert process_batch(db, fresh) is True
+    assert process_batch(db, fresh) is False
+
+    db.expire_all()
+    job = db.get(EnrichmentJob, job.id)
+    assert (job.status, job.enriched, job.batches_done) == ("done", 4, 1)
+    assert db.query(Finding).filter(Finding.risk_score.is_(None)).count() == 0
+    assert submit_enrichment_job(db) is None
+
+
+def test_batch_fails_after_max_attempts(db, monkeypatch):
+    monkeypatch.setattr("app.core.config.settings.ENRICH_MAX_ATTEMPTS", 2)
+    _seed_findings(db, 2)
+    job = submit_enrichment_job(db)
+    claim_batch(db, "worker-a")
+    _expire_leases(db)
+    claim_batch(db, "worker-b")
+    _expire_leases(db)
+
+    assert claim_batch(db, "worker-c") is None
+    db.expire_all()
+    job = db.get(EnrichmentJob, job.id)
+    assert (job.status, job.failed, job.batches_failed) == ("failed", 2, 1)
@@ -0,0 +1,48 @@
+# backend/tests/test_event_partitions.py
+
+from datetime import date, datetime
+
+from sqlalchemy import insert
+
+from app.models import EventPartition, SourceEvent
+from app.services.events_service import events_in_range, insert_events_bulk
+
+START = datetime(2024, 3, 1, 0, 0, 0)
+END = datetime(2024, 3, 3, 23, 59, 59)
+
+
+def _users(db, start=START, end=END):
+    return sorted(event.user for event in events_in_range(db, start, end).all())
+
+
+def test_events_on_uncatalogued_days_are_read_back(db):
+    # written around ensure_partitions (raw insert): 2024-03-01 stays unknown
+    db.execute(insert(SourceEvent), [
+        {"user": "raw", "event_type": "login_failed", "raw_data": {},
+         "timestamp": datetime(2024, 3, 1, 12, 0, 0)},
+    ])
+    insert_events_bulk(db, [
+        {"user": "bulk", "event_type": "login_failed", "raw_data": {},
+         "timestamp": datetime(2024, 3, 2, 12, 0, 0)},
+    ])
+
+    assert db.query(EventPartition.day).all() == [(date(2024, 3, 2),)]
+    assert _users(db) == ["bulk", "raw"]
+    assert _users(db, start=datetime(2024, 3, 1), end=datetime(2024, 3, 1, 23)) == ["raw"]
+    assert _users(db, start=None, end=None) == ["bulk", "raw"]
+
+
+def test_fully_catalogued_ranges_are_pruned_to_live_days(db):
+    insert_events_bulk(db, [
+        {"user": f"u{day}", "event_type": "login_failed", "raw_data": {},
+         "timestamp": datetime(2024, 3, day, 12, 0, 0)}
+        for day in (1, 2, 3)
+    ])
+    db.query(EventPartition).filter(EventPartition.day != date(2024, 3, 2)).update(
+        {"status": "archived"}
+    )
+    db.commit()
+
+    # rows of retired days are skipped (retention deleted them for real)
+    assert _users(db) == ["u2"]
+    assert _users(db, start=datetime(2024, 3, 3), end=datetime(2024, 3, 3, 23)) == []
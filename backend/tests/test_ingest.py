@@ -0,0 +1,39 @@
+# backend/tests/test_ingest.py
+
+from datetime import date, datetime, timedelta, timezone
+
+from app.models import EventDailyCount, SourceEvent
+from app.services.events_service import insert_events_bulk
+from app.services.ingestion.bulk_ingestor import validate_event
+
+
+def test_validate_event_converts_offsets_to_naive_utc():
+    event, error = validate_event(
+        {"user": "alice", "event_type": "login_failed", "raw_data": {},
+         "timestamp": "2024-01-01T05:00:00+05:00"}
+    )
+
+    assert error is None
+    assert event["timestamp"] == datetime(2024, 1, 1, 0, 0, 0)
+    assert event["timestamp"].tzinfo is None
+
+
+def test_validate_event_keeps_naive_timestamps():
+    event, _ = validate_event(
+        {"user": "alice", "event_type": "login_failed", "raw_data": {},
+         "timestamp": "2024-01-01T05:00:00"}
+    )
+
+    assert event["timestamp"] == datetime(2024, 1, 1, 5, 0, 0)
+
+
+def test_insert_events_bulk_stores_utc_and_rolls_up_the_utc_day(db):
+    tz = timezone(timedelta(hours=5))
+    insert_events_bulk(
+        db,
+        [{"user": "alice", "event_type": "login_failed", "raw_data": {},
+          "timestamp": datetime(2024, 1, 1, 2, 0, 0, tzinfo=tz)}],
+    )
+
+    assert db.query(SourceEvent.timestamp).scalar() == datetime(2023, 12, 31, 21, 0, 0)
+    assert [row.day for row in db.query(EventDailyCount).all()] == [date(2023, 12, 31)]
@@ -0,0 +1,55 @@
+# backend/tests/test_live_feed.py
+
+from datetime import datetime, timedelta
+
+from app.services.live_feed import LiveFeedHub
+from app.services.response_cache import FINDINGS_NAMESPACE, bump_generations
+from app.services.rules.dedup import write_findings
+
+T0 = datetime(2024, 3, 1, 9, 0, 0)
+
+
+def _row(user, seen_at, event_id, dedup_key):
+    return {
+        "rule_name": "failed_logins",
+        "description": f"failed logins for {user}",
+        "severity": "high",
+        "user": user,
+        "occurrence_count": 1,
+        "first_seen": seen_at,
+        "last_seen": seen_at,
+        "sample_event_id": event_id,
+        "dedup_key": dedup_key,
+    }
+
+
+def _write(db, rows):
+    write_findings(db, rows)
+    bump_generations(db, FINDINGS_NAMESPACE)
+    db.commit()
+
+
+def test_folded_occurrences_are_published_as_updates(db):
+    hub = LiveFeedHub()
+    _write(db, [_row("alice", T0, 1, "k-alice")])
+    assert hub._poll() == []  # baseline
+
+    _write(db, [_row("bob", T0, 2, "k-bob")])
+    messages = hub._poll()
+    assert [(event, data["user"]) for event, data in messages] == [("finding", "bob")]
+
+    _write(db, [
+        _row("alice", T0 + timedelta(minutes=5), 3, "k-alice"),
+        _row("bob", T0 + timedelta(minutes=1), 4, "k-bob"),
+    ])
+    messages = hub._poll()
+    assert [(event, data["user"], data["occurrence_count"]) for event, data in messages] == [
+        ("finding_updated", "alice", 2),
+        ("finding_updated", "bob", 2),
+    ]
+    assert messages[0][1]["last_seen"] == (T0 + timedelta(minutes=5)).isoformat()
+
+    # nothing advanced: no messages
+    bump_generations(db, FINDINGS_NAMESPACE)
+    db.commit()
+    assert hub._poll() == []
@@ -0,0 +1,65 @@
+# backend/tests/test_rules_chunks.py
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, update
+
+from app.models import SourceEvent
+from app.services.rules.rules_engine import _iter_event_chunks, run_rules_on_new_events
+
+T0 = datetime(2024, 1, 1, 12, 0, 0)
+
+
+def _add_events(db, timestamps):
+    events = [
+        SourceEvent(user="alice", event_type="login_failed", raw_data={}, timestamp=ts)
+        for ts in timestamps
+    ]
+    db.add_all(events)
+    db.flush()
+    # inserts replace a None timestamp by the column default: clear it after
+    missing = [e.id for e, ts in zip(events, timestamps) if ts is None]
+    if missing:
+        db.execute(
+            update(SourceEvent).where(SourceEvent.id.in_(missing)).values(timestamp=None)
+        )
+    db.commit()
+    return [event.id for event in events]
+
+
+def test_walk_visits_events_without_timestamp(db):
+    ids = _add_events(
+        db, [T0, None, T0 + timedelta(minutes=1), None, T0, None, T0 + timedelta(minutes=2)]
+    )
+
+    walked = [event.id for chunk in _iter_event_chunks(db, 2) for event in chunk]
+
+    assert sorted(walked) == sorted(ids)
+    assert len(walked) == len(set(walked))
+    # timestamped events first, in (timestamp, id) order, then the others by id
+    by_id = dict(db.execute(select(SourceEvent.id, SourceEvent.timestamp)).all())
+    timestamps = [by_id[event_id] for event_id in walked]
+    assert timestamps[:4] == sorted(timestamps[:4])
+    assert timestamps[4:] == [None, None, None]
+
+
+def test_time_range_walk_skips_events_without_timestamp(db):
+    _add_events(db, [None, T0, None])
+
+    walked = [
+        event.timestamp
+        for chunk in _iter_event_chunks(db, 2, start=T0 - timedelta(hours=1), end=T0)
+        for event in chunk
+    ]
+
+    assert walked == [T0]
+
+
+def test_rules_process_events_without_timestamp(db):
+    _add_events(db, [None, None, T0, None])
+
+    processed, _ = run_rules_on_new_events(db, chunk_size=2, time_mode="event_time",
+                                           allowed_lateness=timedelta(0))
+
+    assert processed == 4
+    assert db.query(SourceEvent).filter(SourceEvent.processed == False).count() == 0
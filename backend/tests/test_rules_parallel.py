@@ -0,0 +1,94 @@
+# backend/tests/test_rules_parallel.py
+
+import random
+from collections import Counter
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, update
+
+from app.models import EventDailyCount, Finding, FindingDailyCount, SourceEvent
+from app.services.events_service import insert_events_bulk
+from app.services.rules.parallel import run_rules_parallel
+from app.services.rules.rules_engine import run_rules_on_new_events
+
+T0 = datetime(2024, 3, 1, 9, 0, 0)
+
+
+def _seed(db, n=600):
+    """
+    n events over 90 minutes: bursts of failed logins / MFA failures per
+    user, and enough events overall for the global very_high_activity rule.
+    """
+    rng = random.Random(7)
+    users = ["alice", "bob", "carol", "dave", "erin", "frank"]
+    events = []
+    for i in range(n):
+        event_type = rng.choice(
+            ["login_failed", "login_failed", "mfa_failed", "mfa_success",
+             "login_success", "permission_changed", "deployment_failed"]
+        )
+        events.append(
+            {
+                "user": rng.choice(users),
+                "event_type": event_type,
+                "raw_data": {
+                    "location": rng.choice(["Israel", "Russia"]),
+                    "old_role": "viewer",
+                    "new_role": rng.choice(["admin", "developer"]),
+                    "environment": rng.choice(["prod", "staging"]),
+                    "service": rng.choice(["api", "web"]),
+                },
+                "timestamp": T0 + timedelta(seconds=i * 9),
+            }
+        )
+    insert_events_bulk(db, events)
+
+
+def _findings(db):
+    return Counter(
+        db.query(
+            Finding.rule_name,
+            Finding.severity,
+            Finding.user,
+            Finding.description,
+            Finding.occurrence_count,
+        ).all()
+    )
+
+
+def _reset(db):
+    db.execute(delete(Finding))
+    db.execute(delete(FindingDailyCount))
+    db.execute(update(SourceEvent).values(processed=False))
+    db.commit()
+
+
+def test_parallel_matches_serial(db):
+    _seed(db)
+    serial = run_rules_on_new_events(
+        db, chunk_size=50, time_mode="event_time", allowed_lateness=timedelta(0)
+    )
+    expected = _findings(db)
+    assert any(rule == "very_high_activity_last_hour" for rule, *_ in expected)
+
+    _reset(db)
+    parallel = run_rules_parallel(
+        db, workers=3, chunk_size=50, time_mode="event_time",
+        allowed_lateness=timedelta(0),
+    )
+
+    assert parallel == serial
+    assert _findings(db) == expected
+    assert db.query(SourceEvent).filter(SourceEvent.processed == False).count() == 0
+
+
+def test_parallel_rollups_match_findings(db):
+    _seed(db, n=200)
+    run_rules_parallel(
+        db, workers=2, chunk_size=30, time_mode="event_time",
+        allowed_lateness=timedelta(0),
+    )
+
+    rollup = sum(row.count for row in db.query(FindingDailyCount).all())
+    assert rollup == db.query(Finding).count()
+    assert sum(row.count for row in db.query(EventDailyCount).all()) == 200
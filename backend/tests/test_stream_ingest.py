@@ -0,0 +1,84 @@
+# backend/tests/test_stream_ingest.py
+
+import asyncio
+import json
+
+from app.models import SourceEvent
+from app.services.ingestion import stream_ingestor
+from app.services.ingestion.stream_ingestor import (
+    EventWriteQueue,
+    ingest_ndjson_stream,
+    iter_ndjson_lines,
+)
+
+
+async def _chunks(*parts):
+    for part in parts:
+        yield part
+
+
+async def _collect(chunks, max_line_bytes=None):
+    return [line async for line in iter_ndjson_lines(chunks, max_line_bytes)]
+
+
+async def _ingest(body_parts, queue, wait=True):
+    try:
+        return await ingest_ndjson_stream(_chunks(*body_parts), queue, wait=wait)
+    finally:
+        await queue.stop()
+
+
+def _line(user):
+    return json.dumps({
+        "user": user, "event_type": "login_failed", "raw_data": {},
+        "timestamp": "2024-01-01T00:00:00",
+    }).encode() + b"\n"
+
+
+def test_lines_split_across_chunks():
+    lines = asyncio.run(_collect(_chunks(b'{"a"', b": 1}\n{", b'"b": 2}\n', b'{"c": 3}')))
+
+    assert lines == [b'{"a": 1}', b'{"b": 2}', b'{"c": 3}']
+
+
+def test_oversized_line_is_dropped_once():
+    lines = asyncio.run(_collect(_chunks(b"x" * 6, b"y" * 6, b"z\nok\n"), max_line_bytes=8))
+
+    assert lines == [None, b"ok"]
+
+
+def test_response_counts_written_events(db):
+    queue = EventWriteQueue(batch_size=2, flush_interval=0.01)
+    result = asyncio.run(_ingest([_line("alice"), b"not json\n", _line("bob")], queue))
+
+    assert result["accepted"] == 2
+    assert result["rejected"] == 1
+    assert [error["index"] for error in result["errors"]] == [1]
+    assert db.query(SourceEvent).count() == 2
+
+
+def test_failed_writes_are_reported(db, monkeypatch):
+    def fail(batch):
+        raise RuntimeError("database is locked")
+
+    monkeypatch.setattr(stream_ingestor, "_write_batch", fail)
+    queue = EventWriteQueue(batch_size=10, flush_interval=0.01)
+    result = asyncio.run(_ingest([_line("alice"), _line("bob")], queue))
+
+    assert result["accepted"] == 0
+    assert result["rejected"] == 2
+    assert [error["index"] for error in result["errors"]] == [0, 1]
+    assert "database is locked" in result["errors"][0]["detail"]
+
+
+def test_without_wait_the_response_does_not_wait_for_the_writer(db, monkeypatch):
+    def fail(batch):
+        raise RuntimeError("database is locked")
+
+    monkeypatch.setattr(stream_ingestor, "_write_batch", fail)
+    queue = EventWriteQueue(batch_size=10, flush_interval=0.01)
+    result = asyncio.run(_ingest([_line("alice"), _line("bob")], queue, wait=False))
+
+    # queued = accepted; the failure only shows in the writer's counters
+    assert (result["accepted"], result["rejected"]) == (2, 0)
+    assert queue.failed == 2
@@ -9,13 +9,17 @@ import { Finding, FindingsFilters, PaginatedResponse } from '../types';
 export async function getFindings(
   page: number = 1,
   pageSize: number = 20,
-  filters?: FindingsFilters
+  filters?: FindingsFilters,
+  // next_cursor of the previous page: read by keyset instead of OFFSET
+  cursor?: string | null
 ): Promise<PaginatedResponse<Finding>> {
   const params = new URLSearchParams({
     page: page.toString(),
     page_size: pageSize.toString(),
   });
 
+  if (cursor) params.append('cursor', cursor);
+
   if (filters?.severity) params.append('severity', filters.severity);
   if (filters?.user) params.append('user', filters.user);
   if (filters?.from_date) params.append('from_date', filters.from_date);
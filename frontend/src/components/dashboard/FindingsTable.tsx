@@ -7,7 +7,8 @@ interface FindingsTableProps {
   response: PaginatedResponse<Finding> | null;
   loading: boolean;
   error?: string | null;
-  onPageChange: (page: number) => void;
+  // cursor: the next_cursor that leads to `page` when moving forward
+  onPageChange: (page: number, cursor?: string | null) => void;
   onViewDetails: (finding: Finding) => void;
   onEnrichFinding?: (id: number) => void;
 
@@ -57,7 +58,7 @@ export function FindingsTable({
   }
 
   const startItem = (response.page - 1) * response.page_size + 1;
-  const endItem = Math.min(response.page * response.page_size, response.total);
+  const endItem = startItem + response.items.length - 1;
 
   return (
     <div className="space-y-4">
@@ -171,7 +172,9 @@ export function FindingsTable({
 
       <div className="flex flex-col items-center justify-between gap-4 sm:flex-row">
         <p className="text-sm text-muted-foreground">
-          Showing {startItem}–{endItem} of {response.total}
+          Showing {startItem}–{endItem}
+          {response.total != null &&
+            ` of ${response.total_exact === false ? '~' : ''}${response.total}`}
         </p>
         <div className="flex items-center gap-2">
           <Button
@@ -186,8 +189,8 @@ export function FindingsTable({
           <Button
             variant="outline"
             size="sm"
-            onClick={() => onPageChange(response.page + 1)}
-            disabled={response.page * response.page_size >= response.total}
+            onClick={() => onPageChange(response.page + 1, response.next_cursor)}
+            disabled={!response.next_cursor}
           >
             Next
             <ChevronRight className="ml-1 h-4 w-4" />
@@ -22,12 +22,15 @@ export default function DashboardPage() {
   const [filters, setFilters] = useState<FindingsFilters>({});
   const [findingsResponse, setFindingsResponse] = useState<PaginatedResponse<Finding> | null>(null);
   const [page, setPage] = useState(1);
+  // cursors[i] is the cursor that fetches page i + 1 (page 1 needs none)
+  const [cursors, setCursors] = useState<(string | null)[]>([null]);
   const [loadingStats, setLoadingStats] = useState(true);
   const [loadingFindings, setLoadingFindings] = useState(true);
   const [errorFindings, setErrorFindings] = useState<string | null>(null);
   const [selectedFinding, setSelectedFinding] = useState<Finding | null>(null);
 
   const pageSize = 20;
+  const cursor = cursors[page - 1] ?? null;
 
   // Fetch stats on mount
   useEffect(() => {
@@ -77,7 +80,7 @@ export default function DashboardPage() {
           return;
         }
         
-        const data = await getFindings(page, pageSize, filters);
+        const data = await getFindings(page, pageSize, filters, cursor);
         setFindingsResponse(data);
       } catch (error) {
         console.error('Failed to fetch findings:', error);
@@ -93,14 +96,19 @@ export default function DashboardPage() {
     }
 
     fetchFindingsData();
-  }, [filters, page, toast]);
+  }, [filters, page, cursor, toast]);
 
   const handleFiltersChange = (newFilters: FindingsFilters) => {
     setFilters(newFilters);
     setPage(1); // Reset to first page when filters change
+    setCursors([null]);
   };
 
-  const handlePageChange = (newPage: number) => {
+  const handlePageChange = (newPage: number, nextCursor?: string | null) => {
+    if (nextCursor) {
+      // forward: remember the cursor so Previous can come back to it
+      setCursors((prev) => [...prev.slice(0, newPage - 1), nextCursor]);
+    }
     setPage(newPage);
   };
 
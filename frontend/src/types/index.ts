@@ -53,7 +53,12 @@ export interface EventsFilters {
 
 export interface PaginatedResponse<T> {
   items: T[];
-  total: number;
+  // null when it is not counted and cannot be estimated cheaply
+  total: number | null;
   page: number;
   page_size: number;
+  // false when total is an estimate or null (see include_total)
+  total_exact?: boolean;
+  // opaque token for the page after this one, null on the last page
+  next_cursor?: string | null;
 }